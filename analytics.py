@@ -0,0 +1,397 @@
+# Offline statistics over telemetry logs: time to death, DDA decisions,
+# difficulty trajectories and powerup usage, grouped by DDA parameters.
+# Usage: python analytics.py telemetry.jsonl logs/ [--workers 8] [--out stats.json]
+# Replay logs are analysed through their telemetry:
+#        python replay.py session.ddr --telemetry session.jsonl
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import *
+from stats import percentile
+from telemetry import log_files
+
+CHUNK_BYTES = 1 << 20  # Lines read per batch
+SPLIT_BYTES = 16 << 20  # Logs larger than this are split across workers at session starts
+SESSION_PREFIX = b'{"event":"session"'
+SPAWN_PREFIX = b'{"event":"spawn"'
+
+
+def find_logs(paths):
+    # Each log is its rotated files oldest first, read as one stream
+    logs = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.endswith('.jsonl'))
+            logs.extend(log_files(os.path.join(path, name)) for name in names)
+        else:
+            logs.append(log_files(path))
+    return [files for files in logs if files]
+
+
+def plan_jobs(logs, split=SPLIT_BYTES):
+    # (files, start, end) byte ranges over each log's concatenated files
+    jobs = []
+    for files in logs:
+        total = sum(os.path.getsize(path) for path in files)
+        for start in range(0, max(total, 1), split):
+            jobs.append((files, start, min(total, start + split)))
+    return jobs
+
+
+def read_chunks(files, start):
+    # (offset, lines) batches from the concatenated files, starting at the
+    # first whole line at or after start. Rotation only happens between lines
+    offset = 0
+    for path in files:
+        size = os.path.getsize(path)
+        if offset + size <= start:
+            offset += size
+            continue
+        with open(path, 'rb') as f:
+            position = offset
+            if start > offset:
+                f.seek(start - offset - 1)
+                position = start + len(f.readline()) - 1
+            while True:
+                lines = f.readlines(CHUNK_BYTES)
+                if not lines:
+                    break
+                yield position, lines
+                position += sum(map(len, lines))
+        offset += size
+
+
+def parse(lines, stats):
+    # One json.loads for the whole batch; a line cut short by a crash mid-write
+    # fails the batch, which is then parsed line by line to skip it
+    try:
+        return json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                stats['bad_lines'] += 1
+        return events
+
+
+class Session:
+    __slots__ = ('seed', 'key', 'end', 'died', 'score', 'spawns', 'bosses', 'waves', 'kills', 'hits',
+                 'decisions', 'trajectory', 'spawn_rate', 'speed_factor', 'powerups')
+
+    def __init__(self, event):
+        self.seed = event.get('seed')
+        self.key = json.dumps([event.get('dda_weights'), event.get('dda_thresholds')])
+        self.end = event['t']
+        self.died = False
+        self.score = 0
+        self.spawns = 0
+        self.bosses = 0
+        self.waves = 0
+        self.kills = 0
+        self.hits = 0
+        self.decisions = {}
+        # (spawn_rate, enemy_speed_factor) after each DDA check
+        self.trajectory = []
+        # Logs from before the session carried its spawn settings start at the default
+        self.spawn_rate = (event.get('spawn_config') or {}).get('initial_spawn_rate', INITIAL_SPAWN_RATE)
+        self.speed_factor = 1.0
+        # power type -> [spawned, collected]
+        self.powerups = {}
+
+    def add(self, event):
+        kind = event['event']
+        if event['t'] is not None:
+            self.end = event['t']
+        if kind == 'kill':
+            self.kills += event['count']
+            self.score = event['score']
+        elif kind == 'wave':
+            self.waves = event['wave']
+        elif kind == 'dda':
+            self.decisions[event['decision']] = self.decisions.get(event['decision'], 0) + 1
+            self.trajectory.append((self.spawn_rate, self.speed_factor))
+        elif kind == 'difficulty':
+            # Follows the dda event it belongs to
+            self.spawn_rate = event['spawn_rate']
+            self.speed_factor = event['speed_factor']
+            if self.trajectory:
+                self.trajectory[-1] = (self.spawn_rate, self.speed_factor)
+        elif kind == 'powerup_spawn':
+            self.powerups.setdefault(event['type'], [0, 0])[0] += 1
+        elif kind == 'powerup':
+            self.powerups.setdefault(event['type'], [0, 0])[1] += 1
+        elif kind == 'hit':
+            self.hits += 1
+        elif kind == 'death':
+            self.died = True
+            self.score = event['score']
+            self.end = event['survival_time'] * 1000
+
+    def row(self):
+        return {'seed': self.seed, 'dda': json.loads(self.key), 'survival_time': self.end / 1000,
+                'died': self.died, 'score': self.score, 'spawns': self.spawns, 'bosses': self.bosses,
+                'waves': self.waves, 'kills': self.kills, 'hits': self.hits, 'decisions': self.decisions,
+                'trajectory': self.trajectory, 'powerups': self.powerups}
+
+
+def new_group():
+    return {'sessions': 0, 'deaths': 0, 'death_times': [], 'survival_times': [], 'decisions': {},
+            'trajectory': [], 'powerups': {}, 'spawns': 0, 'bosses': 0, 'kills': 0, 'hits': 0}
+
+
+def add_session(groups, session):
+    group = groups.get(session.key)
+    if group is None:
+        group = groups[session.key] = new_group()
+    group['sessions'] += 1
+    group['survival_times'].append(session.end / 1000)
+    if session.died:
+        group['deaths'] += 1
+        group['death_times'].append(session.end / 1000)
+    for decision, count in session.decisions.items():
+        group['decisions'][decision] = group['decisions'].get(decision, 0) + count
+    # Per check: [sessions, spawn_rate sum, speed factor sum]
+    trajectory = group['trajectory']
+    for i, (spawn_rate, speed_factor) in enumerate(session.trajectory):
+        if i == len(trajectory):
+            trajectory.append([0, 0.0, 0.0])
+        trajectory[i][0] += 1
+        trajectory[i][1] += spawn_rate
+        trajectory[i][2] += speed_factor
+    for power_type, (spawned, collected) in session.powerups.items():
+        totals = group['powerups'].setdefault(power_type, [0, 0])
+        totals[0] += spawned
+        totals[1] += collected
+    for name in ('spawns', 'bosses', 'kills', 'hits'):
+        group[name] += getattr(session, name)
+
+
+def merge_groups(into, groups):
+    for key, group in groups.items():
+        target = into.get(key)
+        if target is None:
+            into[key] = group
+            continue
+        for name in ('sessions', 'deaths', 'spawns', 'bosses', 'kills', 'hits'):
+            target[name] += group[name]
+        target['death_times'].extend(group['death_times'])
+        target['survival_times'].extend(group['survival_times'])
+        for decision, count in group['decisions'].items():
+            target['decisions'][decision] = target['decisions'].get(decision, 0) + count
+        for i, (sessions, spawn_rate, speed_factor) in enumerate(group['trajectory']):
+            if i == len(target['trajectory']):
+                target['trajectory'].append([0, 0.0, 0.0])
+            check = target['trajectory'][i]
+            check[0] += sessions
+            check[1] += spawn_rate
+            check[2] += speed_factor
+        for power_type, (spawned, collected) in group['powerups'].items():
+            totals = target['powerups'].setdefault(power_type, [0, 0])
+            totals[0] += spawned
+            totals[1] += collected
+
+
+def scan(job):
+    # Sessions that start inside [start, end); a session starting near the end
+    # is read on past it. Memory holds one batch, one session and the totals
+    files, start, end, keep_rows = job
+    groups = {}
+    rows = []
+    stats = {'events': 0, 'bad_lines': 0, 'orphan_events': 0, 'dropped_events': 0}
+    session = None
+    pending = []
+
+    def flush():
+        events = parse(pending, stats)
+        pending.clear()
+        stats['events'] += len(events)
+        for event in events:
+            if event.get('event') == 'dropped':
+                # Written by the telemetry thread with no time, for events it lost
+                stats['dropped_events'] += event.get('count', 0)
+                continue
+            try:
+                session.add(event)
+            except KeyError:
+                stats['bad_lines'] += 1
+
+    def finish():
+        flush()
+        add_session(groups, session)
+        if keep_rows:
+            rows.append(session.row())
+
+    done = False
+    for offset, lines in read_chunks(files, start):
+        # Line offsets only matter in the batch that crosses the range end
+        positions = None
+        if offset + sum(map(len, lines)) > end:
+            positions = []
+            for line in lines:
+                positions.append(offset)
+                offset += len(line)
+        for i, line in enumerate(lines):
+            if line.startswith(SESSION_PREFIX):
+                if positions is not None and positions[i] >= end:
+                    done = True
+                    break
+                if session is not None:
+                    finish()
+                events = parse([line], stats)
+                session = Session(events[0]) if events else None
+                stats['events'] += len(events)
+            elif session is None:
+                # Before the first session of this range: belongs to the previous
+                # range, or to a session whose start was rotated away
+                if start == 0:
+                    stats['orphan_events'] += 1
+            elif line.startswith(SPAWN_PREFIX):
+                # The most common event, counted without a parse
+                session.spawns += 1
+                stats['events'] += 1
+                if b'"boss":true' in line:
+                    session.bosses += 1
+            else:
+                pending.append(line)
+        if session is not None and pending:
+            flush()
+        if done:
+            break
+    if session is not None:
+        finish()
+    return groups, rows, stats
+
+
+def summarize(group):
+    deaths = sorted(group['death_times'])
+    survival = sorted(group['survival_times'])
+    decisions = group['decisions']
+    checks = sum(decisions.values())
+    return {
+        'sessions': group['sessions'],
+        'deaths': group['deaths'],
+        'time_to_death': {
+            'mean': sum(deaths) / len(deaths) if deaths else 0.0,
+            **{f'p{q}': percentile(deaths, q) for q in (10, 25, 50, 75, 90)},
+        },
+        'survival_time': {
+            'mean': sum(survival) / len(survival) if survival else 0.0,
+            'p50': percentile(survival, 50),
+        },
+        'dda_checks': checks,
+        'dda_decisions': {decision: {'count': decisions.get(decision, 0),
+                                     'share': decisions.get(decision, 0) / checks if checks else 0.0}
+                          for decision in ('easier', 'balanced', 'harder')},
+        'trajectory': [{'sessions': sessions, 'spawn_rate': spawn_rate / sessions,
+                        'enemy_speed_factor': speed_factor / sessions}
+                       for sessions, spawn_rate, speed_factor in group['trajectory']],
+        'powerups': {power_type: {'spawned': spawned, 'collected': collected,
+                                  'collected_share': collected / spawned if spawned else 0.0}
+                     for power_type, (spawned, collected) in sorted(group['powerups'].items())},
+        'per_session': {name: group[name] / max(1, group['sessions'])
+                        for name in ('spawns', 'bosses', 'kills', 'hits')},
+    }
+
+
+def histogram(values, bins=10, width=40):
+    if not values:
+        return []
+    low, high = values[0], values[-1]
+    step = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int((value - low) / step))] += 1
+    most = max(counts)
+    return [f"  {low + i * step:>7.1f}s {'#' * round(count / most * width):<{width}} {count}"
+            for i, count in enumerate(counts)]
+
+
+def report(key, group, summary, trajectory_rows):
+    weights, thresholds = json.loads(key)
+    print(f"DDA weights={weights} thresholds={thresholds}: {summary['sessions']} sessions, "
+          f"{summary['deaths']} deaths")
+    ttd = summary['time_to_death']
+    print(f"  time to death  mean={ttd['mean']:.1f}s p10={ttd['p10']:.1f} p25={ttd['p25']:.1f} "
+          f"p50={ttd['p50']:.1f} p75={ttd['p75']:.1f} p90={ttd['p90']:.1f}")
+    for line in histogram(sorted(group['death_times'])):
+        print(line)
+    shares = summary['dda_decisions']
+    print(f"  apply_dda over {summary['dda_checks']} checks: "
+          + "  ".join(f"{decision} {shares[decision]['share']:.1%}" for decision in ('easier', 'balanced', 'harder')))
+    if summary['trajectory']:
+        print(f"  {'check':>7} {'sessions':>9} {'spawn_rate':>11} {'speed_factor':>13}")
+        for i, check in enumerate(summary['trajectory'][:trajectory_rows]):
+            print(f"  {i + 1:>7} {check['sessions']:>9} {check['spawn_rate']:>11.0f} "
+                  f"{check['enemy_speed_factor']:>13.3f}")
+    for power_type, usage in summary['powerups'].items():
+        print(f"  {power_type:<6} powerups: {usage['spawned']} spawned, {usage['collected']} collected "
+              f"({usage['collected_share']:.0%})")
+    per_session = summary['per_session']
+    print(f"  per session: {per_session['spawns']:.1f} spawns ({per_session['bosses']:.1f} bosses), "
+          f"{per_session['kills']:.1f} kills, {per_session['hits']:.2f} hits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistics over telemetry logs")
+    parser.add_argument('paths', nargs='+', help="Telemetry files or directories of .jsonl files")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--split', type=int, default=SPLIT_BYTES, help="Bytes of log per job")
+    parser.add_argument('--trajectory', type=int, default=10, help="DDA checks shown in the trajectory table")
+    parser.add_argument('--out', help="Write the aggregate statistics as JSON")
+    parser.add_argument('--sessions-out', help="Write one JSON line per session")
+    args = parser.parse_args()
+
+    logs = find_logs(args.paths)
+    if not logs:
+        raise SystemExit("No telemetry logs found")
+    keep_rows = args.sessions_out is not None
+    jobs = [job + (keep_rows,) for job in plan_jobs(logs, args.split)]
+    size = sum(os.path.getsize(path) for files in logs for path in files)
+
+    start = time.perf_counter()
+    groups = {}
+    totals = {'events': 0, 'bad_lines': 0, 'orphan_events': 0, 'dropped_events': 0}
+    rows_out = open(args.sessions_out, 'w') if keep_rows else None
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for partial, rows, stats in executor.map(scan, jobs):
+            merge_groups(groups, partial)
+            for name, value in stats.items():
+                totals[name] += value
+            if rows_out is not None:
+                for row in rows:
+                    rows_out.write(json.dumps(row) + '\n')
+    if rows_out is not None:
+        rows_out.close()
+    wall = time.perf_counter() - start
+
+    sessions = sum(group['sessions'] for group in groups.values())
+    print(f"{len(logs)} logs, {size / 1e6:.1f} MB, {totals['events']} events, {sessions} sessions "
+          f"in {wall:.2f}s on {args.workers} workers ({size / 1e6 / wall:.0f} MB/s)")
+    if totals['bad_lines'] or totals['orphan_events']:
+        print(f"skipped {totals['bad_lines']} unreadable lines and {totals['orphan_events']} events "
+              f"without a session start")
+    if totals['dropped_events']:
+        print(f"telemetry dropped {totals['dropped_events']} events while logging, statistics undercount them")
+
+    results = []
+    for key, group in sorted(groups.items()):
+        summary = summarize(group)
+        weights, thresholds = json.loads(key)
+        summary.update({'weights': weights, 'thresholds': thresholds})
+        results.append(summary)
+        print()
+        report(key, group, summary, args.trajectory)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'logs': len(logs), 'bytes': size, 'events': totals['events'], 'sessions': sessions,
+                       'dropped_events': totals['dropped_events'], 'wall_seconds': wall, 'results': results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Allocation churn and GC activity of a long, high fire-rate headless session
+# with object pools enabled versus disabled.
+# Usage: python benchmarks/bench_allocations.py [--minutes 10]
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from bot import TurretBot
+from enemy import enemy_pool, powerup_pool
+from player import projectile_pool
+from simulation import GameSimulation
+
+POOLS = (projectile_pool, enemy_pool, powerup_pool)
+
+
+def run(minutes, seed, pooled, trace):
+    for pool in POOLS:
+        pool.clear()
+        pool.max_size = POOL_MAX_SIZE if pooled else 0
+        pool.created = pool.reused = 0
+
+    sim = GameSimulation(seed=seed)
+    sim.player.lives = 10 ** 9  # Keep the session alive for the whole run
+    bot = TurretBot(seed)
+
+    gc.collect()
+    collections_before = [stats['collections'] for stats in gc.get_stats()]
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    sim.run(bot, max_time=minutes * 60)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    collections = [stats['collections'] - before for stats, before in zip(gc.get_stats(), collections_before)]
+    return {
+        'elapsed': elapsed,
+        'collections': collections,
+        'peak': peak,
+        'created': sum(pool.created for pool in POOLS),
+        'reused': sum(pool.reused for pool in POOLS),
+        'score': sim.player.score,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Object pool allocation benchmark")
+    parser.add_argument('--minutes', type=float, default=10.0, help="simulated minutes")
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'time (s)':>9} {'gc gen0/1/2':>14} {'peak (KiB)':>11} {'created':>8} {'reused':>8}")
+    results = {}
+    for pooled in (False, True):
+        mode = 'pooled' if pooled else 'unpooled'
+        # Timing and GC counts without tracemalloc, memory peak in a second traced run
+        result = run(args.minutes, args.seed, pooled, trace=False)
+        result['peak'] = run(args.minutes, args.seed, pooled, trace=True)['peak']
+        results[mode] = result
+        gen = '/'.join(str(c) for c in result['collections'])
+        print(f"{mode:>8} {result['elapsed']:>9.2f} {gen:>14} {result['peak'] / 1024:>11.1f} "
+              f"{result['created']:>8} {result['reused']:>8}")
+    if results['pooled']['score'] != results['unpooled']['score']:
+        raise SystemExit("Pooling changed the simulation outcome")
+
+
+if __name__ == '__main__':
+    main()
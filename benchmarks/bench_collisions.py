@@ -0,0 +1,65 @@
+# Compares the spatial grid collision pass against the brute-force path.
+# Usage: python benchmarks/bench_collisions.py [--sizes 100 1000 10000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from config import *
+from enemy import Enemy, EnemyManager
+from player import Projectile
+
+
+def build_scene(count, seed):
+    rng = random.Random(seed)
+    manager = EnemyManager()
+    for i in range(count):
+        x = rng.uniform(-100, SCREEN_WIDTH + 100)
+        y = rng.uniform(-100, SCREEN_HEIGHT + 100)
+        manager.enemies.append(Enemy(x, y, is_boss=(i % 5 == 0)))
+    projectiles = []
+    for _ in range(max(1, count // 10)):
+        x = rng.uniform(0, SCREEN_WIDTH)
+        y = rng.uniform(0, SCREEN_HEIGHT)
+        projectiles.append(Projectile(x, y, rng.uniform(0, 6.28)))
+    player_rect = pygame.Rect(SCREEN_WIDTH // 2 - PLAYER_SIZE, SCREEN_HEIGHT - 100 - PLAYER_SIZE, PLAYER_SIZE * 2, PLAYER_SIZE * 2)
+    return manager, projectiles, player_rect
+
+
+def time_pass(method_name, count, repeats, seed):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        manager, projectiles, player_rect = build_scene(count, seed)
+        start = time.perf_counter()
+        outcome = getattr(manager, method_name)(projectiles, player_rect)
+        best = min(best, time.perf_counter() - start)
+        result = (outcome, len(manager.enemies), len(projectiles),
+                  [e.health for e in manager.enemies])
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collision broad-phase benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'enemies':>8} {'projectiles':>12} {'brute (ms)':>12} {'grid (ms)':>12} {'speedup':>8}")
+    for count in args.sizes:
+        # The brute-force pass is quadratic, keep it to a single run at large sizes
+        brute_repeats = args.repeats if count <= 1000 else 1
+        brute, brute_result = time_pass('check_collisions_brute_force', count, brute_repeats, args.seed)
+        grid, grid_result = time_pass('check_collisions', count, args.repeats, args.seed)
+        if brute_result != grid_result:
+            raise SystemExit(f"Result mismatch at {count} enemies")
+        print(f"{count:>8} {max(1, count // 10):>12} {brute * 1000:>12.2f} {grid * 1000:>12.2f} {brute / grid:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
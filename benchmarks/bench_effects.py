@@ -0,0 +1,132 @@
+# Draw calls and frame time for one scene drawn with the parametric code, the
+# sprite cache, and the sprite cache plus additive glow/trail effects.
+# Usage: python benchmarks/bench_effects.py [--projectiles 300] [--screenshots shots/]
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from config import *
+from effects import build_effects, set_effects
+from enemy import EnemyManager
+from player import Player, Projectile
+from sprites import build_sprite_cache, set_sprite_cache
+
+DRAW_FUNCTIONS = ('circle', 'polygon', 'rect', 'line', 'lines')
+
+
+class CountingSurface(pygame.Surface):
+    # Display-format canvas that counts every blit item it is handed
+    def __init__(self, size, counter):
+        super().__init__(size)
+        self.counter = counter
+
+    def blit(self, *args, **kwargs):
+        self.counter[0] += 1
+        return super().blit(*args, **kwargs)
+
+    def blits(self, blit_sequence, *args, **kwargs):
+        blit_sequence = list(blit_sequence)
+        self.counter[0] += len(blit_sequence)
+        return super().blits(blit_sequence, *args, **kwargs)
+
+
+def count_draw_calls(counter):
+    for name in DRAW_FUNCTIONS:
+        original = getattr(pygame.draw, name)
+
+        def counted(*args, _original=original, **kwargs):
+            counter[0] += 1
+            return _original(*args, **kwargs)
+        setattr(pygame.draw, name, counted)
+
+
+def build_scene(projectiles, seed):
+    rng = random.Random(seed)
+    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT - 100)
+    player.mouse_x, player.mouse_y = SCREEN_WIDTH / 2, 0
+    for i in range(projectiles):
+        projectile = Projectile(rng.uniform(50, SCREEN_WIDTH - 50), rng.uniform(50, SCREEN_HEIGHT - 50),
+                                rng.uniform(0, math.pi * 2), 2.0 if i % 4 == 0 else 1.0)
+        for _ in range(rng.randint(1, 8)):
+            projectile.update()
+        player.projectiles.append(projectile)
+    manager = EnemyManager(rng=rng)
+    for i in range(60):
+        manager.add_enemy(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT * 0.6), i % 6 == 0)
+    for enemy in manager.enemies:
+        enemy.animation_frame = rng.randint(0, 500)
+    return player, manager
+
+
+def render(screen, player, manager):
+    screen.fill(SPACE_BLACK)
+    player.draw(screen)
+    manager.draw(screen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glow and trail effects benchmark")
+    parser.add_argument('--projectiles', type=int, default=300)
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--screenshots', help="Directory to save one PNG per mode for visual comparison")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    counter = [0]
+    count_draw_calls(counter)
+    screen = CountingSurface((SCREEN_WIDTH, SCREEN_HEIGHT), counter)
+    player, manager = build_scene(args.projectiles, args.seed)
+
+    start = time.perf_counter()
+    sprites = build_sprite_cache()
+    sprite_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    effects = build_effects()
+    effects_ms = (time.perf_counter() - start) * 1000
+    print(f"Sprite cache built in {sprite_ms:.0f} ms, {len(effects)} effect sprites in {effects_ms:.0f} ms")
+    print(f"Scene: 1 player, {args.projectiles} projectiles, {len(manager.enemies)} enemies")
+
+    if args.screenshots:
+        os.makedirs(args.screenshots, exist_ok=True)
+    print(f"{'mode':<12} {'draw calls':>11} {'per projectile':>15} {'frame (ms)':>11}")
+    for mode, cache, glow in (('parametric', None, None), ('sprites', sprites, None), ('effects', sprites, effects)):
+        set_sprite_cache(cache)
+        set_effects(glow)
+        # Warm up first so sprites rasterized on demand don't count as draw calls
+        render(screen, player, manager)
+        counter[0] = 0
+        render(screen, player, manager)
+        calls = counter[0]
+        # Projectile share: the same frame without projectiles
+        saved = player.projectiles
+        player.projectiles = []
+        counter[0] = 0
+        render(screen, player, manager)
+        player.projectiles = saved
+        per_projectile = (calls - counter[0]) / max(1, args.projectiles)
+
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            render(screen, player, manager)
+        frame = (time.perf_counter() - start) / args.frames
+        print(f"{mode:<12} {calls:>11} {per_projectile:>15.1f} {frame * 1000:>11.2f}")
+        if args.screenshots:
+            path = os.path.join(args.screenshots, f"{mode}.png")
+            pygame.image.save(screen, path)
+    set_sprite_cache(None)
+    set_effects(None)
+    if args.screenshots:
+        print(f"Screenshots written to {args.screenshots}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Serial against pipelined frames (simulation of the next frame on a worker
+# thread while this one is drawn) at fixed enemy counts, rendered with the
+# sprite cache on the dummy SDL driver. Both runs must end in the same state.
+# Usage: python benchmarks/bench_pipeline.py [--enemies 250 1000] [--backends python numpy] [--frames 200]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from config import *
+from bot import TurretBot
+from effects import build_effects, set_effects
+from pipeline import RenderPipeline
+from simulation import GameSimulation
+from sprites import build_sprite_cache, set_sprite_cache
+from stats import percentile
+
+TICKS_PER_FRAME = max(1, SIM_TICK_RATE // FPS)
+
+
+class Scenario:
+    # An immortal turret bot against a population topped up to a fixed size
+    def __init__(self, backend, enemies, seed):
+        self.sim = GameSimulation(seed=seed, enemy_backend=backend, projectile_backend=backend)
+        self.sim.player.lives = 10 ** 9
+        self.policy = TurretBot(seed)
+        self.rng = random.Random(seed)
+        self.enemies = enemies
+
+    def step(self):
+        # One rendered frame of simulation, the pipeline's step callable
+        sim = self.sim
+        manager = sim.enemy_manager
+        for _ in range(self.enemies - len(manager.enemies)):
+            manager.add_enemy(self.rng.uniform(0, SCREEN_WIDTH), self.rng.choice((-ENEMY_SIZE, SCREEN_HEIGHT)),
+                              self.rng.random() < 0.1)
+        for _ in range(TICKS_PER_FRAME):
+            sim.step(self.policy(sim), 1 / SIM_TICK_RATE)
+        return None, 1.0
+
+    def fingerprint(self):
+        sim = self.sim
+        return (sim.frame, sim.player.score, sim.enemy_manager.wave_count,
+                [(round(e.x, 6), round(e.y, 6)) for e in sim.enemy_manager.enemies])
+
+
+def serial(screen, scenario, frames):
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        scenario.step()
+        screen.fill(SPACE_BLACK)
+        scenario.sim.player.draw(screen)
+        scenario.sim.enemy_manager.draw(screen)
+        pygame.display.flip()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def pipelined(screen, scenario, frames, pipeline):
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        frame = pipeline.collect(scenario.sim)
+        pipeline.submit(scenario.sim, scenario.step)
+        screen.fill(SPACE_BLACK)
+        frame.draw(screen)
+        pygame.display.flip()
+        times.append(time.perf_counter() - start)
+    pipeline.collect()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined rendering benchmark")
+    parser.add_argument('--enemies', type=int, nargs='+', default=[250, 1000])
+    parser.add_argument('--backends', nargs='+', default=['python', 'numpy'])
+    parser.add_argument('--frames', type=int, default=200, help="Measured frames per run, after 20 warm-up frames")
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    set_sprite_cache(build_sprite_cache())
+    set_effects(build_effects())
+    pipeline = RenderPipeline()
+
+    budget = 1000 / FPS
+    print(f"{os.cpu_count()} CPUs, {TICKS_PER_FRAME} ticks per frame, {budget:.1f} ms frame budget")
+    print(f"{'backend':<8} {'enemies':>8} {'serial p50':>11} {'p95':>7} {'pipelined p50':>14} {'p95':>7} "
+          f"{'speedup':>8}  same")
+    for backend in args.backends:
+        for enemies in args.enemies:
+            results = []
+            for run in (serial, pipelined):
+                scenario = Scenario(backend, enemies, args.seed)
+                extra = (pipeline,) if run is pipelined else ()
+                run(screen, scenario, 20, *extra)
+                times = sorted(run(screen, scenario, args.frames, *extra))
+                results.append((percentile(times, 50) * 1000, percentile(times, 95) * 1000, scenario.fingerprint()))
+            (serial_p50, serial_p95, serial_state), (piped_p50, piped_p95, piped_state) = results
+            print(f"{backend:<8} {enemies:>8} {serial_p50:>11.2f} {serial_p95:>7.2f} {piped_p50:>14.2f} "
+                  f"{piped_p95:>7.2f} {serial_p50 / piped_p50:>7.2f}x  {'yes' if serial_state == piped_state else 'NO'}",
+                  flush=True)
+    pipeline.close()
+
+
+if __name__ == '__main__':
+    main()
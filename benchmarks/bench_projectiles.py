@@ -0,0 +1,109 @@
+# Per-object projectiles with discrete collision versus the batched store with
+# swept collision: tick cost at high fire rates and hits missed at low tick rates.
+# Usage: python benchmarks/bench_projectiles.py [--sizes 100 1000 10000] [--enemies 200]
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from config import *
+from enemy import EnemyManager
+from player import Projectile
+from projectile_soa import ProjectileStore
+
+OFF_SCREEN_PLAYER = pygame.Rect(-1000, -1000, 1, 1)
+
+
+def build(count, enemies, seed, batched):
+    rng = random.Random(seed)
+    manager = EnemyManager(rng=rng)
+    for i in range(enemies):
+        manager.add_enemy(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), i % 5 == 0)
+    projectiles = ProjectileStore() if batched else []
+    for _ in range(count):
+        x, y, angle = rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), rng.uniform(0, math.tau)
+        if batched:
+            projectiles.add(x, y, angle)
+        else:
+            projectiles.append(Projectile(x, y, angle))
+    return manager, projectiles
+
+
+def step(manager, projectiles, dt, batched):
+    if batched:
+        projectiles.update(dt)
+    else:
+        for projectile in projectiles:
+            projectile.update(dt)
+        projectiles[:] = [p for p in projectiles if not p.is_off_screen()]
+    return manager.check_collisions(projectiles, OFF_SCREEN_PLAYER)
+
+
+def time_ticks(count, enemies, ticks, seed, batched):
+    manager, projectiles = build(count, enemies, seed, batched)
+    dt = 1 / SIM_TICK_RATE
+    start = time.perf_counter()
+    kills = 0
+    for _ in range(ticks):
+        kills += step(manager, projectiles, dt, batched)[0]
+    return (time.perf_counter() - start) / ticks, kills
+
+
+def missed_hits(shots, dt, seed, batched):
+    # Boosted projectiles fired straight at a lone enemy from random offsets;
+    # count the shots whose path crossed it without a hit
+    rng = random.Random(seed)
+    hits = 0
+    for _ in range(shots):
+        manager = EnemyManager()
+        manager.add_enemy(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        start_y = SCREEN_HEIGHT - rng.uniform(0, 60)
+        x = SCREEN_WIDTH / 2 + rng.uniform(-ENEMY_SIZE + 1, ENEMY_SIZE - 1)
+        if batched:
+            projectiles = ProjectileStore()
+            projectiles.add(x, start_y, -math.pi / 2, 2.0)
+        else:
+            projectiles = [Projectile(x, start_y, -math.pi / 2, 2.0)]
+        for _ in range(int(2 / dt)):
+            kills = step(manager, projectiles, dt, batched)[0]
+            if kills or not len(projectiles):
+                break
+        hits += kills
+    return shots - hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched projectile benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--enemies', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--shots', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"Tick cost with {args.enemies} enemies (update + collisions)")
+    print(f"{'projectiles':>12} {'objects (ms)':>13} {'batched (ms)':>13} {'speedup':>8}")
+    for count in args.sizes:
+        objects, _ = time_ticks(count, args.enemies, args.ticks, args.seed, False)
+        batched, _ = time_ticks(count, args.enemies, args.ticks, args.seed, True)
+        print(f"{count:>12} {objects * 1000:>13.3f} {batched * 1000:>13.3f} {objects / batched:>7.1f}x")
+
+    print()
+    print(f"Missed hits out of {args.shots} boosted shots aimed through an enemy")
+    print(f"{'tick rate':>10} {'step (px)':>10} {'discrete':>9} {'swept':>6}")
+    for rate in (120, 60, 30, 15, 10):
+        dt = 1 / rate
+        discrete = missed_hits(args.shots, dt, args.seed, False)
+        swept = missed_hits(args.shots, dt, args.seed, True)
+        if swept:
+            raise SystemExit(f"Swept collision missed {swept} shots at {rate} Hz")
+        print(f"{rate:>10} {PROJECTILE_SPEED * 2 * BASE_FPS * dt:>10.1f} {discrete:>9} {swept:>6}")
+
+
+if __name__ == '__main__':
+    main()
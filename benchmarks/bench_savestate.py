@@ -0,0 +1,78 @@
+# Size and save/restore time of savestate blobs at 10, 1k and 10k enemies,
+# checking that a restored game plays on exactly like the original.
+# Usage: python benchmarks/bench_savestate.py [--counts 10 1000 10000] [--repeat 20]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from savestate import fork, load_state, save_state
+from simulation import FrameInput, GameSimulation
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def populated(count, backend, seed):
+    sim = GameSimulation(seed=seed, enemy_backend=backend, projectile_backend=backend)
+    sim.player.lives = 10 ** 6
+    rng = random.Random(seed)
+    for _ in range(count):
+        sim.enemy_manager.add_enemy(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), rng.random() < 0.2)
+    # A few ticks so velocities, flashes, projectiles and trails are all live
+    for _ in range(10):
+        sim.step(FrameInput(aim_x=SCREEN_WIDTH / 2, aim_y=0, fire=True), 1 / SIM_TICK_RATE)
+    return sim
+
+
+def fingerprint(sim):
+    manager = sim.enemy_manager
+    return (sim.frame, sim.player.score, sim.player.lives, manager.wave_count, manager.spawn_rate,
+            [(e.x, e.y, e.health) for e in manager.enemies], [(p.x, p.y) for p in sim.player.projectiles])
+
+
+def plays_on_identically(sim, ticks=30):
+    copy = fork(sim)
+    inputs = FrameInput(left=True, aim_x=100, aim_y=50, fire=True)
+    for _ in range(ticks):
+        sim.step(inputs, 1 / SIM_TICK_RATE)
+        copy.step(inputs, 1 / SIM_TICK_RATE)
+    return fingerprint(sim) == fingerprint(copy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game state snapshot benchmark")
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--backends', nargs='+', default=['python', 'numpy'])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'enemies':>8} {'bytes':>9} {'B/enemy':>8} {'save ms':>8} {'restore ms':>11} "
+          f"{'fork ms':>8}  same")
+    for backend in args.backends:
+        for count in args.counts:
+            sim = populated(count, backend, args.seed)
+            blob = save_state(sim)
+            target = fork(sim)
+            save = median_ms(lambda: save_state(sim), args.repeat)
+            restore = median_ms(lambda: load_state(blob, target), args.repeat)
+            forked = median_ms(lambda: load_state(blob), args.repeat)
+            same = save_state(load_state(blob)) == blob and plays_on_identically(sim)
+            enemies = len(sim.enemy_manager.enemies)
+            print(f"{backend:<8} {enemies:>8} {len(blob):>9} {len(blob) / max(1, enemies):>8.1f} {save:>8.3f} "
+                  f"{restore:>11.3f} {forked:>8.3f}  {'yes' if same else 'NO'}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
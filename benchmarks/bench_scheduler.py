@@ -0,0 +1,81 @@
+# Per-tick cost of firing due events with many timers pending, against
+# polling every timer each tick, and how many spawns a long frame fires.
+# Usage: python benchmarks/bench_scheduler.py [--pending 0 1000 100000] [--ticks 2000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from config import *
+from enemy import EnemyManager
+from scheduler import Scheduler
+from simulation import SimClock
+from waves import SpawnConfig
+
+TICK_MS = 1000 / SIM_TICK_RATE
+
+
+def scheduled(pending, ticks, rng):
+    # One event falls due every tick, the rest sit far in the future
+    events = Scheduler()
+    events.on('tick', lambda time: events.schedule(time + TICK_MS, 'tick'))
+    events.on('timer', lambda time: None)
+    for _ in range(pending):
+        events.schedule(rng.uniform(1e9, 2e9), 'timer')
+    events.schedule(0, 'tick')
+    start = time.perf_counter()
+    for tick in range(ticks):
+        events.run(tick * TICK_MS)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def polled(pending, ticks, rng):
+    # Every timer checked every tick, as update() used to for the spawn and boost
+    timers = [rng.uniform(1e9, 2e9) for _ in range(pending)] + [0.0]
+    start = time.perf_counter()
+    for tick in range(ticks):
+        now = tick * TICK_MS
+        for i, due in enumerate(timers):
+            if now >= due:
+                timers[i] = due + TICK_MS
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def spawns_in_frame(frame_ms, spawn_rate):
+    clock = SimClock()
+    manager = EnemyManager(clock=clock, rng=random.Random(1), spawn_config=SpawnConfig(initial_spawn_rate=spawn_rate))
+    manager.update(0)
+    before = manager.enemies_spawned
+    clock.advance(frame_ms / 1000)
+    manager.update(0)
+    return manager.enemies_spawned - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event scheduler benchmark")
+    parser.add_argument('--pending', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--spawn-rate', type=int, default=50, help="ms between spawns for the long frame test")
+    parser.add_argument('--frames', type=float, nargs='+', default=[TICK_MS, 100, 250, 1000],
+                        help="Frame lengths in ms for the long frame test")
+    args = parser.parse_args()
+
+    print(f"{'pending':>8} {'scheduler us/tick':>18} {'polling us/tick':>16}")
+    for pending in args.pending:
+        heap = scheduled(pending, args.ticks, random.Random(pending))
+        poll = polled(pending, min(args.ticks, max(20, 2000000 // max(1, pending))), random.Random(pending))
+        print(f"{pending:>8} {heap:>18.2f} {poll:>16.2f}", flush=True)
+
+    print()
+    print(f"Spawns every {args.spawn_rate} ms, at most {SPAWNS_PER_TICK} caught up on per tick")
+    print(f"{'frame ms':>9} {'due':>5} {'fired':>6}")
+    for frame_ms in args.frames:
+        print(f"{frame_ms:>9.1f} {int(frame_ms // args.spawn_rate):>5} {spawns_in_frame(frame_ms, args.spawn_rate):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# Per-frame cost of enemy separation steering versus enemy count for both
+# backends, checked against an O(n^2) reference, plus how much it thins the blob.
+# Usage: python benchmarks/bench_separation.py [--sizes 250 1000 4000]
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from enemy import Enemy, EnemyManager
+from enemy_soa import VectorEnemyManager
+
+
+def build(manager_cls, count, seed, separation, spread=1.0):
+    rng = random.Random(seed)
+    manager = manager_cls()
+    manager.enemies = [Enemy(SCREEN_WIDTH / 2 + rng.uniform(-1, 1) * SCREEN_WIDTH / 2 * spread,
+                             SCREEN_HEIGHT / 2 + rng.uniform(-1, 1) * SCREEN_HEIGHT / 2 * spread,
+                             is_boss=(i % 5 == 0)) for i in range(count)]
+    manager.separation = separation
+    manager.set_player_pos(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    return manager
+
+
+def reference_pushes(enemies):
+    pushes = []
+    for a in enemies:
+        push_x = push_y = 0.0
+        for b in enemies:
+            dx, dy = a.x - b.x, a.y - b.y
+            spacing = (2 if a.is_boss else 1) * ENEMY_SIZE + (2 if b.is_boss else 1) * ENEMY_SIZE
+            dist_sq = dx * dx + dy * dy
+            if 0 < dist_sq < spacing * spacing:
+                distance = math.sqrt(dist_sq)
+                push_x += dx * (1 - distance / spacing) / distance
+                push_y += dy * (1 - distance / spacing) / distance
+        pushes.append((push_x, push_y))
+    return pushes
+
+
+def check_pushes(count, seed, tolerance=1e-9):
+    # Dense scene so most enemies have several neighbours
+    scalar = build(EnemyManager, count, seed, True, spread=0.3)
+    vector = build(VectorEnemyManager, count, seed, True, spread=0.3)
+    expected = reference_pushes(scalar.enemies)
+    grid = scalar.separation_pushes()
+    push_x, push_y = vector.store.separation()
+    worst = 0.0
+    for (ex, ey), (gx, gy), vx, vy in zip(expected, grid, push_x.tolist(), push_y.tolist()):
+        worst = max(worst, abs(ex - gx), abs(ey - gy), abs(ex - vx), abs(ey - vy))
+    if worst > tolerance:
+        raise SystemExit(f"Separation mismatch against the O(n^2) reference: {worst:.3g}")
+    return worst
+
+
+def time_frames(manager, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        manager.update_enemies(1 / FPS)
+    return (time.perf_counter() - start) / frames
+
+
+def overlap(manager):
+    # Overlapping enemy pairs, the blob the separation term is meant to break up
+    rects = [enemy.get_rect() for enemy in manager.enemies]
+    return sum(len(rect.collidelistall(rects)) - 1 for rect in rects) // 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enemy separation steering benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 1000, 4000])
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    worst = check_pushes(400, args.seed)
+    print(f"Grid and NumPy pushes match the O(n^2) reference (max deviation {worst:.3g})")
+
+    print(f"{'enemies':>8} {'python off':>11} {'python on':>10} {'numpy off':>10} {'numpy on':>9}  (ms/frame)")
+    for count in args.sizes:
+        times = []
+        for manager_cls in (EnemyManager, VectorEnemyManager):
+            frames = args.frames if manager_cls is VectorEnemyManager else max(1, args.frames // 5)
+            for separation in (False, True):
+                times.append(time_frames(build(manager_cls, count, args.seed, separation), frames))
+        print(f"{count:>8} " + " ".join(f"{t * 1000:>10.2f}" for t in times))
+
+    print()
+    count = 300
+    for separation in (False, True):
+        manager = build(VectorEnemyManager, count, args.seed, separation)
+        for _ in range(10 * FPS):
+            manager.update_enemies(1 / FPS)
+        print(f"separation {'on ' if separation else 'off'}: {overlap(manager):>6} overlapping pairs "
+              f"among {len(manager.enemies)} enemies after 10 s of chasing")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Per-entity draw time for the parametric draw code versus the sprite cache.
+# Usage: python benchmarks/bench_sprites.py [--count 500]
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from config import *
+from enemy import Enemy, PowerUp
+from player import Player, Projectile
+from sprites import build_sprite_cache
+
+
+def build_entities(kind, count, rng):
+    entities = []
+    for i in range(count):
+        x = rng.uniform(0, SCREEN_WIDTH)
+        y = rng.uniform(0, SCREEN_HEIGHT)
+        if kind == 'enemy':
+            entity = Enemy(x, y)
+        elif kind == 'boss':
+            entity = Enemy(x, y, is_boss=True)
+            entity.health = rng.randint(1, 3)
+        elif kind == 'powerup':
+            entity = PowerUp(int(x), int(y), 0, rng.choice(['heal', 'speed']))
+        elif kind == 'player':
+            entity = Player(x, y)
+            entity.mouse_x, entity.mouse_y = rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)
+        else:
+            entity = Projectile(x, y, rng.uniform(0, math.pi * 2))
+            for _ in range(6):
+                entity.update()
+        if kind != 'projectile':
+            entity.animation_frame = rng.randint(0, 1000)
+        entities.append(entity)
+    return entities
+
+
+def time_parametric(screen, entities, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        for entity in entities:
+            entity.draw(screen)
+    return (time.perf_counter() - start) / (frames * len(entities))
+
+
+def time_sprites(screen, entities, frames, sprites):
+    # Same batching as EnemyManager.draw: one blits call per frame
+    start = time.perf_counter()
+    for _ in range(frames):
+        batch = []
+        for entity in entities:
+            if isinstance(entity, Player):
+                batch.extend(entity.ship_blits(sprites))
+            else:
+                batch.extend(entity.sprite_blits(sprites))
+        screen.blits(batch, doreturn=False)
+    return (time.perf_counter() - start) / (frames * len(entities))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sprite cache draw benchmark")
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    start = time.perf_counter()
+    sprites = build_sprite_cache()
+    print(f"Pre-rasterized {len(sprites)} sprites in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'entity':>10} {'parametric (us)':>16} {'sprites (us)':>13} {'speedup':>8}")
+    for kind in ('enemy', 'boss', 'powerup', 'player', 'projectile'):
+        entities = build_entities(kind, args.count, random.Random(args.seed))
+        parametric = time_parametric(screen, entities, args.frames)
+        cached = time_sprites(screen, entities, args.frames, sprites)
+        print(f"{kind:>10} {parametric * 1e6:>16.2f} {cached * 1e6:>13.2f} {parametric / cached:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
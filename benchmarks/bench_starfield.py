@@ -0,0 +1,77 @@
+# Starfield update + draw time per frame: the original per-star dict loop
+# against the vectorized Starfield, plus a pixel parity check.
+# Usage: python benchmarks/bench_starfield.py [--sizes 100 1000 10000 50000]
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pygame
+from config import *
+from starfield import Starfield
+
+
+def legacy_stars(starfield):
+    return [{'pos': pygame.math.Vector2(x, y), 'speed': speed, 'size': int(size)}
+            for x, y, speed, size in zip(starfield.x, starfield.y, starfield.speed, starfield.size)]
+
+
+def legacy_draw(screen, stars, dt, ticks):
+    # The per-star loop main.py used before the Starfield class
+    for star in stars:
+        star['pos'].y += star['speed'] * 60 * dt
+        if star['pos'].y > SCREEN_HEIGHT:
+            star['pos'].y = 0
+            star['pos'].x = random.randint(0, SCREEN_WIDTH)
+        brightness = 150 + int(50 * math.sin(ticks * 0.005 + star['pos'].x))
+        color = (brightness, brightness, brightness)
+        pygame.draw.circle(screen, color, (int(star['pos'].x), int(star['pos'].y)), star['size'])
+
+
+def check_parity(screen):
+    starfield = Starfield(500, seed=1)
+    stars = legacy_stars(starfield)
+    screen.fill(SPACE_BLACK)
+    legacy_draw(screen, stars, 0, 1234)
+    expected = pygame.surfarray.array3d(screen)
+    screen.fill(SPACE_BLACK)
+    starfield.draw(screen, 1234)
+    actual = pygame.surfarray.array3d(screen)
+    # Overlapping stars may be drawn in a different order, allow a handful of pixels
+    return int(np.count_nonzero((expected != actual).any(axis=2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Starfield benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f"Pixels differing from the draw.circle path at 500 stars: {check_parity(screen)}")
+
+    print(f"{'stars':>8} {'legacy (ms)':>12} {'vector (ms)':>12} {'speedup':>8}")
+    for count in args.sizes:
+        starfield = Starfield(count, seed=1)
+        stars = legacy_stars(starfield)
+        legacy_frames = max(1, args.frames // max(1, count // 1000))
+        start = time.perf_counter()
+        for frame in range(legacy_frames):
+            legacy_draw(screen, stars, 1 / FPS, frame * 16)
+        legacy = (time.perf_counter() - start) / legacy_frames
+        start = time.perf_counter()
+        for frame in range(args.frames):
+            starfield.update_and_draw(screen, 1 / FPS, frame * 16)
+        vector = (time.perf_counter() - start) / args.frames
+        print(f"{count:>8} {legacy * 1000:>12.3f} {vector * 1000:>12.3f} {legacy / vector:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
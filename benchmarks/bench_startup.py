@@ -0,0 +1,80 @@
+# Import time of the entity modules and time to the first presented frame of
+# main.py, each measured in fresh interpreters.
+# Usage: python benchmarks/bench_startup.py [--runs 5]
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import pygame
+after_pygame = time.perf_counter()
+import {module}
+print((after_pygame - start) * 1000, (time.perf_counter() - after_pygame) * 1000)
+"""
+
+# Entity modules and a short simulated game without any display or driver
+HEADLESS_PROBE = """
+import enemy, player
+from simulation import GameSimulation
+from bot import BOTS
+sim = GameSimulation(seed=1)
+sim.run(BOTS['turret'](1), max_time=5)
+print(sim.frame)
+"""
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def run(args, env=None):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    print(f"Import time, median of {args.runs} fresh interpreters")
+    print(f"{'module':<12} {'pygame (ms)':>12} {'module on top (ms)':>19}")
+    for module in ('config', 'enemy', 'player', 'simulation'):
+        samples = [tuple(map(float, run(['-c', IMPORT_PROBE.format(module=module)], env).stdout.split()))
+                   for _ in range(args.runs)]
+        print(f"{module:<12} {median(s[0] for s in samples):>12.1f} {median(s[1] for s in samples):>19.1f}")
+
+    print()
+    print(f"main.py startup, median of {args.runs} runs (ms)")
+    fields = ('imports', 'first frame', 'assets ready')
+    samples = []
+    walls = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = run(['main.py', '--startup-report'], env).stdout
+        walls.append((time.perf_counter() - start) * 1000)
+        match = re.search(r"imports (\d+) ms, first frame (\d+) ms, assets ready (\d+) ms", output)
+        if match is None:
+            raise SystemExit(f"main.py printed no startup report:\n{output}")
+        samples.append(tuple(int(value) for value in match.groups()))
+    for i, name in enumerate(fields):
+        print(f"  {name:<14} {median(s[i] for s in samples):>6}")
+    print(f"  {'process wall':<14} {median(walls):>6.0f}  (interpreter start to exit)")
+
+    # No video driver and no display at all
+    headless = {name: value for name, value in os.environ.items() if name not in ('DISPLAY', 'SDL_VIDEODRIVER')}
+    frames = run(['-c', HEADLESS_PROBE], headless).stdout.split()[-1]
+    print()
+    print(f"enemy/player imported and {frames} simulation ticks run with no display")
+
+
+if __name__ == '__main__':
+    main()
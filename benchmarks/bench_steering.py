@@ -0,0 +1,82 @@
+# Checks the NumPy enemy backend against the scalar Enemy.arrive path and
+# times one update_enemies pass at increasing enemy counts.
+# Usage: python benchmarks/bench_steering.py [--sizes 1000 10000 50000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from enemy import Enemy, EnemyManager
+from enemy_soa import VectorEnemyManager
+
+
+def build_managers(count, seed, speed_factor):
+    rng = random.Random(seed)
+    enemies = []
+    for i in range(count):
+        x = rng.uniform(-50, SCREEN_WIDTH + 50)
+        y = rng.uniform(-50, SCREEN_HEIGHT + 50)
+        enemies.append(Enemy(x, y, is_boss=(i % 5 == 0)))
+    scalar = EnemyManager()
+    scalar.enemies = enemies
+    vector = VectorEnemyManager()
+    vector.enemies = enemies
+    for manager in (scalar, vector):
+        manager.enemy_speed_factor = speed_factor
+        # Separation has its own benchmark, this one checks the arrive backends
+        manager.separation = False
+    return scalar, vector
+
+
+def check_parity(count, steps, seed, tolerance=1e-6):
+    rng = random.Random(seed)
+    worst = 0.0
+    for speed_factor in (0.7, 1.0, 2.0):
+        scalar, vector = build_managers(count, seed, speed_factor)
+        for _ in range(steps):
+            target = (rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+            dt = rng.uniform(1 / 120, 1 / 30)
+            for manager in (scalar, vector):
+                manager.set_player_pos(*target)
+                manager.update_enemies(dt)
+            if len(scalar.enemies) != len(vector.enemies):
+                raise SystemExit("Parity failure: culling differs")
+            for a, b in zip(scalar.enemies, vector.enemies):
+                worst = max(worst, abs(a.x - b.x), abs(a.y - b.y), abs(a.vel_x - b.vel_x), abs(a.vel_y - b.vel_y))
+    if worst > tolerance:
+        raise SystemExit(f"Parity failure: max deviation {worst:.3g}")
+    return worst
+
+
+def time_update(manager, steps):
+    start = time.perf_counter()
+    for step in range(steps):
+        manager.set_player_pos(SCREEN_WIDTH / 2 + step % 50, SCREEN_HEIGHT / 2)
+        manager.update_enemies(1 / FPS)
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enemy steering backend benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--steps', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    worst = check_parity(500, 300, args.seed)
+    print(f"Parity OK over 300 steps (max deviation {worst:.3g})")
+
+    print(f"{'enemies':>8} {'scalar (ms)':>12} {'numpy (ms)':>12} {'speedup':>8}")
+    for count in args.sizes:
+        scalar, vector = build_managers(count, args.seed, 1.0)
+        scalar_time = time_update(scalar, max(1, args.steps // 10))
+        vector_time = time_update(vector, args.steps)
+        print(f"{count:>8} {scalar_time * 1000:>12.2f} {vector_time * 1000:>12.2f} {scalar_time / vector_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# Local load generator for the multiplayer server. Bot clients connect over
+# localhost sockets, decode every snapshot and send input like a player would.
+# For each player and enemy count it reports the server's tick cost and the
+# bandwidth each client receives.
+# Usage: python benchmarks/loadgen.py [--players 1 4 16] [--enemies 0 250 1000] [--seconds 5]
+#        python benchmarks/loadgen.py --connect 127.0.0.1:5555 --players 8
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from net import NetClient, encode_delta, world_state
+from server import GameServer
+from simulation import FrameInput, MultiplayerSimulation
+
+INPUT_RATE = 30  # Input messages per second per bot
+
+class BotClient:
+    # Kites away from enemies that come close, otherwise wanders, and always
+    # shoots at the nearest one
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.net = NetClient()
+        self.direction = (False, False, False, False)
+        self.frames_left = 0
+
+    def policy(self):
+        q = NET_POSITION_SCALE
+        state = self.net.latest()
+        me = state['players'].get(self.net.player_id) if state is not None else None
+        if me is None:
+            return FrameInput()
+        x, y = me[0] / q, me[1] / q
+        target = None
+        best = float('inf')
+        for values in state['enemies'].values():
+            dist = (values[0] / q - x) ** 2 + (values[1] / q - y) ** 2
+            if dist < best:
+                target = values
+                best = dist
+        if self.frames_left <= 0:
+            self.direction = tuple(self.rng.random() < 0.3 for _ in range(4))
+            self.frames_left = self.rng.randint(8, 24)
+        self.frames_left -= 1
+        if target is None:
+            left, right, up, down = self.direction
+            return FrameInput(left, right, up, down, x, y - 100, False)
+        tx, ty = target[0] / q, target[1] / q
+        if best < 150 ** 2:
+            left, right, up, down = tx > x, tx < x, ty > y, ty < y
+        else:
+            left, right, up, down = self.direction
+        return FrameInput(left, right, up, down, tx, ty, True)
+
+    async def run(self, host, port, stop):
+        await self.net.connect(host, port)
+        receiver = asyncio.ensure_future(self.net.receive())
+        while not stop.is_set():
+            self.net.send_input(self.policy())
+            await asyncio.sleep(1 / INPUT_RATE)
+        receiver.cancel()
+        await self.net.close()
+
+def enemy_count(manager):
+    store = getattr(manager, 'store', None)
+    return store.count if store is not None else len(manager.enemies)
+
+class FilledServer(GameServer):
+    # Tops the population up to a fixed enemy count before every tick, so a
+    # run measures one population size
+    def __init__(self, sim, enemies, **kwargs):
+        super().__init__(sim, **kwargs)
+        self.enemies = enemies
+
+    def tick(self):
+        manager = self.sim.enemy_manager
+        now = self.sim.clock.get_ticks()
+        for _ in range(self.enemies - enemy_count(manager)):
+            manager.spawn_enemy(now)
+        super().tick()
+
+async def measure(players, enemies, args):
+    sim = MultiplayerSimulation(seed=args.seed, enemy_backend=args.backend)
+    server = FilledServer(sim, enemies)
+    port = await server.start('127.0.0.1', 0)
+    stop = asyncio.Event()
+    bots = [BotClient(args.seed + i) for i in range(players)]
+    tasks = [asyncio.ensure_future(bot.run('127.0.0.1', port, stop)) for bot in bots]
+
+    # Let everyone connect and the population fill, then measure from clean counters
+    await server.run(1.0)
+    server.step_times.clear()
+    server.snapshot_times.clear()
+    ticks = server.ticks
+    received = [bot.net.bytes_received for bot in bots]
+    snapshots = [bot.net.snapshots for bot in bots]
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await server.run(args.seconds)
+    wall = loop.time() - start
+    server_seconds = (server.ticks - ticks) / server.tick_rate
+
+    stats = server.stats()
+    per_client = [(bot.net.bytes_received - before) / server_seconds for bot, before in zip(bots, received)]
+    per_snapshot = [(bot.net.bytes_received - before) / max(1, bot.net.snapshots - count)
+                    for bot, before, count in zip(bots, received, snapshots)]
+    full = len(encode_delta(world_state(sim)))
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await server.stop()
+    tick_ms = stats['step_p50_ms'] + stats['snapshot_p50_ms'] / server.snapshot_interval
+    return {
+        'players': players,
+        'enemies': enemy_count(sim.enemy_manager),
+        'step_p50_ms': stats['step_p50_ms'],
+        'step_p95_ms': stats['step_p95_ms'],
+        'snapshot_p95_ms': stats['snapshot_p95_ms'],
+        'tick_ms': tick_ms,
+        'tick_rate': (server.ticks - ticks) / wall,
+        'client_kib_s': sum(per_client) / len(per_client) / 1024,
+        'snapshot_bytes': sum(per_snapshot) / len(per_snapshot),
+        'full_snapshot_bytes': full,
+    }
+
+async def external(host, port, args):
+    stop = asyncio.Event()
+    bots = [BotClient(args.seed + i) for i in range(args.players[0])]
+    tasks = [asyncio.ensure_future(bot.run(host, port, stop)) for bot in bots]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    for i, bot in enumerate(bots):
+        print(f"bot {i:>3}  {bot.net.bytes_received / args.seconds / 1024:8.1f} KiB/s  "
+              f"{bot.net.snapshots} snapshots, {bot.net.full_snapshots} full")
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer server load generator")
+    parser.add_argument('--players', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--enemies', type=int, nargs='+', default=[0, 250, 1000])
+    parser.add_argument('--seconds', type=float, default=5.0, help="Measured wall seconds per case")
+    parser.add_argument('--backend', default=ENEMY_BACKEND, choices=['python', 'numpy'], help="Enemy backend")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--connect', metavar='HOST:PORT',
+                        help="Run --players bots against a running server instead")
+    parser.add_argument('--out', help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        asyncio.run(external(host, int(port), args))
+        return
+
+    print(f"backend={args.backend}, {NET_TICK_RATE} ticks/s, {NET_SNAPSHOT_RATE} snapshots/s, "
+          f"{args.seconds:.0f} s per case")
+    print(f"{'players':>7} {'enemies':>7} {'step p50':>9} {'step p95':>9} {'snap p95':>9} {'tick ms':>8} "
+          f"{'ticks/s':>8} {'KiB/s/client':>13} {'B/snapshot':>11} {'full B':>8}")
+    results = []
+    for enemies in args.enemies:
+        for players in args.players:
+            result = asyncio.run(measure(players, enemies, args))
+            results.append(result)
+            print(f"{result['players']:>7} {result['enemies']:>7} {result['step_p50_ms']:>9.2f} "
+                  f"{result['step_p95_ms']:>9.2f} {result['snapshot_p95_ms']:>9.2f} {result['tick_ms']:>8.2f} "
+                  f"{result['tick_rate']:>8.1f} {result['client_kib_s']:>13.2f} {result['snapshot_bytes']:>11.0f} "
+                  f"{result['full_snapshot_bytes']:>8}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# Ramps the population with the 'stress' spawn preset until the frame budget is
+# blown, then reports the largest entity count each subsystem sustained within it.
+# Usage: python benchmarks/stress.py [--backend numpy] [--budget-ms 16.7] [--set burst=8]
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from config import *
+from effects import build_effects, set_effects
+from profiler import profiler
+from simulation import FrameInput, GameSimulation
+from sprites import build_sprite_cache, set_sprite_cache
+from stats import percentile
+from waves import add_spawn_arguments, spawn_config_from_args
+
+SUBSYSTEMS = ('player', 'enemies', 'collisions', 'render')
+
+
+def sweep_fire(sim):
+    angle = sim.frame / SIM_TICK_RATE * math.pi
+    player = sim.player
+    return FrameInput(aim_x=player.x + math.cos(angle) * 200, aim_y=player.y + math.sin(angle) * 200, fire=True)
+
+
+def run_frame(sim, screen, ticks, dt):
+    # Seconds per subsystem for one rendered frame of `ticks` simulation steps
+    profiler.begin_frame()
+    for _ in range(ticks):
+        sim.step(sweep_fire(sim), dt)
+    times = {name: profiler.frame_times.get(name, 0.0) for name in SUBSYSTEMS[:-1]}
+    start = time.perf_counter()
+    screen.fill(SPACE_BLACK)
+    sim.player.draw(screen)
+    sim.enemy_manager.draw(screen)
+    pygame.display.flip()
+    times['render'] = time.perf_counter() - start
+    times['frame'] = sum(times.values())
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entity count stress ramp")
+    parser.add_argument('--backend', default=ENEMY_BACKEND, choices=['python', 'numpy'],
+                        help="Enemy and projectile backend")
+    parser.add_argument('--budget-ms', type=float, default=1000 / FPS)
+    parser.add_argument('--window', type=int, default=30, help="Frames per measurement window")
+    parser.add_argument('--overrun', type=float, default=3.0,
+                        help="Stop once the frame p95 passes this multiple of the budget")
+    parser.add_argument('--max-entities', type=int, default=20000)
+    parser.add_argument('--stall', type=int, default=10,
+                        help="Stop if the population has not grown for this many windows")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--out', help="Write the windows and limits as JSON")
+    add_spawn_arguments(parser)
+    parser.set_defaults(preset='stress')
+    args = parser.parse_args()
+    spawn_config = spawn_config_from_args(parser, args)
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if USE_SPRITE_CACHE:
+        set_sprite_cache(build_sprite_cache())
+        if USE_GLOW_EFFECTS:
+            set_effects(build_effects())
+    profiler.enabled = True
+
+    sim = GameSimulation(seed=args.seed, enemy_backend=args.backend, projectile_backend=args.backend,
+                         spawn_config=spawn_config)
+    sim.player.lives = 10 ** 9  # Only the frame budget ends the run
+    ticks = max(1, SIM_TICK_RATE // FPS)
+    dt = 1 / SIM_TICK_RATE
+    budget = args.budget_ms / 1000
+
+    print(f"backend={args.backend} budget={args.budget_ms:.1f} ms, spawn settings {spawn_config.to_dict()}")
+    print(f"{'enemies':>8} {'projectiles':>12} " + " ".join(f"{name:>10}" for name in SUBSYSTEMS + ('frame',))
+          + "  (p95 ms)")
+    windows = []
+    # Largest population whose window p95 fit the budget, per subsystem
+    sustained = {name: 0 for name in SUBSYSTEMS + ('frame',)}
+    exceeded = set()
+    over = dict.fromkeys(sustained, 0)
+    peak = stalled = 0
+    while True:
+        samples = [run_frame(sim, screen, ticks, dt) for _ in range(args.window)]
+        enemies = len(sim.enemy_manager.enemies)
+        projectiles = len(sim.player.projectiles)
+        window = {name: percentile(sorted(sample[name] for sample in samples), 95)
+                  for name in SUBSYSTEMS + ('frame',)}
+        windows.append({'enemies': enemies, 'projectiles': projectiles,
+                        'p95_ms': {name: seconds * 1000 for name, seconds in window.items()}})
+        print(f"{enemies:>8} {projectiles:>12} " + " ".join(f"{window[name] * 1000:>10.2f}" for name in window))
+        for name, seconds in window.items():
+            # Two windows over budget in a row, so one noisy window doesn't end a subsystem's ramp
+            over[name] = over[name] + 1 if seconds > budget else 0
+            if over[name] >= 2:
+                exceeded.add(name)
+            elif seconds <= budget and name not in exceeded:
+                sustained[name] = enemies + projectiles
+        if window['frame'] > budget * args.overrun or enemies + projectiles >= args.max_entities:
+            break
+        stalled = stalled + 1 if enemies + projectiles <= peak else 0
+        peak = max(peak, enemies + projectiles)
+        if stalled >= args.stall:
+            print(f"Population stopped growing at {peak}; raise the spawn rate with --set initial_spawn_rate=...")
+            break
+
+    print()
+    print(f"Largest population sustained within {args.budget_ms:.1f} ms (p95 over {args.window} frames)")
+    for name, count in sustained.items():
+        note = "" if name in exceeded else "  (never exceeded; ramp stopped first)"
+        print(f"  {name:<11} {count:>7} entities{note}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'backend': args.backend, 'budget_ms': args.budget_ms, 'spawn': spawn_config.to_dict(),
+                       'windows': windows,
+                       'sustained': {name: {'entities': count, 'exceeded': name in exceeded}
+                                     for name, count in sustained.items()}}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+# Named, reproducible scenarios timed as three phases (simulation step, collisions,
+# render) on the dummy SDL driver. Results are JSON; compare flags regressions.
+# Usage: python benchmarks/suite.py run [--scenarios chase-1k hud-only] [--scale 0.1] [--out results.json]
+#        python benchmarks/suite.py run --baseline baseline.json
+#        python benchmarks/suite.py compare baseline.json results.json [--tolerance 0.15]
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from config import *
+from bot import TurretBot
+from profiler import profiler
+from simulation import FrameInput, GameSimulation
+from sprites import build_sprite_cache, set_sprite_cache
+from starfield import Starfield
+from stats import percentile
+from text_cache import TextCache
+
+PHASES = ('sim', 'collisions', 'render')
+WARMUP_FRAMES = 30
+SCHEMA = 1
+
+
+class SimScenario:
+    # A GameSimulation with an immortal player, stepped SIM_TICK_RATE / BASE_FPS
+    # ticks per rendered frame. Collision time comes from the step's profiler scope
+    def __init__(self, seed, policy, enemies=0, bosses=False, speed_factor=None):
+        self.sim = GameSimulation(seed=seed)
+        self.sim.player.lives = 10 ** 9
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.enemies = enemies
+        self.bosses = bosses
+        self.speed_factor = speed_factor
+        self.ticks = max(1, SIM_TICK_RATE // BASE_FPS)
+        self.dt = 1 / SIM_TICK_RATE
+
+    def top_up(self):
+        # Keep the population at its target; not part of the timed phases
+        manager = self.sim.enemy_manager
+        if self.speed_factor is not None:
+            manager.enemy_speed_factor = self.speed_factor
+        for _ in range(self.enemies - len(manager.enemies)):
+            if self.rng.random() < 0.5:
+                x, y = self.rng.uniform(0, SCREEN_WIDTH), self.rng.choice((-ENEMY_SIZE, SCREEN_HEIGHT + ENEMY_SIZE))
+            else:
+                x, y = self.rng.choice((-ENEMY_SIZE, SCREEN_WIDTH + ENEMY_SIZE)), self.rng.uniform(0, SCREEN_HEIGHT)
+            manager.add_enemy(x, y, self.bosses)
+
+    def tick(self):
+        self.top_up()
+        profiler.begin_frame()
+        start = time.perf_counter()
+        for _ in range(self.ticks):
+            self.sim.step(self.policy(self.sim), self.dt)
+        total = time.perf_counter() - start
+        collisions = profiler.frame_times.get('collisions', 0.0)
+        return total - collisions, collisions
+
+    def render(self, screen):
+        screen.fill(SPACE_BLACK)
+        self.sim.player.draw(screen)
+        self.sim.enemy_manager.draw(screen)
+
+    def counts(self):
+        return {'enemies': len(self.sim.enemy_manager.enemies), 'projectiles': len(self.sim.player.projectiles)}
+
+
+class HudScenario:
+    # The in-game HUD labels over an empty screen, time and score change every frame
+    def __init__(self, seed):
+        self.text_cache = TextCache()
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.frame = 0
+
+    def tick(self):
+        self.frame += 1
+        return 0.0, 0.0
+
+    def render(self, screen):
+        screen.fill(SPACE_BLACK)
+        draw = self.text_cache.draw
+        font = self.font
+        draw(screen, f'Lives: {3 - self.frame // 600 % 3}', font, 10, 10, RED)
+        draw(screen, f'Score: {self.frame // 7 * 10}', font, 10, 50, YELLOW)
+        draw(screen, f'Time: {self.frame / BASE_FPS:.1f}s', font, 10, 90, WHITE, dynamic=True)
+        draw(screen, f'Wave: {self.frame // 300}', font, SCREEN_WIDTH - 200, 10, CYAN)
+        draw(screen, f'Spawn (s): {2.0 - self.frame // 600 % 5 * 0.2:.1f}s', font, SCREEN_WIDTH - 200, 50, YELLOW)
+        pulse = abs(math.sin(self.frame * 0.08))
+        draw(screen, 'Projectile Speed Boost Active!', font, SCREEN_WIDTH // 2 - 150, 10,
+             (255, int(255 * pulse), 0), dynamic=True)
+        draw(screen, 'WASD: Move | Mouse: Aim | Left Click: Shoot', self.small_font,
+             SCREEN_WIDTH // 2 - 140, SCREEN_HEIGHT - 30, WHITE)
+
+    def counts(self):
+        return {'labels': len(self.text_cache.labels)}
+
+
+class StarfieldScenario:
+    def __init__(self, seed, count=10000):
+        self.starfield = Starfield(count, seed=seed)
+        self.frame = 0
+
+    def tick(self):
+        self.frame += 1
+        start = time.perf_counter()
+        self.starfield.update(1 / BASE_FPS)
+        return time.perf_counter() - start, 0.0
+
+    def render(self, screen):
+        screen.fill(SPACE_BLACK)
+        self.starfield.draw(screen, self.frame * 1000 // BASE_FPS)
+
+    def counts(self):
+        return {'stars': len(self.starfield)}
+
+
+def hold_position(sim):
+    return FrameInput(aim_x=sim.player.x, aim_y=sim.player.y - 100)
+
+
+def sweep_fire(sim):
+    # Aim sweeps a full circle every two seconds with the trigger held
+    angle = sim.frame / SIM_TICK_RATE * math.pi
+    player = sim.player
+    return FrameInput(aim_x=player.x + math.cos(angle) * 200, aim_y=player.y + math.sin(angle) * 200, fire=True)
+
+
+# name -> (description, simulated seconds, factory(seed))
+SCENARIOS = {
+    'chase-1k': ("1000 enemies chasing a stationary player",
+                 10, lambda seed: SimScenario(seed, hold_position, enemies=1000)),
+    'held-fire-5min': ("Trigger held with a sweeping aim for five minutes of natural spawning",
+                       300, lambda seed: SimScenario(seed, sweep_fire)),
+    'boss-heavy': ("200 bosses at speed_factor 3.0 against a turret",
+                   10, lambda seed: SimScenario(seed, TurretBot(seed), enemies=200, bosses=True, speed_factor=3.0)),
+    'hud-only': ("HUD labels with per-frame dynamic text, no entities",
+                 10, HudScenario),
+    'starfield-10k': ("10000 twinkling stars",
+                      10, lambda seed: StarfieldScenario(seed, 10000)),
+}
+
+
+def summarize(samples):
+    values = sorted(samples)
+    if not values:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    return {'mean': sum(values) / len(values) * 1000, 'p50': percentile(values, 50) * 1000,
+            'p95': percentile(values, 95) * 1000, 'p99': percentile(values, 99) * 1000, 'max': values[-1] * 1000}
+
+
+def run_scenario(name, screen, scale, seed):
+    description, seconds, factory = SCENARIOS[name]
+    frames = max(WARMUP_FRAMES + 1, int(seconds * BASE_FPS * scale))
+    scenario = factory(seed)
+    samples = {phase: [] for phase in PHASES}
+    totals = {}
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for frame in range(frames):
+        sim_time, collision_time = scenario.tick()
+        render_start = time.perf_counter()
+        scenario.render(screen)
+        pygame.display.flip()
+        render_time = time.perf_counter() - render_start
+        if frame < WARMUP_FRAMES:
+            continue
+        samples['sim'].append(sim_time)
+        samples['collisions'].append(collision_time)
+        samples['render'].append(render_time)
+        for key, value in scenario.counts().items():
+            low, high, total = totals.get(key, (value, value, 0))
+            totals[key] = (min(low, value), max(high, value), total + value)
+    measured = frames - WARMUP_FRAMES
+    return {
+        'description': description,
+        'frames': measured,
+        'wall_seconds': time.perf_counter() - start,
+        'phases_ms': {phase: summarize(values) for phase, values in samples.items()},
+        'entities': {key: {'min': low, 'max': high, 'mean': total / measured}
+                     for key, (low, high, total) in totals.items()},
+        'allocated_blocks': sys.getallocatedblocks() - blocks_before,
+    }
+
+
+def run(args):
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if USE_SPRITE_CACHE:
+        set_sprite_cache(build_sprite_cache())
+    profiler.enabled = True
+
+    results = {
+        'schema': SCHEMA,
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'sprite_cache': USE_SPRITE_CACHE,
+            'enemy_backend': ENEMY_BACKEND,
+        },
+        'scenarios': {},
+    }
+    print(f"{'scenario':<16} {'frames':>7} {'sim p50/p95':>14} {'coll p50/p95':>14} {'render p50/p95':>16}  (ms)")
+    for name in args.scenarios:
+        result = run_scenario(name, screen, args.scale, args.seed)
+        results['scenarios'][name] = result
+        cells = [f"{result['phases_ms'][p]['p50']:.2f}/{result['phases_ms'][p]['p95']:.2f}" for p in PHASES]
+        print(f"{name:<16} {result['frames']:>7} {cells[0]:>14} {cells[1]:>14} {cells[2]:>16}")
+    pygame.quit()
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return compare(baseline, results, args.tolerance, args.min_delta)
+    return 0
+
+
+def compare(baseline, current, tolerance, min_delta):
+    # A phase regresses when its mean or p95 grows by more than tolerance
+    # and by more than min_delta ms, so near-zero phases don't trip on noise
+    regressions = 0
+    print(f"{'scenario':<16} {'phase':<11} {'metric':<5} {'baseline':>9} {'current':>9} {'change':>8}")
+    for name, result in current['scenarios'].items():
+        reference = baseline['scenarios'].get(name)
+        if reference is None:
+            print(f"{name:<16} (not in baseline)")
+            continue
+        for phase in PHASES:
+            for metric in ('mean', 'p95'):
+                before = reference['phases_ms'][phase][metric]
+                after = result['phases_ms'][phase][metric]
+                change = (after - before) / before if before > 0 else float(after > 0)
+                regressed = change > tolerance and after - before > min_delta
+                regressions += regressed
+                flag = '  REGRESSION' if regressed else ''
+                print(f"{name:<16} {phase:<11} {metric:<5} {before:>9.3f} {after:>9.3f} {change * 100:>+7.1f}%{flag}")
+    if baseline.get('meta', {}).get('scale') != current.get('meta', {}).get('scale'):
+        print("Note: baseline and current were run at different --scale values")
+    print(f"{regressions} regression(s) at tolerance {tolerance * 100:.0f}%")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scenario benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run scenarios and write JSON results")
+    run_parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    run_parser.add_argument('--scale', type=float, default=1.0, help="Multiplier on each scenario's duration")
+    run_parser.add_argument('--seed', type=int, default=1234)
+    run_parser.add_argument('--out', default='bench_results.json')
+    run_parser.add_argument('--baseline', help="Compare against this results file after running")
+
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two results files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+
+    commands.add_parser('list', help="List the scenarios")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--tolerance', type=float, default=0.15, help="Allowed relative slowdown")
+        sub.add_argument('--min-delta', type=float, default=0.05, help="Ignore changes smaller than this many ms")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, (description, seconds, _) in SCENARIOS.items():
+            print(f"{name:<16} {seconds:>4}s  {description}")
+        return 0
+    if args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return compare(baseline, current, args.tolerance, args.min_delta)
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import math
+import random
+from config import *
+from simulation import FrameInput
+
+def nearest(items, x, y):
+    best = None
+    best_dist = float('inf')
+    for item in items:
+        dist = (item.x - x) ** 2 + (item.y - y) ** 2
+        if dist < best_dist:
+            best = item
+            best_dist = dist
+    return best
+
+class TurretBot:
+    # Holds its position and fires at the nearest enemy
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def aim(self, sim):
+        player = sim.player
+        target = nearest(sim.enemy_manager.enemies, player.x, player.y)
+        if target is None:
+            return player.x, player.y - 100, False
+        return target.x, target.y, True
+
+    def __call__(self, sim):
+        aim_x, aim_y, fire = self.aim(sim)
+        return FrameInput(aim_x=aim_x, aim_y=aim_y, fire=fire)
+
+class WanderBot(TurretBot):
+    # Random walk that changes direction every half second or so
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.direction = (False, False, False, False)
+        self.turn_time = float('-inf')
+
+    def __call__(self, sim):
+        # Holds each direction for 15-45 frames at 60 Hz, whatever the tick rate
+        now = sim.clock.get_ticks()
+        if now >= self.turn_time:
+            self.direction = tuple(self.rng.random() < 0.3 for _ in range(4))
+            self.turn_time = now + self.rng.randint(15, 45) * 1000 / BASE_FPS
+        aim_x, aim_y, fire = self.aim(sim)
+        left, right, up, down = self.direction
+        return FrameInput(left, right, up, down, aim_x, aim_y, fire)
+
+class KiteBot(TurretBot):
+    # Backs away from enemies that come close and off the screen edges,
+    # collects powerups while nothing is near, and keeps shooting the
+    # nearest enemy
+    danger_radius = 160.0
+    edge_margin = 60.0
+
+    def __call__(self, sim):
+        player = sim.player
+        manager = sim.enemy_manager
+        x = player.x
+        y = player.y
+        radius = self.danger_radius
+        move_x = 0.0
+        move_y = 0.0
+        for enemy in manager.enemies:
+            dx = x - enemy.x
+            dy = y - enemy.y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < radius * radius:
+                # Closer enemies push harder, bosses twice as hard
+                dist = math.sqrt(dist_sq) or 1e-6
+                weight = (radius - dist) / (radius * dist) * (2 if enemy.is_boss else 1)
+                move_x += dx * weight
+                move_y += dy * weight
+
+        if move_x == 0.0 and move_y == 0.0:
+            wanted = [p for p in manager.powerups if p.power_type != "heal" or player.lives < PLAYER_LIVES]
+            target = nearest(wanted, x, y)
+            if target is not None:
+                move_x = target.x - x
+                move_y = target.y - y
+        else:
+            margin = self.edge_margin
+            if x < margin:
+                move_x += (margin - x) / margin
+            elif x > SCREEN_WIDTH - margin:
+                move_x -= (x - SCREEN_WIDTH + margin) / margin
+            if y < margin:
+                move_y += (margin - y) / margin
+            elif y > SCREEN_HEIGHT - margin:
+                move_y -= (y - SCREEN_HEIGHT + margin) / margin
+
+        # Keys for the dominant directions, like a player holding WASD
+        magnitude = math.hypot(move_x, move_y)
+        if magnitude < 1e-3:
+            left = right = up = down = False
+        else:
+            left = move_x < -0.38 * magnitude
+            right = move_x > 0.38 * magnitude
+            up = move_y < -0.38 * magnitude
+            down = move_y > 0.38 * magnitude
+        aim_x, aim_y, fire = self.aim(sim)
+        return FrameInput(left, right, up, down, aim_x, aim_y, fire)
+
+BOTS = {
+    'turret': TurretBot,
+    'wander': WanderBot,
+    'kite': KiteBot,
+}
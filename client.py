@@ -0,0 +1,213 @@
+# Multiplayer client: sends this player's input to server.py and draws the
+# world from its snapshots, NET_INTERP_DELAY behind the newest one.
+# Usage: python client.py [--host 127.0.0.1] [--port 5555]
+import argparse
+import asyncio
+import math
+import pygame
+from config import *
+from enemy import Enemy, PowerUp
+from net import ENEMY_BOSS, ENEMY_HIT, PLAYER_BOOST, PLAYER_DEAD, PLAYER_HIT, POWERUP_TYPES, NetClient
+from player import Player, Projectile
+from renderer import Renderer
+from simulation import FrameInput
+from sprites import get_sprite_cache, load_assets
+from starfield import Starfield
+from text_cache import LazyFont, TextCache
+
+class RemoteWorld:
+    # Game objects standing in for the server's entities, kept by uid so the
+    # regular draw code (sprites, glow, trails, animations) renders them
+    def __init__(self):
+        self.players = {}
+        self.enemies = {}
+        self.projectiles = {}
+        self.powerups = {}
+        self.dead = set()
+
+    def sync(self, state, frames):
+        # frames is the number of 60 Hz frames since the last sync
+        q = NET_POSITION_SCALE
+        players = {}
+        self.dead = set()
+        for uid, (x, y, aim, lives, score, flags) in state['players'].items():
+            player = self.players.get(uid)
+            if player is None:
+                player = Player(x / q, y / q)
+            player.x = x / q
+            player.y = y / q
+            angle = aim / 256 * 2 * math.pi
+            player.mouse_x = player.x + math.cos(angle) * 100
+            player.mouse_y = player.y + math.sin(angle) * 100
+            player.lives = lives
+            player.score = score
+            player.hit_flash = 30 if flags & PLAYER_HIT else 0
+            player.projectile_speed_multiplier = 2.0 if flags & PLAYER_BOOST else 1.0
+            player.animation_frame += frames
+            if flags & PLAYER_DEAD:
+                self.dead.add(uid)
+            players[uid] = player
+        self.players = players
+
+        enemies = {}
+        for uid, (x, y, flags, health) in state['enemies'].items():
+            enemy = self.enemies.get(uid)
+            if enemy is None:
+                enemy = Enemy(x / q, y / q, bool(flags & ENEMY_BOSS))
+                # Spread the hull rotations the way staggered spawns would
+                enemy.animation_frame = uid * 17 % 360
+            enemy.x = x / q
+            enemy.y = y / q
+            enemy.is_boss = bool(flags & ENEMY_BOSS)
+            enemy.health = health
+            enemy.hit_flash = 10 if flags & ENEMY_HIT else 0
+            enemy.animation_frame += frames
+            enemies[uid] = enemy
+        self.enemies = enemies
+
+        projectiles = {}
+        for uid, (x, y) in state['projectiles'].items():
+            projectile = self.projectiles.get(uid)
+            if projectile is None:
+                projectile = Projectile(x / q, y / q, 0.0)
+            elif frames > 0:
+                # Velocity per 60 Hz frame, orients the glow trail
+                projectile.vel_x = (x / q - projectile.x) / frames
+                projectile.vel_y = (y / q - projectile.y) / frames
+            projectile.trail.append((int(projectile.x), int(projectile.y)))
+            projectile.x = x / q
+            projectile.y = y / q
+            projectiles[uid] = projectile
+        self.projectiles = projectiles
+
+        powerups = {}
+        for uid, (x, y, power_type) in state['powerups'].items():
+            powerup = self.powerups.get(uid)
+            if powerup is None:
+                powerup = PowerUp(x // q, y // q, 0, POWERUP_TYPES[power_type])
+            powerup.update(frames / BASE_FPS)
+            powerups[uid] = powerup
+        self.powerups = powerups
+
+    def draw(self, screen):
+        ships = [player for uid, player in self.players.items() if uid not in self.dead]
+        sprites = get_sprite_cache()
+        if sprites is None:
+            for entity in (*self.powerups.values(), *self.enemies.values(), *self.projectiles.values()):
+                entity.draw(screen)
+            for player in ships:
+                player.draw_ship(screen)
+            return None
+
+        batch = []
+        for powerup in self.powerups.values():
+            batch.extend(powerup.sprite_blits(sprites))
+        for enemy in self.enemies.values():
+            batch.extend(enemy.sprite_blits(sprites))
+        for projectile in self.projectiles.values():
+            batch.extend(projectile.sprite_blits(sprites))
+        for player in ships:
+            batch.extend(player.ship_blits(sprites))
+        return screen.blits(batch)
+
+async def play(args):
+    net = NetClient()
+    await net.connect(args.host, args.port)
+    receiver = asyncio.ensure_future(net.receive())
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.time.delay(1)
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Dynamic Defenders - player {net.player_id}")
+    assets = load_assets() if USE_SPRITE_CACHE else None
+    font = LazyFont(None, 36)
+    small_font = LazyFont(None, 24)
+    text_cache = TextCache()
+    renderer = Renderer(screen)
+    starfield = Starfield(STAR_COUNT)
+    world = RemoteWorld()
+
+    def label(text, label_font, x, y, color, dynamic=False):
+        renderer.add(text_cache.draw(screen, text, label_font, x, y, color, BLACK, dynamic))
+
+    loop = asyncio.get_running_loop()
+    frame_time = 1 / FPS
+    next_frame = last = loop.time()
+    rate_time = last
+    rate_bytes = 0
+    bandwidth = 0.0
+    frames = 0
+    running = True
+    while running and not receiver.done():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                renderer.toggle()
+        net.send_input(FrameInput.from_pygame(pygame.key.get_pressed(), pygame.mouse.get_pos(),
+                                              pygame.mouse.get_pressed()))
+
+        now = loop.time()
+        dt = now - last
+        last = now
+        if now - rate_time >= 1.0:
+            bandwidth = (net.bytes_received - rate_bytes) / (now - rate_time) / 1024
+            rate_bytes = net.bytes_received
+            rate_time = now
+
+        renderer.begin()
+        starfield.update_and_draw(screen, dt, pygame.time.get_ticks())
+        if renderer.dirty:
+            renderer.add(starfield.rects(renderer.threshold))
+
+        state = net.render_state(now)
+        if state is None:
+            label('Waiting for the server...', font, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2, WHITE)
+        else:
+            world.sync(state, dt * BASE_FPS)
+            renderer.add(world.draw(screen))
+            wave, spawn_rate, _, survival = state['meta'][0]
+            me = world.players.get(net.player_id)
+            if me is not None:
+                label(f'Lives: {me.lives}', font, 10, 10, RED)
+                label(f'Score: {me.score}', font, 10, 50, YELLOW)
+            label(f'Time: {survival / 10:.1f}s', font, 10, 90, WHITE, dynamic=True)
+            label(f'Wave: {wave}', font, SCREEN_WIDTH - 200, 10, CYAN)
+            label(f'Players: {len(world.players)}', font, SCREEN_WIDTH - 200, 50, YELLOW)
+            label(f'{bandwidth:.1f} KiB/s, {len(world.enemies)} enemies', small_font, SCREEN_WIDTH - 200, 90,
+                  WHITE, dynamic=True)
+            if net.player_id in world.dead:
+                label('Respawning...', font, SCREEN_WIDTH // 2 - 90, SCREEN_HEIGHT // 2, RED)
+        renderer.present()
+
+        frames += 1
+        if args.frames and frames >= args.frames:
+            running = False
+        next_frame += frame_time
+        if loop.time() - next_frame > MAX_FRAME_TIME:
+            next_frame = loop.time()
+        await asyncio.sleep(max(0.0, next_frame - loop.time()))
+
+    receiver.cancel()
+    await net.close()
+    if assets is not None:
+        assets.join()
+    pygame.quit()
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic Defenders multiplayer client")
+    parser.add_argument('--host', default=NET_HOST)
+    parser.add_argument('--port', type=int, default=NET_PORT)
+    parser.add_argument('--frames', type=int, help="Quit after this many frames")
+    args = parser.parse_args()
+    try:
+        asyncio.run(play(args))
+    except ConnectionRefusedError:
+        parser.exit(1, f"No server at {args.host}:{args.port}, start one with: python server.py\n")
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
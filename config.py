@@ -4,6 +4,15 @@ import random
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+BASE_FPS = 60  # Per-frame speeds and animation counters are tuned for this rate
+
+# Simulation timestep
+SIM_TICK_RATE = 120  # Fixed simulation ticks per second, independent of FPS
+MAX_FRAME_TIME = 0.25  # Longer frames are clamped so a stall can't snowball
+MAX_TICKS_PER_FRAME = 12
+SKIP_RENDER_WHEN_BEHIND = False  # Drop render frames while the simulation catches up
+# Off by default, benchmarks/bench_pipeline.py shows no gain on a single core
+PIPELINED_RENDERING = False  # Simulate the next frame on a worker thread while drawing this one, toggle with F6
 
 # Colors
 WHITE = (255, 255, 255)
@@ -15,6 +24,13 @@ BLUE = (100, 150, 255)
 CYAN = (0, 255, 255)
 YELLOW = (255, 255, 0)
 
+# Background settings
+STAR_COUNT = 100
+
+# Dirty-rect rendering: restore and push only the regions that changed
+DIRTY_RECT_RENDERING = False  # Toggle at runtime with F5
+DIRTY_RECT_THRESHOLD = 0.5  # Fraction of the screen above which a full flip is used
+
 # Player settings
 PLAYER_SIZE = 20
 PLAYER_SPEED = 5
@@ -24,11 +40,82 @@ PLAYER_LIVES = 3
 PROJECTILE_SIZE = 5
 PROJECTILE_SPEED = 7
 FIRE_COOLDOWN = 250
+PROJECTILE_SPREAD = 1  # Projectiles per shot
+PROJECTILE_SPREAD_ANGLE = 0.15  # Radians between spread projectiles
+PROJECTILE_BACKEND = "python"  # "python" (Projectile objects) or "numpy" (batched arrays)
 
 # Enemy settings
 ENEMY_SIZE = 20
 ENEMY_SPEED = 2
 INITIAL_SPAWN_RATE = 2000
+ENEMY_BACKEND = "python"  # "python" (Enemy objects) or "numpy" (structure-of-arrays)
+
+# Spawn and wave settings, the defaults of waves.SpawnConfig. A JSON file
+# (SPAWN_CONFIG_FILE or --spawn-config), a preset and --set name=value override them
+WAVE_SIZE = 5  # Enemies per wave
+SPAWN_BURST = 1  # Enemies per spawn
+SPAWNS_PER_TICK = 8  # Spawns that fell due since the last tick all fire, up to this many after a stall
+BOSS_RATIO = 0.2  # Share of spawns that are bosses once the speed factor passes BOSS_SPEED_FACTOR
+BOSS_SPEED_FACTOR = 1.25
+HEAL_POWERUP_WAVES = 3
+SPEED_POWERUP_WAVES = 5
+SPAWN_RATE_LIMITS = (400, 3000)  # DDA clamps for spawn_rate in ms
+SPAWN_RATE_STEP = 200
+SPEED_FACTOR_LIMITS = (0.7, 2.0)  # DDA clamps for enemy_speed_factor
+SPEED_FACTOR_STEP = 0.05
+SPAWN_CONFIG_FILE = None
+
+# Enemy arrive steering
+ENEMY_MAX_SPEED = 100.0
+ENEMY_MAX_ACCELERATION = 200.0
+ENEMY_TARGET_RADIUS = 5.0
+ENEMY_SLOW_RADIUS = 100.0
+ENEMY_TIME_TO_TARGET = 0.1
+
+# Enemy separation steering, keeps waves from collapsing into one blob
+ENEMY_SEPARATION = True
+ENEMY_SEPARATION_WEIGHT = 400.0  # Push at zero distance, px/s^2 before speed_factor
 
 # DDA settings
-DDA_CHECK_INTERVAL = 1  # Check lives every wave
\ No newline at end of file
+DDA_CHECK_INTERVAL = 1  # Check lives every wave
+DDA_WEIGHTS = (2.0, 1.0, 0.5)  # Lives, survival time, score rate
+DDA_THRESHOLDS = (7, 10)  # Easier below the first, harder above the second
+# Collision settings
+COLLISION_CELL_SIZE = 64  # Spatial grid cell size in pixels
+
+# UI settings
+TEXT_CACHE_SIZE = 128  # Outlined labels kept before LRU eviction
+TEXT_OUTLINE = 2  # Outline thickness in pixels
+
+# Sprite cache settings
+USE_SPRITE_CACHE = True  # False falls back to the parametric draw code
+SPRITE_ROTATION_STEPS = 32  # Rotation frames per symmetry period of enemy hulls
+SPRITE_HEADING_STEPS = 120  # Player ship headings (3 degree steps)
+SPRITE_COLORKEY = (255, 0, 255)  # Transparent color, never used by game shapes
+USE_GLOW_EFFECTS = True  # Additive glow and trail sprites on top of the sprite cache
+
+# Object pool settings
+POOL_MAX_SIZE = 1024  # Free objects kept per pool, 0 disables pooling
+PROJECTILE_TRAIL_LENGTH = 5
+
+# Profiling
+PROFILER_ENABLED = False  # Toggle at runtime with F3
+PROFILER_WINDOW = 300  # Frames kept for the rolling percentiles
+PROFILER_TRACE_FILE = None  # e.g. "trace.csv" or "trace.jsonl", toggle with F4
+
+# Telemetry (game events written to JSONL by a background thread)
+TELEMETRY_FILE = None  # e.g. "telemetry.jsonl", or pass --telemetry
+TELEMETRY_MAX_BYTES = 5 * 1024 * 1024  # Rotate the file at this size
+TELEMETRY_BACKUPS = 3  # Rotated files kept as telemetry.jsonl.1 .. .3
+TELEMETRY_QUEUE_SIZE = 65536  # Events beyond this are dropped and counted, never waited on
+
+# Multiplayer (server.py hosts, client.py renders, benchmarks/loadgen.py drives bots)
+NET_HOST = "127.0.0.1"
+NET_PORT = 5555
+NET_TICK_RATE = 60  # Server simulation ticks per second
+NET_SNAPSHOT_RATE = 20  # Snapshots sent to each client per second
+NET_SNAPSHOT_HISTORY = 32  # Sent states kept as delta bases, older acks get a full snapshot
+NET_POSITION_SCALE = 4  # Positions travel as integers in 1/4 px
+NET_INTERP_DELAY = 100  # ms clients render behind the newest snapshot
+NET_SEND_BUFFER = 256 * 1024  # Snapshots are skipped for a client with more than this unsent
+NET_RESPAWN_TIME = 3000  # ms a dead player waits before rejoining
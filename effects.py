@@ -0,0 +1,97 @@
+import math
+import pygame
+from config import *
+
+_effects = None
+
+def get_effects():
+    return _effects
+
+def set_effects(effects):
+    global _effects
+    _effects = effects
+
+class Effects:
+    # Radial-gradient glows and projectile trail streaks, rendered once on a
+    # black surface and composited with BLEND_RGB_ADD, so black adds nothing
+    # and overlapping glows brighten like light. Blit items carry the blend
+    # flag, so they go in the same batched blits call as regular sprites
+    def __init__(self, heading_steps=SPRITE_HEADING_STEPS, trail_length=PROJECTILE_TRAIL_LENGTH):
+        self.heading_steps = heading_steps
+        self.trail_length = trail_length
+        self.glows = {}
+        self.trails = {}
+
+    def __len__(self):
+        return len(self.glows) + len(self.trails)
+
+    def glow(self, radius, color):
+        # Quadratic falloff from color at the centre to black at radius
+        key = (radius, color)
+        surface = self.glows.get(key)
+        if surface is None:
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+            surface.fill(BLACK)
+            for r in range(radius, 0, -1):
+                fade = (1 - r / (radius + 1)) ** 2
+                pygame.draw.circle(surface, [int(c * fade) for c in color], (radius, radius), r)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self.glows[key] = surface
+        return surface
+
+    def glow_blit(self, x, y, radius, color):
+        return (self.glow(radius, color), (int(x) - radius, int(y) - radius), None, pygame.BLEND_RGB_ADD)
+
+    def heading_step(self, vel_x, vel_y):
+        angle = math.atan2(vel_y, vel_x)
+        return int((angle % (math.pi * 2)) / (math.pi * 2) * self.heading_steps + 0.5) % self.heading_steps
+
+    def trail(self, step, spacing, count):
+        # One streak for a whole projectile trail: a halo at the head and count
+        # glow dots one 60 Hz frame apart behind it, older dots smaller and
+        # dimmer. Returns the surface and the head's offset inside it
+        key = (step, spacing, count)
+        trail = self.trails.get(key)
+        if trail is None:
+            angle = step * (math.pi * 2) / self.heading_steps
+            back_x = -math.cos(angle) * spacing
+            back_y = -math.sin(angle) * spacing
+            length = self.trail_length
+            # (distance back in frames, radius, color), drawn oldest first
+            dots = []
+            for k in range(count, 0, -1):
+                age = (count - k + 1) / (length + 1)
+                radius = max(2, int(PROJECTILE_SIZE * (length - k + 1) / length)) + 2
+                dots.append((k, radius, (int(255 * age), int(255 * age), int((100 + 155 * age) * age))))
+            dots.append((0, PROJECTILE_SIZE + 5, (255, 230, 120)))
+
+            reach = max(radius for _, radius, _ in dots)
+            xs = [int(k * back_x) for k, _, _ in dots]
+            ys = [int(k * back_y) for k, _, _ in dots]
+            left = min(xs) - reach
+            top = min(ys) - reach
+            surface = pygame.Surface((max(xs) + reach - left + 1, max(ys) + reach - top + 1))
+            surface.fill(BLACK)
+            for (_, radius, color), x, y in zip(dots, xs, ys):
+                surface.blit(self.glow(radius, color), (x - left - radius, y - top - radius),
+                             special_flags=pygame.BLEND_RGB_ADD)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            trail = self.trails[key] = (surface, -left, -top)
+        return trail
+
+    def trail_blit(self, x, y, vel_x, vel_y, count):
+        spacing = int(math.hypot(vel_x, vel_y) + 0.5)
+        surface, head_x, head_y = self.trail(self.heading_step(vel_x, vel_y), spacing, min(count, self.trail_length))
+        return (surface, (int(x) - head_x, int(y) - head_y), None, pygame.BLEND_RGB_ADD)
+
+def build_effects():
+    # Pre-render the trails for normal and boosted projectiles at every heading
+    effects = Effects()
+    for multiplier in (1.0, 2.0):
+        spacing = int(PROJECTILE_SPEED * multiplier + 0.5)
+        for step in range(effects.heading_steps):
+            for count in range(effects.trail_length + 1):
+                effects.trail(step, spacing, count)
+    return effects
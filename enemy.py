@@ -1,12 +1,34 @@
+import itertools
 import pygame
 import random
 import math
+from types import SimpleNamespace
 from config import *
+from player import projectile_pool
+from pool import Pool, compact
+from scheduler import Scheduler
+from spatial import PointGrid, SpatialGrid, segment_entry
+from sprites import get_sprite_cache
+from effects import get_effects
+from telemetry import telemetry
+from waves import SpawnConfig
+
+# Stable entity ids, e.g. for delta-encoding network snapshots
+enemy_ids = itertools.count(1)
 
 class Enemy:
+    __slots__ = ('uid', 'x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'is_boss', 'health', 'animation_frame', 'hit_flash',
+                 'max_speed', 'max_acceleration', 'target_radius', 'slow_radius', 'time_to_target')
+
     def __init__(self, x, y, is_boss=False):
+        self.reset(x, y, is_boss)
+
+    def reset(self, x, y, is_boss=False):
+        self.uid = next(enemy_ids)
         self.x = float(x)
         self.y = float(y)
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.vel_x = 0.0
         self.vel_y = 0.0
         self.is_boss = is_boss
@@ -15,13 +37,13 @@ class Enemy:
         self.hit_flash = 0
 
         # Arrive behavior
-        self.max_speed = 100.0
-        self.max_acceleration = 200.0
-        self.target_radius = 5.0
-        self.slow_radius = 100.0
-        self.time_to_target = 0.1
+        self.max_speed = ENEMY_MAX_SPEED
+        self.max_acceleration = ENEMY_MAX_ACCELERATION
+        self.target_radius = ENEMY_TARGET_RADIUS
+        self.slow_radius = ENEMY_SLOW_RADIUS
+        self.time_to_target = ENEMY_TIME_TO_TARGET
     
-    def arrive(self, target_x, target_y, dt):
+    def arrive(self, target_x, target_y, dt, push_x=0.0, push_y=0.0):
         # Direction to target
         dx = target_x - self.x
         dy = target_y - self.y
@@ -47,6 +69,10 @@ class Enemy:
         # Acceleration to reach target velocity
         accel_x = (target_vel_x - self.vel_x) / self.time_to_target
         accel_y = (target_vel_y - self.vel_y) / self.time_to_target
+
+        # Separation from neighbours shares the acceleration budget
+        accel_x += push_x
+        accel_y += push_y
         
         # Limit acceleration
         accel_mag = math.sqrt(accel_x * accel_x + accel_y * accel_y)
@@ -58,27 +84,66 @@ class Enemy:
         self.vel_x += accel_x * dt
         self.vel_y += accel_y * dt
     
-    def update(self, target_x, target_y, dt, speed_factor):
-        self.max_speed = 100.0 * speed_factor
-        self.max_acceleration = 200.0 * speed_factor
-        self.slow_radius = 100.0 / speed_factor
+    def update(self, target_x, target_y, dt, speed_factor, push_x=0.0, push_y=0.0):
+        self.max_speed = ENEMY_MAX_SPEED * speed_factor
+        self.max_acceleration = ENEMY_MAX_ACCELERATION * speed_factor
+        self.slow_radius = ENEMY_SLOW_RADIUS / speed_factor
         
-        # Apply arrive behavior
-        self.arrive(target_x, target_y, dt)
+        # Apply arrive behavior, push is the separation direction sum
+        weight = ENEMY_SEPARATION_WEIGHT * speed_factor
+        self.arrive(target_x, target_y, dt, push_x * weight, push_y * weight)
         
         # Update position
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += self.vel_x * dt
         self.y += self.vel_y * dt
         
-        self.animation_frame += 1
+        # Animation counters count 60 Hz frames whatever the tick rate
+        frames = dt * BASE_FPS
+        self.animation_frame += frames
         if self.hit_flash > 0:
-            self.hit_flash -= 1
+            self.hit_flash -= frames
     
     def draw(self, screen):
-        if self.is_boss:
+        sprites = get_sprite_cache()
+        if sprites is not None:
+            screen.blits(self.sprite_blits(sprites), doreturn=False)
+        elif self.is_boss:
             self.draw_boss(screen)
         else:
             self.draw_regular(screen)
+
+    def sprite_blits(self, sprites):
+        flash = self.hit_flash > 0
+        x = int(self.x)
+        y = int(self.y)
+        if not self.is_boss:
+            extent = ENEMY_SIZE + 2
+            step = sprites.rotation_step(self.animation_frame * 0.02, 8)
+            body = sprites.get(('enemy', step, flash), Enemy.draw_regular, (extent * 2, extent * 2), (extent, extent),
+                               animation_frame=sprites.rotation_angle(step, 8) / 0.02, hit_flash=flash)
+            return [(body, (x - extent, y - extent))]
+
+        size = ENEMY_SIZE * 2
+        extent = size + 8
+        step = sprites.rotation_step(self.animation_frame * 0.01, 6)
+        hull = sprites.get(('boss_hull', step, flash), Enemy.draw_boss_hull, (extent * 2, extent * 2), (extent, extent),
+                           animation_frame=sprites.rotation_angle(step, 6) / 0.01, hit_flash=flash)
+        radius = int(size * 0.5 + math.sin(self.animation_frame * 0.1) * 3)
+        core = sprites.get(('boss_core', radius), draw_core_ring, (radius * 2 + 2, radius * 2 + 2), (radius + 1, radius + 1),
+                           radius=radius)
+        health = sprites.get(('boss_health', self.health), Enemy.draw_boss_health, (30, 4), (15, size + 10),
+                             health=self.health)
+        batch = [
+            (hull, (x - extent, y - extent)),
+            (core, (x - radius - 1, y - radius - 1)),
+            (health, (int(self.x - 15), int(self.y - size - 10))),
+        ]
+        effects = get_effects()
+        if effects is not None:
+            batch.insert(0, effects.glow_blit(x, y, size + 14, (40, 60, 140)))
+        return batch
     
     # Begin AI Generated
     def draw_regular(self, screen):
@@ -104,6 +169,11 @@ class Enemy:
         pygame.draw.circle(screen, BLACK, (int(self.x + eye_offset), int(self.y - eye_offset)), 3)
     
     def draw_boss(self, screen):
+        self.draw_boss_hull(screen)
+        self.draw_boss_core(screen)
+        self.draw_boss_health(screen)
+
+    def draw_boss_hull(self, screen):
         # Larger, more menacing boss
         size = ENEMY_SIZE * 2
         color = WHITE if self.hit_flash > 0 else BLUE
@@ -127,12 +197,16 @@ class Enemy:
         
         # Main body
         pygame.draw.polygon(screen, color, body_points)
-        
+
+    def draw_boss_core(self, screen):
         # Inner core (pulsing)
+        size = ENEMY_SIZE * 2
         pulse_size = size * 0.5 + math.sin(self.animation_frame * 0.1) * 3
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x), int(self.y)), int(pulse_size), 2)
-        
+        draw_core_ring(SimpleNamespace(x=int(self.x), y=int(self.y), radius=int(pulse_size)), screen)
+
+    def draw_boss_health(self, screen):
         # Health indicator (small bars)
+        size = ENEMY_SIZE * 2
         bar_width = 30
         bar_height = 4
         bar_x = int(self.x - bar_width / 2)
@@ -157,8 +231,30 @@ class Enemy:
         self.hit_flash = 10
         return self.health <= 0
 
+enemy_pool = Pool(Enemy)
+
+def nearest_target(targets, x, y):
+    best = None
+    best_dist = float('inf')
+    for target in targets:
+        dx = target[0] - x
+        dy = target[1] - y
+        dist = dx * dx + dy * dy
+        if dist < best_dist:
+            best = target
+            best_dist = dist
+    return best
+
+def draw_core_ring(pose, screen):
+    pygame.draw.circle(screen, (255, 255, 255), (pose.x, pose.y), pose.radius, 2)
+
 class PowerUp:
+    __slots__ = ('x', 'y', 'size', 'wave_spawned', 'power_type', 'animation_frame', 'float_offset')
+
     def __init__(self, x, y, wave_spawned, power_type):
+        self.reset(x, y, wave_spawned, power_type)
+
+    def reset(self, x, y, wave_spawned, power_type):
         self.x = x
         self.y = y
         self.size = 15
@@ -168,11 +264,26 @@ class PowerUp:
         self.float_offset = 0
     
     # Begin AI Generated
-    def update(self):
-        self.animation_frame += 1
+    def update(self, dt=1 / BASE_FPS):
+        self.animation_frame += dt * BASE_FPS
         self.float_offset = math.sin(self.animation_frame * 0.1) * 5
-    
+    # End AI Generated
+
     def draw(self, screen):
+        sprites = get_sprite_cache()
+        if sprites is not None:
+            screen.blits(self.sprite_blits(sprites), doreturn=False)
+        else:
+            self.draw_shape(screen)
+
+    def sprite_blits(self, sprites):
+        extent = self.size + 5
+        body = sprites.get(('powerup', self.power_type), PowerUp.draw_shape, (extent * 2, extent * 2), (extent, extent),
+                           size=self.size, float_offset=0, power_type=self.power_type)
+        return [(body, (self.x - extent, int(self.y + self.float_offset) - extent))]
+    
+    # Begin AI Generated
+    def draw_shape(self, screen):
         y_pos = int(self.y + self.float_offset)
         
         if self.power_type == "heal":
@@ -205,96 +316,318 @@ class PowerUp:
     def get_rect(self):
         return pygame.Rect(self.x - self.size, self.y - self.size, self.size * 2, self.size * 2)
 
+powerup_pool = Pool(PowerUp)
+
 class EnemyManager:
-    def __init__(self):
+    def __init__(self, clock=pygame.time, rng=random, spawn_config=None, telemetry=telemetry):
+        # clock provides get_ticks() in ms, rng provides choice()/randint(),
+        # telemetry receives the spawn, wave and DDA events
+        self.clock = clock
+        self.rng = rng
+        self.telemetry = telemetry
+        self.spawn_config = spawn_config if spawn_config is not None else SpawnConfig()
         self.enemies = []
-        self.spawn_rate = INITIAL_SPAWN_RATE
-        self.last_spawn_time = 0
+        self.spawn_rate = self.spawn_config.initial_spawn_rate
+        self.last_spawn_time = float('-inf')
         self.wave_count = 0
         self.enemies_spawned = 0
         self.player_pos = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
+        self.targets = [self.player_pos]
         self.enemy_speed_factor = 1.0
         self.powerups = []
-        self.last_heal_powerup_wave = -1
-        self.last_speed_powerup_wave = -1
+        self.dda_weights = DDA_WEIGHTS
+        self.dda_thresholds = DDA_THRESHOLDS
+        self.grid = SpatialGrid()
+        self.separation = ENEMY_SEPARATION
+        self.neighbours = PointGrid(ENEMY_SIZE * 4)
+        # Spawns, waves and powerups only, the simulation keeps its own timers
+        self.events = Scheduler()
+        self.events.on('spawn', self.spawn_due)
+        self.events.on('wave', self.start_wave)
+        self.events.on('powerup', self.powerup_due)
+        self.schedule_spawn()
     
     def set_player_pos(self, x, y):
-        self.player_pos = (x, y)
+        self.set_targets([(x, y)])
+
+    def set_targets(self, positions):
+        # Positions the enemies chase, each enemy steers toward the nearest
+        # one. An empty list keeps the previous targets
+        if positions:
+            self.targets = positions
+            self.player_pos = positions[0]
     
     def update(self, dt):
-        current_time = pygame.time.get_ticks()
+        # Fire the spawns, waves and powerups that fell due since the last tick
+        self.events.run(self.clock.get_ticks())
+
+        self.update_enemies(dt)
         
-        # Spawn enemies based on spawn_rate
-        if current_time - self.last_spawn_time > self.spawn_rate:
-            side = random.choice(['top', 'bottom', 'left', 'right'])
-            
-            if side == 'top':
-                x = random.randint(0, SCREEN_WIDTH)
-                y = -ENEMY_SIZE
-            elif side == 'bottom':
-                x = random.randint(0, SCREEN_WIDTH)
-                y = SCREEN_HEIGHT + ENEMY_SIZE
-            elif side == 'left':
-                x = -ENEMY_SIZE
-                y = random.randint(0, SCREEN_HEIGHT)
-            else:  # right
-                x = SCREEN_WIDTH + ENEMY_SIZE
-                y = random.randint(0, SCREEN_HEIGHT)
-
-            is_boss = False
-            if self.enemy_speed_factor > 1.25:
-                enemies_into_wave = self.enemies_spawned % 5
-                if enemies_into_wave == 0:  
-                    is_boss = True
-            
-            self.enemies.append(Enemy(x, y, is_boss))
-            self.last_spawn_time = current_time
-            self.enemies_spawned += 1
-            
-            # Waves (every 5 enemies = 1 wave)
-            if self.enemies_spawned % 5 == 0:
-                self.wave_count += 1
-                self.powerups = [p for p in self.powerups if p.wave_spawned == self.wave_count]
-            
-            # Heal power up every 3 waves
-            if self.wave_count % 3 == 0 and self.wave_count != self.last_heal_powerup_wave and self.wave_count != 0:
-                self.spawn_powerup("heal")
-                self.last_heal_powerup_wave = self.wave_count
-
-            # Speed boost every 5 waves
-            if self.wave_count % 5 == 0 and self.wave_count != self.last_speed_powerup_wave and self.wave_count != 0:
-                self.spawn_powerup("speed")
-                self.last_speed_powerup_wave = self.wave_count
+        for p in self.powerups:
+            p.update(dt)
 
-        for enemy in self.enemies[:]:
-            enemy.update(self.player_pos[0], self.player_pos[1], dt, self.enemy_speed_factor)
-            if enemy.is_off_screen():
-                self.enemies.remove(enemy)
+    def schedule_spawn(self):
+        # The next spawn is spawn_rate after the last one, the first comes straight away
+        if self.last_spawn_time == float('-inf'):
+            due = self.clock.get_ticks()
+        else:
+            due = self.last_spawn_time + max(1, self.spawn_rate)
+        self.events.schedule(due, 'spawn', key='spawn')
+
+    def spawn_due(self, time):
+        config = self.spawn_config
+        # After a stall only the last spawns_per_tick spawns are caught up on
+        time = max(time, self.events.now - (config.spawns_per_tick - 1) * max(1, self.spawn_rate))
+        for _ in range(config.burst):
+            self.spawn_enemy(time)
+        self.last_spawn_time = time
+        self.schedule_spawn()
+
+    def spawn_enemy(self, current_time):
+        config = self.spawn_config
+        side = self.rng.choice(['top', 'bottom', 'left', 'right'])
+        
+        if side == 'top':
+            x = self.rng.randint(0, SCREEN_WIDTH)
+            y = -ENEMY_SIZE
+        elif side == 'bottom':
+            x = self.rng.randint(0, SCREEN_WIDTH)
+            y = SCREEN_HEIGHT + ENEMY_SIZE
+        elif side == 'left':
+            x = -ENEMY_SIZE
+            y = self.rng.randint(0, SCREEN_HEIGHT)
+        else:  # right
+            x = SCREEN_WIDTH + ENEMY_SIZE
+            y = self.rng.randint(0, SCREEN_HEIGHT)
+
+        is_boss = config.is_boss(self.enemies_spawned, self.enemy_speed_factor)
+        
+        self.add_enemy(x, y, is_boss)
+        self.enemies_spawned += 1
+        self.telemetry.emit('spawn', current_time, x=x, y=y, boss=is_boss, wave=self.wave_count)
         
+        # Waves (every wave_size enemies = 1 wave)
+        if self.enemies_spawned % config.wave_size == 0:
+            self.events.schedule(current_time, 'wave')
+
+    def start_wave(self, time):
+        config = self.spawn_config
+        self.wave_count += 1
+        self.telemetry.emit('wave', time, wave=self.wave_count, enemies=len(self.enemies))
+
+        # Power ups last until the next wave starts
         for p in self.powerups:
-            p.update()
+            powerup_pool.release(p)
+        self.powerups.clear()
+
+        # Heal power up every few waves, speed boost every few more
+        if self.wave_count % config.heal_powerup_waves == 0:
+            self.events.schedule(time, 'powerup', "heal")
+        if self.wave_count % config.speed_powerup_waves == 0:
+            self.events.schedule(time, 'powerup', "speed")
+
+    def powerup_due(self, time, power_type):
+        self.spawn_powerup(power_type)
+
+    def add_enemy(self, x, y, is_boss=False):
+        self.enemies.append(enemy_pool.acquire(x, y, is_boss))
+
+    def interpolate(self, alpha):
+        # Move enemies to their render positions, returns what restore_positions needs
+        saved = []
+        for enemy in self.enemies:
+            saved.append((enemy.x, enemy.y))
+            enemy.x = enemy.prev_x + (enemy.x - enemy.prev_x) * alpha
+            enemy.y = enemy.prev_y + (enemy.y - enemy.prev_y) * alpha
+        return saved
+
+    def restore_positions(self, saved):
+        for enemy, (x, y) in zip(self.enemies, saved):
+            enemy.x = x
+            enemy.y = y
+
+    def update_enemies(self, dt):
+        targets = self.targets
+        many = len(targets) > 1
+        target_x, target_y = targets[0]
+        enemies = self.enemies
+        if self.separation and len(enemies) > 1:
+            pushes = self.separation_pushes()
+        else:
+            pushes = None
+        write = 0
+        for i, enemy in enumerate(enemies):
+            if many:
+                target_x, target_y = nearest_target(targets, enemy.x, enemy.y)
+            if pushes is None:
+                enemy.update(target_x, target_y, dt, self.enemy_speed_factor)
+            else:
+                enemy.update(target_x, target_y, dt, self.enemy_speed_factor, *pushes[i])
+            if enemy.is_off_screen():
+                enemy_pool.release(enemy)
+            else:
+                enemies[write] = enemy
+                write += 1
+        del enemies[write:]
     
+    def separation_pushes(self):
+        # Sum of unit directions away from every neighbour closer than the two
+        # enemies' combined size, fading to zero at that distance. Neighbours
+        # come from a point grid so the pass stays close to O(n)
+        enemies = self.enemies
+        self.neighbours.rebuild([(enemy.x, enemy.y) for enemy in enemies])
+        near = self.neighbours.near
+        radii = [ENEMY_SIZE * 2 if enemy.is_boss else ENEMY_SIZE for enemy in enemies]
+        pushes = []
+        for i, enemy in enumerate(enemies):
+            x = enemy.x
+            y = enemy.y
+            radius = radii[i]
+            push_x = 0.0
+            push_y = 0.0
+            for j in near(x, y):
+                if j == i:
+                    continue
+                other = enemies[j]
+                dx = x - other.x
+                dy = y - other.y
+                spacing = radius + radii[j]
+                dist_sq = dx * dx + dy * dy
+                if 0 < dist_sq < spacing * spacing:
+                    distance = math.sqrt(dist_sq)
+                    strength = (1 - distance / spacing) / distance
+                    push_x += dx * strength
+                    push_y += dy * strength
+            pushes.append((push_x, push_y))
+        return pushes
+
     def draw(self, screen):
+        sprites = get_sprite_cache()
+        if sprites is None:
+            for p in self.powerups:
+                p.draw(screen)
+            for enemy in self.enemies:
+                enemy.draw(screen)
+            return
+
+        # One batched blit call for every powerup and enemy, returns the
+        # touched rects for dirty-rect rendering
+        batch = []
         for p in self.powerups:
-            p.draw(screen)
+            batch.extend(p.sprite_blits(sprites))
         for enemy in self.enemies:
-            enemy.draw(screen)
+            batch.extend(enemy.sprite_blits(sprites))
+        return screen.blits(batch)
     
     def check_collisions(self, projectiles, player_rect):
+        if not isinstance(projectiles, list):
+            # Batched projectiles (projectile_soa) run their own swept test
+            return projectiles.collide(self, player_rect)
+        return self.check_collisions_many([(projectiles, player_rect)])[0]
+
+    def check_collisions_many(self, shooters):
+        # check_collisions for several (projectiles, player_rect) pairs in
+        # order, against one spatial grid instead of a rebuild per player
+        enemies = self.enemies
+        enemy_rects = [enemy.get_rect() for enemy in enemies]
+        alive = [True] * len(enemies)
+        self.grid.rebuild(enemy_rects)
+        grow = PROJECTILE_SIZE
+
+        outcomes = []
+        removed = False
+        for projectiles, player_rect in shooters:
+            kills = 0
+            player_hit = False
+
+            # Check projectile hits along each projectile's path this tick, each
+            # projectile is consumed by the first live enemy it reaches
+            consumed = set()
+            for p_index, projectile in enumerate(projectiles):
+                x0, y0, x1, y1 = projectile.prev_x, projectile.prev_y, projectile.x, projectile.y
+                path = pygame.Rect(min(x0, x1) - grow - 1, min(y0, y1) - grow - 1,
+                                   abs(x1 - x0) + grow * 2 + 3, abs(y1 - y0) + grow * 2 + 3)
+                first = None
+                for e_index in self.grid.query(path):
+                    r = enemy_rects[e_index]
+                    if not alive[e_index] or not path.colliderect(r):
+                        continue
+                    t = segment_entry(x0, y0, x1, y1, r.left - grow, r.top - grow, r.right + grow, r.bottom + grow)
+                    if t is not None and (first is None or t < first[0]):
+                        first = (t, e_index)
+                        if t == 0.0:
+                            # Candidates come in index order, nothing else can come first
+                            break
+                if first is not None:
+                    e_index = first[1]
+                    consumed.add(p_index)
+                    if enemies[e_index].take_damage():
+                        alive[e_index] = False
+                        kills += 1
+
+            # Check player hits, only the first hit counts
+            for e_index in self.grid.query(player_rect):
+                if alive[e_index] and player_rect.colliderect(enemy_rects[e_index]):
+                    alive[e_index] = False
+                    player_hit = True
+                    break
+
+            if consumed:
+                compact(projectiles, [i not in consumed for i in range(len(projectiles))], projectile_pool)
+            removed = removed or kills or player_hit
+            outcomes.append((kills, player_hit))
+
+        if removed:
+            compact(enemies, alive, enemy_pool)
+
+        return [(kills, player_hit, self.collect_powerup(player_rect))
+                for (kills, player_hit), (_, player_rect) in zip(outcomes, shooters)]
+
+    def collect_powerup(self, player_rect):
+        # Check power up collections, at most one per tick
+        for i, p in enumerate(self.powerups):
+            if player_rect.colliderect(p.get_rect()):
+                power_type = p.power_type
+                powerup_pool.release(self.powerups.pop(i))
+                return power_type
+        return None
+
+    # Hooks for batched collision passes, indices follow self.enemies
+    def enemy_bounds(self):
+        rects = [enemy.get_rect() for enemy in self.enemies]
+        return ([r.left for r in rects], [r.top for r in rects],
+                [r.right for r in rects], [r.bottom for r in rects])
+
+    def damage_enemy(self, index):
+        return self.enemies[index].take_damage()
+
+    def remove_enemies(self, alive):
+        compact(self.enemies, alive, enemy_pool)
+
+    def check_collisions_brute_force(self, projectiles, player_rect):
         kills = 0
         player_hit = False
         powerup_collected = None
 
-        # Check projectile hits
+        # Reference O(n * m) path, kept for benchmarks and parity checks
+        # Check projectile hits, first enemy along each projectile's path
+        grow = PROJECTILE_SIZE
         for projectile in projectiles[:]:
-            proj_rect = pygame.Rect(projectile.x - PROJECTILE_SIZE, projectile.y - PROJECTILE_SIZE, PROJECTILE_SIZE * 2, PROJECTILE_SIZE * 2)
-            for enemy in self.enemies[:]:
-                if proj_rect.colliderect(enemy.get_rect()):
-                    projectiles.remove(projectile)
-                    if enemy.take_damage():
-                        self.enemies.remove(enemy)
-                        kills += 1
-                    break
+            x0, y0, x1, y1 = projectile.prev_x, projectile.prev_y, projectile.x, projectile.y
+            first = None
+            for enemy in self.enemies:
+                r = enemy.get_rect()
+                t = segment_entry(x0, y0, x1, y1, r.left - grow, r.top - grow, r.right + grow, r.bottom + grow)
+                if t is not None and (first is None or t < first[0]):
+                    first = (t, enemy)
+                    if t == 0.0:
+                        break
+            if first is not None:
+                enemy = first[1]
+                projectiles.remove(projectile)
+                if enemy.take_damage():
+                    self.enemies.remove(enemy)
+                    kills += 1
         
         # Check player hits
         for enemy in self.enemies[:]:
@@ -313,15 +646,13 @@ class EnemyManager:
         return kills, player_hit, powerup_collected
 
     def spawn_powerup(self, power_type):
-        x = random.randint(50, SCREEN_WIDTH - 50)
-        y = random.randint(50, SCREEN_HEIGHT - 150)
-        self.powerups.append(PowerUp(x, y, self.wave_count, power_type))
-        print(f"{power_type.capitalize()} powerup spawned in wave {self.wave_count}")
+        x = self.rng.randint(50, SCREEN_WIDTH - 50)
+        y = self.rng.randint(50, SCREEN_HEIGHT - 150)
+        self.powerups.append(powerup_pool.acquire(x, y, self.wave_count, power_type))
+        self.telemetry.emit('powerup_spawn', self.clock.get_ticks(), type=power_type, wave=self.wave_count, x=x, y=y)
  
     def apply_dda(self, player_lives, survival_time, score_rate):
-        x = 2.0 # lives weight
-        y = 1.0 # survival time weight
-        z = 0.5 # score rate weight
+        x, y, z = self.dda_weights # lives, survival time and score rate weights
 
         effective_time = math.log(survival_time + 1)
 
@@ -332,18 +663,37 @@ class EnemyManager:
 
         performance = (lives_effect * x) + (effective_time * y) + (score_rate * z)
 
-        print(f"DDA: lives={player_lives}, time={survival_time:.1f}, "f"rate={score_rate:.2f}, perf={performance:.1f}")
-
-        EASY_THRESHOLD = 7
-        HARD_THRESHOLD = 10
+        EASY_THRESHOLD, HARD_THRESHOLD = self.dda_thresholds
+        config = self.spawn_config
+        min_rate, max_rate = config.spawn_rate_limits
+        min_speed, max_speed = config.speed_factor_limits
+        previous = (self.spawn_rate, self.enemy_speed_factor)
 
         if performance < EASY_THRESHOLD:
-            self.spawn_rate = min(3000, self.spawn_rate + 200)
-            self.enemy_speed_factor = max(0.7, self.enemy_speed_factor - 0.05)
-            print(f"Easier: spawn={self.spawn_rate}, speed_factor={self.enemy_speed_factor:.2f}")
+            self.spawn_rate = min(max_rate, self.spawn_rate + config.spawn_rate_step)
+            self.enemy_speed_factor = max(min_speed, self.enemy_speed_factor - config.speed_factor_step)
+            decision = 'easier'
         elif performance > HARD_THRESHOLD:
-            self.spawn_rate = max(400, self.spawn_rate - 200)
-            self.enemy_speed_factor = min(2.0, self.enemy_speed_factor + 0.05)
-            print(f"Harder: spawn={self.spawn_rate}, speed_factor={self.enemy_speed_factor:.2f}")
+            self.spawn_rate = max(min_rate, self.spawn_rate - config.spawn_rate_step)
+            self.enemy_speed_factor = min(max_speed, self.enemy_speed_factor + config.speed_factor_step)
+            decision = 'harder'
         else:
-            print("Keeping balanced")
\ No newline at end of file
+            decision = 'balanced'
+
+        if self.spawn_rate != previous[0]:
+            self.schedule_spawn()
+
+        now = self.clock.get_ticks()
+        self.telemetry.emit('dda', now, lives=player_lives, time=survival_time, rate=score_rate,
+                       performance=performance, decision=decision, wave=self.wave_count)
+        if (self.spawn_rate, self.enemy_speed_factor) != previous:
+            self.telemetry.emit('difficulty', now, decision=decision, spawn_rate=self.spawn_rate,
+                           speed_factor=self.enemy_speed_factor)
+        return performance
+
+def create_enemy_manager(backend=ENEMY_BACKEND, **kwargs):
+    if backend == "numpy":
+        # NumPy is only needed for the structure-of-arrays backend
+        from enemy_soa import VectorEnemyManager
+        return VectorEnemyManager(**kwargs)
+    return EnemyManager(**kwargs)
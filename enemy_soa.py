@@ -0,0 +1,386 @@
+import numpy as np
+from config import *
+from enemy import Enemy, EnemyManager, enemy_ids
+from player import projectile_pool
+from pool import compact
+from projectile_soa import sweep_segments
+from spatial import segment_entry
+
+class EnemyStore:
+    # Structure-of-arrays enemy storage, only the first `count` slots are live
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.uid = np.zeros(capacity, dtype=np.int64)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vel_x = np.zeros(capacity)
+        self.vel_y = np.zeros(capacity)
+        self.health = np.zeros(capacity, dtype=np.int32)
+        self.hit_flash = np.zeros(capacity)
+        self.animation_frame = np.zeros(capacity)
+        self.is_boss = np.zeros(capacity, dtype=bool)
+
+    def arrays(self):
+        return (self.uid, self.x, self.y, self.prev_x, self.prev_y, self.vel_x, self.vel_y, self.health,
+                self.hit_flash, self.animation_frame, self.is_boss)
+
+    def grow(self):
+        capacity = len(self.x) * 2
+        for name in ('uid', 'x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'health', 'hit_flash', 'animation_frame',
+                     'is_boss'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, is_boss=False):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.uid[i] = next(enemy_ids)
+        self.x[i] = x
+        self.y[i] = y
+        self.prev_x[i] = x
+        self.prev_y[i] = y
+        self.vel_x[i] = 0.0
+        self.vel_y[i] = 0.0
+        self.health[i] = 3 if is_boss else 1
+        self.hit_flash[i] = 0
+        self.animation_frame[i] = 0
+        self.is_boss[i] = is_boss
+        self.count += 1
+        return i
+
+    def compact(self, keep):
+        # keep is a boolean mask over the live slots
+        n = int(np.count_nonzero(keep))
+        if n == self.count:
+            return
+        for array in self.arrays():
+            array[:n] = array[:self.count][keep]
+        self.count = n
+
+    def update(self, target_x, target_y, dt, speed_factor, push_x=None, push_y=None):
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        vel_x, vel_y = self.vel_x[:n], self.vel_y[:n]
+        max_speed = ENEMY_MAX_SPEED * speed_factor
+        max_acceleration = ENEMY_MAX_ACCELERATION * speed_factor
+        slow_radius = ENEMY_SLOW_RADIUS / speed_factor
+
+        # Arrive steering, same math as Enemy.arrive
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+        arrived = distance < ENEMY_TARGET_RADIUS
+        distance[arrived] = 1.0
+
+        target_speed = np.where(distance > slow_radius, max_speed, max_speed * (distance / slow_radius))
+        accel_x = ((dx / distance) * target_speed - vel_x) / ENEMY_TIME_TO_TARGET
+        accel_y = ((dy / distance) * target_speed - vel_y) / ENEMY_TIME_TO_TARGET
+        if push_x is not None:
+            weight = ENEMY_SEPARATION_WEIGHT * speed_factor
+            accel_x += push_x * weight
+            accel_y += push_y * weight
+
+        # Limit acceleration
+        accel_mag = np.sqrt(accel_x * accel_x + accel_y * accel_y)
+        clamp = accel_mag > max_acceleration
+        accel_x[clamp] = (accel_x[clamp] / accel_mag[clamp]) * max_acceleration
+        accel_y[clamp] = (accel_y[clamp] / accel_mag[clamp]) * max_acceleration
+
+        vel_x += accel_x * dt
+        vel_y += accel_y * dt
+        vel_x[arrived] = 0.0
+        vel_y[arrived] = 0.0
+
+        # Integrate
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += vel_x * dt
+        y += vel_y * dt
+
+        frames = dt * BASE_FPS
+        self.animation_frame[:n] += frames
+        flash = self.hit_flash[:n]
+        flash[flash > 0] -= frames
+
+    def separation(self):
+        # Vectorized EnemyManager.separation_pushes. Regular pairs are found on a
+        # grid sized to their spacing; pairs involving a boss, which reach twice
+        # as far, on a coarser grid searched from the bosses only
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        is_boss = self.is_boss[:n]
+        radius = np.where(is_boss, ENEMY_SIZE * 2, ENEMY_SIZE).astype(np.float64)
+        push_x = np.zeros(n)
+        push_y = np.zeros(n)
+
+        def apply(i, j, both):
+            dx = x[i] - x[j]
+            dy = y[i] - y[j]
+            spacing = radius[i] + radius[j]
+            dist_sq = dx * dx + dy * dy
+            close = (dist_sq > 0) & (dist_sq < spacing * spacing)
+            if not close.any():
+                return
+            i, j, dx, dy, spacing, both = i[close], j[close], dx[close], dy[close], spacing[close], both[close]
+            distance = np.sqrt(dist_sq[close])
+            strength = (1 - distance / spacing) / distance
+            fx = dx * strength
+            fy = dy * strength
+            push_x[:] += np.bincount(i, fx, minlength=n) - np.bincount(j, fx * both, minlength=n)
+            push_y[:] += np.bincount(i, fy, minlength=n) - np.bincount(j, fy * both, minlength=n)
+
+        regular = np.flatnonzero(~is_boss)
+        for i, j in neighbour_pairs(x, y, regular, regular, ENEMY_SIZE * 2):
+            forward = i < j
+            i, j = i[forward], j[forward]
+            apply(i, j, np.ones(len(i)))
+        bosses = np.flatnonzero(is_boss)
+        if len(bosses):
+            everyone = np.arange(n)
+            for i, j in neighbour_pairs(x, y, bosses, everyone, ENEMY_SIZE * 4):
+                # Boss pairs show up from both sides, regular partners only once
+                apply(i, j, (~is_boss[j]).astype(np.float64))
+        return push_x, push_y
+
+    def nearest_targets(self, targets):
+        # Per-enemy coordinates of the closest of several targets
+        n = self.count
+        target_x, target_y = np.asarray(targets, dtype=np.float64).T
+        dx = self.x[:n, None] - target_x
+        dy = self.y[:n, None] - target_y
+        nearest = np.argmin(dx * dx + dy * dy, axis=1)
+        return target_x[nearest], target_y[nearest]
+
+    def off_screen(self):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return (y > SCREEN_HEIGHT + 100) | (y < -100) | (x < -100) | (x > SCREEN_WIDTH + 100)
+
+    def rect_bounds(self):
+        # Integer rect edges matching pygame.Rect(x - size, y - size, 2 * size, 2 * size)
+        n = self.count
+        size = np.where(self.is_boss[:n], ENEMY_SIZE * 2, ENEMY_SIZE)
+        left = np.trunc(self.x[:n] - size).astype(np.int64)
+        top = np.trunc(self.y[:n] - size).astype(np.int64)
+        return left, top, left + size * 2, top + size * 2
+
+def neighbour_pairs(x, y, a, b, cell):
+    # Candidate (a, b) index pairs in the same or adjacent cells, one array
+    # pair per neighbouring row of cells. b is sorted by row-major cell key so
+    # the three cells of a row are one contiguous searchsorted range, which
+    # keeps the work close to O(n)
+    origin_x = x[b].min() - cell
+    origin_y = y[b].min() - cell
+    bx = ((x[b] - origin_x) // cell).astype(np.int64)
+    by = ((y[b] - origin_y) // cell).astype(np.int64)
+    ax = ((x[a] - origin_x) // cell).astype(np.int64)
+    ay = ((y[a] - origin_y) // cell).astype(np.int64)
+    stride = int(max(bx.max(), ax.max())) + 2
+    b_key = by * stride + bx
+    order = np.argsort(b_key, kind='stable')
+    sorted_key = b_key[order]
+    for oy in (-1, 0, 1):
+        row = (ay + oy) * stride + ax
+        start = np.searchsorted(sorted_key, row - 1, 'left')
+        counts = np.searchsorted(sorted_key, row + 1, 'right') - start
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        i = np.repeat(a, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        yield i, b[order[np.repeat(start, counts) + within]]
+
+class EnemyView:
+    # Thin Enemy-compatible view onto one slot of an EnemyStore
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def _field(name, cast):
+        def get(self):
+            return cast(getattr(self.store, name)[self.index])
+
+        def set(self, value):
+            getattr(self.store, name)[self.index] = value
+        return property(get, set)
+
+    uid = _field('uid', int)
+    x = _field('x', float)
+    y = _field('y', float)
+    prev_x = _field('prev_x', float)
+    prev_y = _field('prev_y', float)
+    vel_x = _field('vel_x', float)
+    vel_y = _field('vel_y', float)
+    health = _field('health', int)
+    hit_flash = _field('hit_flash', float)
+    animation_frame = _field('animation_frame', float)
+    is_boss = _field('is_boss', bool)
+    del _field
+
+    draw = Enemy.draw
+    sprite_blits = Enemy.sprite_blits
+    draw_regular = Enemy.draw_regular
+    draw_boss = Enemy.draw_boss
+    draw_boss_hull = Enemy.draw_boss_hull
+    draw_boss_core = Enemy.draw_boss_core
+    draw_boss_health = Enemy.draw_boss_health
+    is_off_screen = Enemy.is_off_screen
+    get_rect = Enemy.get_rect
+    take_damage = Enemy.take_damage
+
+class VectorEnemyManager(EnemyManager):
+    def __init__(self, **kwargs):
+        # EnemyManager.__init__ assigns self.enemies = [], which creates the store
+        super().__init__(**kwargs)
+
+    @property
+    def enemies(self):
+        return [EnemyView(self.store, i) for i in range(self.store.count)]
+
+    @enemies.setter
+    def enemies(self, enemies):
+        self.store = EnemyStore(max(256, len(enemies)))
+        for enemy in enemies:
+            i = self.store.add(enemy.x, enemy.y, enemy.is_boss)
+            self.store.uid[i] = enemy.uid
+            self.store.prev_x[i] = enemy.prev_x
+            self.store.prev_y[i] = enemy.prev_y
+            self.store.vel_x[i] = enemy.vel_x
+            self.store.vel_y[i] = enemy.vel_y
+            self.store.health[i] = enemy.health
+            self.store.hit_flash[i] = enemy.hit_flash
+            self.store.animation_frame[i] = enemy.animation_frame
+
+    def add_enemy(self, x, y, is_boss=False):
+        self.store.add(x, y, is_boss)
+
+    def interpolate(self, alpha):
+        n = self.store.count
+        x, y = self.store.x[:n], self.store.y[:n]
+        saved = (x.copy(), y.copy())
+        x += (self.store.prev_x[:n] - x) * (1 - alpha)
+        y += (self.store.prev_y[:n] - y) * (1 - alpha)
+        return saved
+
+    def restore_positions(self, saved):
+        n = len(saved[0])
+        self.store.x[:n] = saved[0]
+        self.store.y[:n] = saved[1]
+
+    def update_enemies(self, dt):
+        if self.separation and self.store.count > 1:
+            push_x, push_y = self.store.separation()
+        else:
+            push_x = push_y = None
+        if len(self.targets) > 1:
+            target_x, target_y = self.store.nearest_targets(self.targets)
+        else:
+            target_x, target_y = self.targets[0]
+        self.store.update(target_x, target_y, dt, self.enemy_speed_factor, push_x, push_y)
+        off_screen = self.store.off_screen()
+        if off_screen.any():
+            self.store.compact(~off_screen)
+
+    def enemy_bounds(self):
+        return self.store.rect_bounds()
+
+    def damage_enemy(self, index):
+        store = self.store
+        store.health[index] -= 1
+        store.hit_flash[index] = 10
+        return store.health[index] <= 0
+
+    def remove_enemies(self, alive):
+        self.store.compact(np.asarray(alive, dtype=bool))
+
+    def check_collisions(self, projectiles, player_rect):
+        if not isinstance(projectiles, list):
+            return projectiles.collide(self, player_rect)
+        return self.check_collisions_many([(projectiles, player_rect)])[0]
+
+    def check_collisions_many(self, shooters):
+        # Bounds are computed once for every shooter
+        store = self.store
+        left, top, right, bottom = store.rect_bounds()
+        alive = np.ones(store.count, dtype=bool)
+
+        outcomes = []
+        removed = False
+        for projectiles, player_rect in shooters:
+            kills = 0
+            player_hit = False
+
+            # Check projectile hits along each projectile's path this tick, each
+            # projectile is consumed by the first live enemy it reaches
+            consumed = set()
+            pairs = sweep_segments([p.prev_x for p in projectiles], [p.prev_y for p in projectiles],
+                                   [p.x for p in projectiles], [p.y for p in projectiles], left, top, right, bottom)
+            for p_index, e_index in pairs:
+                if p_index in consumed or not alive[e_index]:
+                    continue
+                consumed.add(p_index)
+                if self.damage_enemy(e_index):
+                    alive[e_index] = False
+                    kills += 1
+
+            # Check player hits, only the first hit counts
+            hits = np.flatnonzero(alive & (left < player_rect.right) & (player_rect.left < right)
+                                  & (top < player_rect.bottom) & (player_rect.top < bottom))
+            if len(hits):
+                alive[hits[0]] = False
+                player_hit = True
+
+            if consumed:
+                compact(projectiles, [i not in consumed for i in range(len(projectiles))], projectile_pool)
+            removed = removed or kills or player_hit
+            outcomes.append((kills, player_hit))
+
+        if removed:
+            store.compact(alive)
+
+        return [(kills, player_hit, self.collect_powerup(player_rect))
+                for (kills, player_hit), (_, player_rect) in zip(outcomes, shooters)]
+
+    def check_collisions_brute_force(self, projectiles, player_rect):
+        # Reference O(n * m) path over the store. self.enemies hands out fresh
+        # views, so removals go through the alive mask like the batched pass
+        store = self.store
+        left, top, right, bottom = store.rect_bounds()
+        alive = np.ones(store.count, dtype=bool)
+        kills = 0
+        player_hit = False
+
+        grow = PROJECTILE_SIZE
+        for projectile in projectiles[:]:
+            x0, y0, x1, y1 = projectile.prev_x, projectile.prev_y, projectile.x, projectile.y
+            first = None
+            for i in np.flatnonzero(alive).tolist():
+                t = segment_entry(x0, y0, x1, y1, left[i] - grow, top[i] - grow, right[i] + grow, bottom[i] + grow)
+                if t is not None and (first is None or t < first[0]):
+                    first = (t, i)
+                    if t == 0.0:
+                        break
+            if first is not None:
+                projectiles.remove(projectile)
+                if self.damage_enemy(first[1]):
+                    alive[first[1]] = False
+                    kills += 1
+
+        for i in np.flatnonzero(alive).tolist():
+            if player_rect.colliderect((left[i], top[i], right[i] - left[i], bottom[i] - top[i])):
+                alive[i] = False
+                player_hit = True
+                break
+
+        if not alive.all():
+            store.compact(alive)
+        return kills, player_hit, self.collect_powerup(player_rect)
@@ -1,145 +1,212 @@
+import time
+startup = time.perf_counter()
+import argparse
 import pygame
 import sys
 import math
 from config import *
-from player import Player
-from enemy import EnemyManager
+from simulation import GameSimulation, FixedTimestep, FrameInput
+from text_cache import TextCache, LazyFont
+from sprites import load_assets
+from profiler import profiler
+from telemetry import telemetry
+from renderer import Renderer
+from waves import add_spawn_arguments, spawn_config_from_args
 
-pygame.init()
+parser = argparse.ArgumentParser(description="Dynamic Defenders")
+parser.add_argument('--record', metavar='PATH', help="Record each session's input to PATH")
+parser.add_argument('--replay', metavar='PATH', help="Play back a recorded session")
+parser.add_argument('--replay-speed', type=float, default=1.0, help="Playback speed multiplier")
+parser.add_argument('--telemetry', metavar='PATH', nargs='?', const="telemetry.jsonl",
+                    help="Log game events to a rotating JSONL file (default telemetry.jsonl)")
+parser.add_argument('--pipelined', action='store_true', default=PIPELINED_RENDERING,
+                    help="Simulate the next frame on a worker thread while drawing this one (toggle with F6)")
+parser.add_argument('--startup-report', action='store_true',
+                    help="Print import, first-frame and asset load times, then quit")
+add_spawn_arguments(parser)
+args = parser.parse_args()
+spawn_config = spawn_config_from_args(parser, args)
+if args.telemetry:
+    telemetry.start(args.telemetry)
+
+imports_done = time.perf_counter()
+# Only the subsystems the game uses; pygame.init() would also open the audio
+# device and scan joysticks. delay() starts SDL's timer so get_ticks() counts
+pygame.display.init()
+pygame.font.init()
+pygame.time.delay(1)
 
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Dynamic Defenders")
 clock = pygame.time.Clock()
 
-player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
-enemy_manager = EnemyManager()
+sim = GameSimulation(spawn_config=spawn_config)
+timestep = FixedTimestep()
+recorder = None
+session = 0
+replay_log = None
+if args.record or args.replay:
+    from replay import InputRecorder, InputLog, session_path
+    if args.replay:
+        replay_log = InputLog(args.replay)
+replay_inputs = None
+# Worker thread for pipelined rendering, created the first time it's switched on
+pipeline = None
+pipelined = False
 
-font = pygame.font.Font(None, 36)
-small_font = pygame.font.Font(None, 24)
-large_font = pygame.font.Font(None, 72)
-title_font = pygame.font.Font(None, 96)
+font = LazyFont(None, 36)
+small_font = LazyFont(None, 24)
+large_font = LazyFont(None, 72)
+title_font = LazyFont(None, 96)
+profiler_font = LazyFont('monospace', 14, system=True)
+text_cache = TextCache()
+assets = None
+first_frame = None
 game_state = "start"
-start_time = pygame.time.get_ticks()
-
-# Track last DDA check
-last_dda_wave = 0
 dt = 0
-final_survival_time = 0
-
-# Projectile boost tracking
-projectile_boost_active = False
-projectile_boost_end_time = 0
-
-# Begin AI Generated
-# Background stars
-stars = []
-for _ in range(100):
-    x = pygame.math.Vector2(
-        random.randint(0, SCREEN_WIDTH),
-        random.randint(0, SCREEN_HEIGHT)
-    )
-    speed = random.uniform(0.5, 2.0)
-    size = random.randint(1, 3)
-    stars.append({'pos': x, 'speed': speed, 'size': size})
-
-def draw_background(screen, dt):
-    # Draw animated starfield
-    for star in stars:
-        # Move star down
-        star['pos'].y += star['speed'] * 60 * dt
-        
-        # Wrap around
-        if star['pos'].y > SCREEN_HEIGHT:
-            star['pos'].y = 0
-            star['pos'].x = random.randint(0, SCREEN_WIDTH)
-        
-        # Draw star with twinkle effect
-        brightness = 150 + int(50 * math.sin(pygame.time.get_ticks() * 0.005 + star['pos'].x))
-        color = (brightness, brightness, brightness)
-        pygame.draw.circle(screen, color, (int(star['pos'].x), int(star['pos'].y)), star['size'])
-
-def draw_ui_with_outline(screen, text, font, x, y, color, outline_color=BLACK):
-    # Draw outline
-    for dx in [-2, 0, 2]:
-        for dy in [-2, 0, 2]:
-            if dx != 0 or dy != 0:
-                outline_surf = font.render(text, True, outline_color)
-                screen.blit(outline_surf, (x + dx, y + dy))
-    # Draw main text
-    text_surf = font.render(text, True, color)
-    screen.blit(text_surf, (x, y))
-# End AI Generated
+
+# Background stars, built with the other assets after the first frame
+starfield = None
+renderer = Renderer(screen)
+
+def start_session():
+    # Every session gets a fresh seeded simulation so its recording replays exactly
+    global sim, recorder, session, replay_inputs
+    if recorder is not None:
+        recorder.close(sim)
+        recorder = None
+    timestep.reset()
+    if replay_log is not None:
+        sim = replay_log.simulation(spawn_config=spawn_config)
+        timestep.dt = replay_log.dt
+        replay_inputs = replay_log.inputs()
+        return
+    seed = random.getrandbits(64)
+    sim = GameSimulation(seed=seed, spawn_config=spawn_config)
+    if args.record:
+        session += 1
+        recorder = InputRecorder(session_path(args.record, session), seed, timestep.dt)
+
+def simulate(inputs, frame_time):
+    # Fixed-rate simulation ticks for one rendered frame, returns the game
+    # state after them and the render alpha. Runs on the pipeline's worker
+    # thread when pipelined
+    global recorder
+    for _ in range(timestep.advance(frame_time)):
+        if replay_inputs is not None:
+            inputs = next(replay_inputs, None)
+            if inputs is None:
+                # Recording ended before the game did
+                sim.final_survival_time = sim.survival_time()
+                sim.game_over = True
+                return "game_over", 1.0
+        elif recorder is not None:
+            recorder.record(inputs)
+        sim.step(inputs, timestep.dt)
+        if sim.game_over:
+            if recorder is not None:
+                recorder.close(sim)
+                recorder = None
+            return "game_over", 1.0
+    return "playing", timestep.alpha
+
+def finish_frame():
+    # Wait for the frame the worker is simulating, sim is ours again after
+    global game_state
+    if pipeline is not None and pipeline.busy:
+        result = pipeline.collect().result
+        if result is not None:
+            game_state = result
+
+def set_pipelined(enabled):
+    global pipeline, pipelined
+    finish_frame()
+    if enabled and pipeline is None:
+        from pipeline import RenderPipeline
+        pipeline = RenderPipeline()
+    pipelined = enabled
+
+def draw_ui_with_outline(screen, text, font, x, y, color, outline_color=BLACK, dynamic=False):
+    # Cached outlined label, dynamic labels are assembled from cached glyphs
+    renderer.add(text_cache.draw(screen, text, font, x, y, color, outline_color, dynamic))
+
+if replay_log is not None:
+    start_session()
+    game_state = "playing"
+if args.pipelined:
+    set_pipelined(True)
 
 running = True
 while running:
+    profiler.begin_frame()
+    profiler.begin('input')
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
         if event.type == pygame.KEYDOWN:
-            if game_state == "start" and event.key == pygame.K_SPACE:
+            if event.key == pygame.K_F3:
+                profiler.toggle()
+            elif event.key == pygame.K_F5:
+                renderer.toggle()
+            elif event.key == pygame.K_F6:
+                set_pipelined(not pipelined)
+            elif event.key == pygame.K_F4:
+                if profiler.trace_file is None:
+                    profiler.start_trace(PROFILER_TRACE_FILE or "trace.jsonl")
+                else:
+                    profiler.stop_trace()
+            elif game_state == "start" and event.key == pygame.K_SPACE:
                 # start
                 game_state = "playing"
-                start_time = pygame.time.get_ticks()
+                start_session()
             elif game_state == "game_over" and event.key == pygame.K_r:
                 # restart
-                player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
-                enemy_manager = EnemyManager()
+                start_session()
                 game_state = "playing"
-                last_dda_wave = 0
-                projectile_boost_active = False
-                projectile_boost_end_time = 0
-                start_time = pygame.time.get_ticks()
     
+    alpha = 1.0
     if game_state == "playing":
-        current_survival_time = (pygame.time.get_ticks() - start_time) / 1000
-        if current_survival_time > 0:
-            score_rate = player.score / current_survival_time
+        # Fixed-rate simulation ticks, decoupled from the render rate
+        inputs = FrameInput.from_pygame(pygame.key.get_pressed(), pygame.mouse.get_pos(), pygame.mouse.get_pressed())
+    profiler.end('input')
+
+    frame = None
+    if game_state == "playing" and pipelined:
+        # Draw the frame the worker finished while it simulates the next one
+        with profiler.scope('sim_wait'):
+            frame = pipeline.collect(sim, timestep.alpha)
+        if frame.result is not None:
+            game_state = frame.result
+        if game_state == "playing":
+            pipeline.submit(sim, simulate, inputs, dt * args.replay_speed)
+    elif game_state == "playing":
+        with profiler.scope('sim'):
+            game_state, alpha = simulate(inputs, dt * args.replay_speed)
+
+        if SKIP_RENDER_WHEN_BEHIND and timestep.behind:
+            profiler.end_frame()
+            dt = clock.tick(FPS) / 1000.0
+            continue
+
+    player = sim.player
+    enemy_manager = sim.enemy_manager
+    if profiler.enabled:
+        if frame is not None:
+            profiler.count('enemies', frame.enemies.count)
+            profiler.count('projectiles', frame.projectiles.count)
+            profiler.count('powerups', frame.powerup_count)
         else:
-            score_rate = 0
+            profiler.count('enemies', len(enemy_manager.enemies))
+            profiler.count('projectiles', len(player.projectiles))
+            profiler.count('powerups', len(enemy_manager.powerups))
+        profiler.count('dirty_px', renderer.dirty_area)
 
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()
-        
-        player.handle_input(keys, mouse_pos, mouse_pressed)
-        player.update()
-        
-        enemy_manager.set_player_pos(player.x, player.y)
-        enemy_manager.update(dt)
-        
-        kills, player_hit, powerup = enemy_manager.check_collisions(player.projectiles, player.get_rect())
-
-        # Powerup collection
-        if powerup == "heal" and player.lives < 3:
-            player.lives += 1
-            print("Player healed! Lives =", player.lives)
-        elif powerup == "speed":
-            projectile_boost_active = True
-            projectile_boost_end_time = pygame.time.get_ticks() + 10000
-            player.projectile_speed_multiplier = 2.0
-            print("Projectile speed boost activated!")
-
-        player.score += kills * 10
-        
-        if player_hit:
-            if player.take_damage():
-                final_survival_time = (pygame.time.get_ticks() - start_time) / 1000
-                game_state = "game_over"
-        
-        # Apply DDA
-        if enemy_manager.wave_count > last_dda_wave and enemy_manager.wave_count % DDA_CHECK_INTERVAL == 0:
-            enemy_manager.apply_dda(player.lives, current_survival_time, score_rate)
-            last_dda_wave = enemy_manager.wave_count
-
-        # temporary projectile speed boost
-        if projectile_boost_active:
-            if pygame.time.get_ticks() > projectile_boost_end_time:
-                projectile_boost_active = False
-                player.projectile_speed_multiplier = 1.0
-                print("Projectile speed boost ended")
-
-    screen.fill(SPACE_BLACK)
-    draw_background(screen, dt)
+    with profiler.scope('background'):
+        renderer.begin()
+        if starfield is not None:
+            starfield.update_and_draw(screen, dt, pygame.time.get_ticks())
+            if renderer.dirty:
+                renderer.add(starfield.rects(renderer.threshold))
     
     if game_state == "start":
         # START SCREEN
@@ -150,49 +217,59 @@ while running:
         
         pulse = abs(math.sin(pygame.time.get_ticks() * 0.003))
         start_color = (int(255 * pulse), int(255 * pulse), int(255 * pulse))
-        draw_ui_with_outline(screen, 'Press SPACE to Start', font, SCREEN_WIDTH // 2 - 120, 500, start_color)
+        draw_ui_with_outline(screen, 'Press SPACE to Start', font, SCREEN_WIDTH // 2 - 120, 500, start_color, dynamic=True)
     
     elif game_state == "playing":
-        player.draw(screen)
-        enemy_manager.draw(screen)
-        
-        current_survival_time = (pygame.time.get_ticks() - start_time) / 1000
+        if frame is not None:
+            # sim belongs to the worker, everything drawn comes from the snapshot
+            with profiler.scope('draw'):
+                renderer.add(frame.draw(screen))
+            lives, score, current_survival_time, wave, spawn_rate, boost_active = frame.hud
+        else:
+            with profiler.scope('draw'), sim.interpolated(alpha):
+                renderer.add(player.draw(screen))
+                renderer.add(enemy_manager.draw(screen))
+            lives, score, current_survival_time = player.lives, player.score, sim.survival_time()
+            wave, spawn_rate, boost_active = enemy_manager.wave_count, enemy_manager.spawn_rate, sim.projectile_boost_active
+
+        profiler.begin('hud')
     
         # Lives (left side)
-        lives_text = f'Lives: {player.lives}'
+        lives_text = f'Lives: {lives}'
         draw_ui_with_outline(screen, lives_text, font, 10, 10, RED)
         
         # Score
-        score_text = f'Score: {player.score}'
+        score_text = f'Score: {score}'
         draw_ui_with_outline(screen, score_text, font, 10, 50, YELLOW)
         
         # Time
         time_text = f'Time: {current_survival_time:.1f}s'
-        draw_ui_with_outline(screen, time_text, font, 10, 90, WHITE)
+        draw_ui_with_outline(screen, time_text, font, 10, 90, WHITE, dynamic=True)
         
         # Wave
-        wave_text = f'Wave: {enemy_manager.wave_count}'
+        wave_text = f'Wave: {wave}'
         draw_ui_with_outline(screen, wave_text, font, SCREEN_WIDTH - 200, 10, CYAN)
         
         # Spawn rate indicator
-        spawn_text = f'Spawn (s): {enemy_manager.spawn_rate/1000:.1f}s'
+        spawn_text = f'Spawn (s): {spawn_rate/1000:.1f}s'
         draw_ui_with_outline(screen, spawn_text, font, SCREEN_WIDTH - 200, 50, YELLOW)
     
         # Begin AI Generated
         # Show boost status with pulsing effect
-        if projectile_boost_active:
+        if boost_active:
             pulse = abs(math.sin(pygame.time.get_ticks() * 0.005))
             boost_color = (255, int(255 * pulse), 0)
             boost_text = 'Projectile Speed Boost Active!'
-            draw_ui_with_outline(screen, boost_text, font, SCREEN_WIDTH // 2 - 150, 10, boost_color)
+            draw_ui_with_outline(screen, boost_text, font, SCREEN_WIDTH // 2 - 150, 10, boost_color, dynamic=True)
         
         instructions = 'WASD: Move | Mouse: Aim | Left Click: Shoot'
         draw_ui_with_outline(screen, instructions, small_font, SCREEN_WIDTH // 2 - 140, SCREEN_HEIGHT - 30, WHITE)
+        profiler.end('hud')
 
     elif game_state == "game_over":
-        player.draw(screen)
-        enemy_manager.draw(screen)
-        current_survival_time = final_survival_time
+        renderer.add(player.draw(screen))
+        renderer.add(enemy_manager.draw(screen))
+        final_survival_time = sim.final_survival_time
         # Game Over screen with arcade style
         # Title
         draw_ui_with_outline(screen, 'GAME OVER', large_font, SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 100, RED)
@@ -211,11 +288,35 @@ while running:
         pulse = abs(math.sin(pygame.time.get_ticks() * 0.003))
         restart_color = (int(255 * pulse), int(255 * pulse), int(255 * pulse))
         restart_text = 'Press R to Restart'
-        draw_ui_with_outline(screen, restart_text, font, SCREEN_WIDTH // 2 - 130, SCREEN_HEIGHT // 2 + 130, restart_color)
+        draw_ui_with_outline(screen, restart_text, font, SCREEN_WIDTH // 2 - 130, SCREEN_HEIGHT // 2 + 130, restart_color, dynamic=True)
         # End AI Generated
 
-    pygame.display.flip()
+    renderer.add(profiler.draw(screen, profiler_font))
+    with profiler.scope('flip'):
+        renderer.present()
+    if first_frame is None:
+        first_frame = time.perf_counter()
+        # Sprites and glow effects are built behind the start screen, after
+        # the first frame so the thread doesn't compete with it for the GIL
+        if USE_SPRITE_CACHE:
+            assets = load_assets()
+        from starfield import Starfield
+        starfield = Starfield(STAR_COUNT)
+    if args.startup_report and (assets is None or not assets.is_alive()):
+        assets_done = time.perf_counter()
+        print(f"startup: imports {(imports_done - startup) * 1000:.0f} ms, "
+              f"first frame {(first_frame - startup) * 1000:.0f} ms, "
+              f"assets ready {(assets_done - startup) * 1000:.0f} ms (from the start of main.py)")
+        running = False
+    profiler.end_frame()
     dt = clock.tick(FPS) / 1000.0
 
+if pipeline is not None:
+    finish_frame()
+    pipeline.close()
+if recorder is not None:
+    recorder.close(sim)
+profiler.stop_trace()
+telemetry.stop()
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import asyncio
+import math
+import struct
+from collections import OrderedDict
+from config import *
+
+# Wire protocol of the multiplayer server. Every message is a 4 byte length
+# followed by a payload whose first byte is its type. A snapshot lists the
+# world as integer fields per entity, keyed by entity uid, and is encoded
+# against a state the client has acknowledged: only removed entities and the
+# fields that changed are sent, as zigzag varint differences
+PROTOCOL_VERSION = 1
+HELLO, WELCOME, INPUT, SNAPSHOT = b'HWIS'
+
+LENGTH = struct.Struct('!I')
+HELLO_FORMAT = struct.Struct('!BB')  # type, protocol version
+WELCOME_FORMAT = struct.Struct('!BHHH')  # type, player id, tick rate, snapshot rate
+INPUT_FORMAT = struct.Struct('!BIBhh')  # type, acknowledged tick, buttons, aim x, aim y
+SNAPSHOT_HEADER = struct.Struct('!BII')  # type, tick, base tick (0 for a full snapshot)
+
+# Entity kinds in wire order and their fields. x and y are in 1/NET_POSITION_SCALE px
+KINDS = (
+    ('meta', ('wave', 'spawn_rate', 'speed_factor', 'time')),
+    ('players', ('x', 'y', 'aim', 'lives', 'score', 'flags')),
+    ('enemies', ('x', 'y', 'flags', 'health')),
+    ('projectiles', ('x', 'y')),
+    ('powerups', ('x', 'y', 'type')),
+)
+# Player flags
+PLAYER_HIT, PLAYER_BOOST, PLAYER_DEAD = 1, 2, 4
+# Enemy flags
+ENEMY_BOSS, ENEMY_HIT = 1, 2
+POWERUP_TYPES = ('heal', 'speed')
+
+def frame(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+async def read_message(reader):
+    length, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    return await reader.readexactly(length)
+
+def world_state(sim):
+    # Quantized snapshot of a MultiplayerSimulation: {kind: {uid: fields}}
+    q = NET_POSITION_SCALE
+    manager = sim.enemy_manager
+    players = {}
+    projectiles = {}
+    for player_id, player in sim.players.items():
+        aim = int(math.atan2(player.mouse_y - player.y, player.mouse_x - player.x) / (2 * math.pi) * 256) & 255
+        flags = ((PLAYER_HIT if player.hit_flash > 0 else 0) | (PLAYER_BOOST if player_id in sim.boost_end_times else 0)
+                 | (PLAYER_DEAD if player_id in sim.respawn_times else 0))
+        players[player_id] = (round(player.x * q), round(player.y * q), aim, player.lives, player.score, flags)
+        for projectile in player.projectiles:
+            projectiles[projectile.uid] = (round(projectile.x * q), round(projectile.y * q))
+
+    store = getattr(manager, 'store', None)
+    if store is not None:
+        # Structure-of-arrays backend, quantized in one pass instead of through views
+        n = store.count
+        flags = store.is_boss[:n] * ENEMY_BOSS + (store.hit_flash[:n] > 0) * ENEMY_HIT
+        enemies = dict(zip(store.uid[:n].tolist(),
+                           zip((store.x[:n] * q).round().astype(int).tolist(),
+                               (store.y[:n] * q).round().astype(int).tolist(),
+                               flags.tolist(), store.health[:n].tolist())))
+    else:
+        enemies = {enemy.uid: (round(enemy.x * q), round(enemy.y * q),
+                               (ENEMY_BOSS if enemy.is_boss else 0) | (ENEMY_HIT if enemy.hit_flash > 0 else 0),
+                               enemy.health)
+                   for enemy in manager.enemies}
+
+    # At most one powerup of each type per wave
+    powerups = {p.wave_spawned * 2 + POWERUP_TYPES.index(p.power_type): (round(p.x * q), round(p.y * q),
+                                                                          POWERUP_TYPES.index(p.power_type))
+                for p in manager.powerups}
+    meta = {0: (manager.wave_count, int(manager.spawn_rate), round(manager.enemy_speed_factor * 100),
+                int(sim.survival_time() * 10))}
+    return {'meta': meta, 'players': players, 'enemies': enemies, 'projectiles': projectiles, 'powerups': powerups}
+
+def put_varint(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def get_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def encode_delta(state, base=None):
+    # Per kind: removed uids, then changed or new entities as uid, a bitmask of
+    # the fields that differ and those differences. uids go in ascending order
+    # as gaps from the previous one, so each costs a byte or two
+    out = bytearray()
+    for kind, fields in KINDS:
+        current = state[kind]
+        previous = base[kind] if base is not None else {}
+        removed = sorted(uid for uid in previous if uid not in current)
+        put_varint(out, len(removed))
+        last = 0
+        for uid in removed:
+            put_varint(out, uid - last)
+            last = uid
+
+        zeros = (0,) * len(fields)
+        changes = bytearray()
+        count = 0
+        last = 0
+        for uid in sorted(current):
+            values = current[uid]
+            old = previous.get(uid)
+            if old == values:
+                continue
+            if old is None:
+                old = zeros
+            count += 1
+            put_varint(changes, uid - last)
+            last = uid
+            mask_at = len(changes)
+            changes.append(0)
+            mask = 0
+            for i, (value, old_value) in enumerate(zip(values, old)):
+                if value != old_value:
+                    mask |= 1 << i
+                    diff = value - old_value
+                    put_varint(changes, diff << 1 if diff >= 0 else (-diff << 1) - 1)
+            changes[mask_at] = mask
+        put_varint(out, count)
+        out += changes
+    return bytes(out)
+
+def decode_delta(data, offset=0, base=None):
+    state = {}
+    for kind, fields in KINDS:
+        entities = dict(base[kind]) if base is not None else {}
+        count, offset = get_varint(data, offset)
+        uid = 0
+        for _ in range(count):
+            gap, offset = get_varint(data, offset)
+            uid += gap
+            entities.pop(uid, None)
+
+        zeros = (0,) * len(fields)
+        count, offset = get_varint(data, offset)
+        uid = 0
+        for _ in range(count):
+            gap, offset = get_varint(data, offset)
+            uid += gap
+            mask = data[offset]
+            offset += 1
+            values = list(entities.get(uid, zeros))
+            i = 0
+            while mask:
+                if mask & 1:
+                    zigzag, offset = get_varint(data, offset)
+                    values[i] += (zigzag >> 1) ^ -(zigzag & 1)
+                mask >>= 1
+                i += 1
+            entities[uid] = tuple(values)
+        state[kind] = entities
+    return state
+
+def interpolate_states(a, b, alpha):
+    # Positions of the entities in b, moved back toward a by 1 - alpha where a has them too
+    state = {}
+    for kind, _ in KINDS:
+        older = a[kind]
+        entities = {}
+        for uid, values in b[kind].items():
+            old = older.get(uid)
+            if old is not None and kind != 'meta':
+                values = (old[0] + (values[0] - old[0]) * alpha, old[1] + (values[1] - old[1]) * alpha) + values[2:]
+            entities[uid] = values
+        state[kind] = entities
+    return state
+
+class NetClient:
+    # Client end of the protocol: decodes snapshots against the states it
+    # already has and acknowledges the newest with every input message.
+    # Decoded snapshots are kept in `timeline` as (tick, receive time, state)
+    def __init__(self, history=NET_SNAPSHOT_HISTORY * 2):
+        self.history = history
+        self.reader = None
+        self.writer = None
+        self.player_id = None
+        self.tick_rate = NET_TICK_RATE
+        self.snapshot_rate = NET_SNAPSHOT_RATE
+        self.states = OrderedDict()
+        self.timeline = []
+        self.latest_tick = 0
+        self.clock_offset = None
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+
+    async def connect(self, host=NET_HOST, port=NET_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(frame(HELLO_FORMAT.pack(HELLO, PROTOCOL_VERSION)))
+        message = await read_message(self.reader)
+        if message[0] != WELCOME:
+            raise ConnectionError("Server did not accept the connection")
+        _, self.player_id, self.tick_rate, self.snapshot_rate = WELCOME_FORMAT.unpack(message)
+
+    async def receive(self):
+        # Runs until the server closes the connection
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                message = await read_message(self.reader)
+                self.bytes_received += len(message) + LENGTH.size
+                if message[0] == SNAPSHOT:
+                    self.apply_snapshot(message, loop.time())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def apply_snapshot(self, message, now):
+        _, tick, base_tick = SNAPSHOT_HEADER.unpack_from(message)
+        if tick <= self.latest_tick:
+            return
+        if base_tick:
+            base = self.states.get(base_tick)
+            if base is None:
+                # Base already dropped, wait for a snapshot we can decode
+                return
+        else:
+            base = None
+            self.full_snapshots += 1
+        state = decode_delta(message, SNAPSHOT_HEADER.size, base)
+        self.snapshots += 1
+        self.latest_tick = tick
+        self.states[tick] = state
+        while len(self.states) > self.history:
+            self.states.popitem(last=False)
+        self.timeline.append((tick, now, state))
+        del self.timeline[:-8]
+        # Smoothed server clock, seconds of server time minus local time
+        offset = tick / self.tick_rate - now
+        if self.clock_offset is None or offset > self.clock_offset:
+            self.clock_offset = offset
+        else:
+            self.clock_offset += (offset - self.clock_offset) * 0.05
+
+    def latest(self):
+        return self.timeline[-1][2] if self.timeline else None
+
+    def render_state(self, now, delay=NET_INTERP_DELAY / 1000):
+        # World as it was `delay` seconds ago on the server, between the two
+        # snapshots around that time
+        if not self.timeline:
+            return None
+        render_tick = (now + self.clock_offset - delay) * self.tick_rate
+        previous = self.timeline[0]
+        if render_tick <= previous[0]:
+            return previous[2]
+        for entry in self.timeline[1:]:
+            if entry[0] >= render_tick:
+                alpha = (render_tick - previous[0]) / (entry[0] - previous[0])
+                return interpolate_states(previous[2], entry[2], alpha)
+            previous = entry
+        return previous[2]
+
+    def send_input(self, frame_input):
+        if self.writer is None or self.writer.is_closing():
+            return
+        buttons = (frame_input.left | frame_input.right << 1 | frame_input.up << 2 | frame_input.down << 3
+                   | frame_input.fire << 4)
+        aim_x = max(-32768, min(32767, int(frame_input.aim_x)))
+        aim_y = max(-32768, min(32767, int(frame_input.aim_y)))
+        self.writer.write(frame(INPUT_FORMAT.pack(INPUT, self.latest_tick, buttons, aim_x, aim_y)))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
@@ -0,0 +1,200 @@
+# Pipelined rendering: a worker thread simulates frame N+1 while the main
+# thread draws frame N. Each simulated frame is captured into one of two
+# array-backed FrameSnapshots, so the main thread draws one while the worker
+# fills the other and no game objects are copied or shared between them.
+# CPython only overlaps the two where the GIL is released (numpy kernels,
+# SDL blits and the display flip), so the numpy backends gain the most.
+import queue
+import threading
+from config import *
+from enemy import PowerUp
+from enemy_soa import EnemyStore, EnemyView
+from player import Player
+from profiler import Profiler, profiler
+from projectile_soa import ProjectileStore
+from sprites import get_sprite_cache
+
+ENEMY_FIELDS = ('x', 'y', 'health', 'hit_flash', 'animation_frame', 'is_boss')
+PROJECTILE_FIELDS = ('x', 'y', 'vel_x', 'vel_y')
+
+class ShipPose:
+    # The player fields the ship is drawn from
+    __slots__ = ('x', 'y', 'mouse_x', 'mouse_y', 'hit_flash', 'animation_frame')
+
+    def __init__(self):
+        self.x = self.y = self.mouse_x = self.mouse_y = 0.0
+        self.hit_flash = self.animation_frame = 0
+
+    ship_blits = Player.ship_blits
+    draw_ship = Player.draw_ship
+
+def reserve(store, n):
+    # Grow an empty store until n slots fit, live slots aren't kept
+    store.count = 0
+    while len(store.x) < n:
+        store.grow()
+    store.count = n
+
+class FrameSnapshot:
+    # Everything one rendered frame reads, at the interpolated positions.
+    # Arrays are reused from capture to capture and only grow
+    def __init__(self):
+        self.ship = ShipPose()
+        self.enemies = EnemyStore()
+        self.projectiles = ProjectileStore()
+        self.powerups = []
+        self.powerup_count = 0
+        # lives, score, survival time, wave, spawn rate, boost active
+        self.hud = (0, 0, 0.0, 0, 0, False)
+        self.result = None
+
+    def capture(self, sim, alpha):
+        with sim.interpolated(alpha):
+            self.capture_ship(sim.player)
+            self.capture_enemies(sim.enemy_manager)
+            self.capture_projectiles(sim.player)
+        self.capture_powerups(sim.enemy_manager.powerups)
+        manager = sim.enemy_manager
+        self.hud = (sim.player.lives, sim.player.score, sim.survival_time(), manager.wave_count,
+                    manager.spawn_rate, sim.projectile_boost_active)
+
+    def capture_ship(self, player):
+        ship = self.ship
+        ship.x = player.x
+        ship.y = player.y
+        ship.mouse_x = player.mouse_x
+        ship.mouse_y = player.mouse_y
+        ship.hit_flash = player.hit_flash
+        ship.animation_frame = player.animation_frame
+
+    def capture_enemies(self, manager):
+        store = getattr(manager, 'store', None)
+        if store is not None:
+            n = store.count
+            reserve(self.enemies, n)
+            for name in ENEMY_FIELDS:
+                getattr(self.enemies, name)[:n] = getattr(store, name)[:n]
+            return
+        enemies = manager.enemies
+        reserve(self.enemies, len(enemies))
+        n = len(enemies)
+        for name in ENEMY_FIELDS:
+            getattr(self.enemies, name)[:n] = [getattr(enemy, name) for enemy in enemies]
+
+    def capture_projectiles(self, player):
+        projectiles = player.projectiles
+        target = self.projectiles
+        if isinstance(projectiles, ProjectileStore):
+            n = projectiles.count
+            reserve(target, n)
+            for name in PROJECTILE_FIELDS + ('trail', 'trail_head', 'trail_count'):
+                getattr(target, name)[:n] = getattr(projectiles, name)[:n]
+            return
+        n = len(projectiles)
+        reserve(target, n)
+        for name in PROJECTILE_FIELDS:
+            getattr(target, name)[:n] = [getattr(projectile, name) for projectile in projectiles]
+        # Trails oldest first from slot 0
+        target.trail_head[:n] = 0
+        for i, projectile in enumerate(projectiles):
+            filled = len(projectile.trail)
+            target.trail_count[i] = filled
+            if filled:
+                target.trail[i, :filled] = list(projectile.trail)
+
+    def capture_powerups(self, powerups):
+        # A handful at most, kept as PowerUp objects reset in place
+        while len(self.powerups) < len(powerups):
+            self.powerups.append(PowerUp(0, 0, 0, 'heal'))
+        for mine, p in zip(self.powerups, powerups):
+            mine.reset(p.x, p.y, p.wave_spawned, p.power_type)
+            mine.animation_frame = p.animation_frame
+            mine.float_offset = p.float_offset
+        self.powerup_count = len(powerups)
+
+    def draw(self, screen):
+        # Same blits in the same order as Player.draw then EnemyManager.draw
+        enemies = [EnemyView(self.enemies, i) for i in range(self.enemies.count)]
+        powerups = self.powerups[:self.powerup_count]
+        sprites = get_sprite_cache()
+        if sprites is None:
+            self.ship.draw_ship(screen)
+            for entity in (*self.projectiles, *powerups, *enemies):
+                entity.draw(screen)
+            return None
+
+        batch = self.ship.ship_blits(sprites)
+        batch.extend(self.projectiles.sprite_blits(sprites))
+        rects = screen.blits(batch)
+        batch = []
+        for p in powerups:
+            batch.extend(p.sprite_blits(sprites))
+        for enemy in enemies:
+            batch.extend(enemy.sprite_blits(sprites))
+        rects.extend(screen.blits(batch))
+        return rects
+
+class RenderPipeline:
+    # Runs one frame's simulation on a worker thread. submit() hands it a
+    # step callable, collect() waits for the frame and returns its snapshot.
+    # The two snapshots alternate, the one collected last is safe to draw
+    # until the next collect(). The worker times the simulation's scopes with
+    # its own Profiler, merged into the main one by collect()
+    def __init__(self):
+        self.snapshots = (FrameSnapshot(), FrameSnapshot())
+        self.profiler = Profiler(enabled=False)
+        self.back = 0
+        self.jobs = queue.Queue(maxsize=1)
+        self.done = queue.Queue(maxsize=1)
+        self.busy = False
+        self.thread = threading.Thread(target=self.work, name='simulation', daemon=True)
+        self.thread.start()
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            sim, step, args, snapshot = job
+            own = self.profiler
+            own.enabled = profiler.enabled
+            own.frame_times.clear()
+            sim.profiler = own
+            try:
+                # step(*args) -> (result, alpha)
+                snapshot.result, alpha = step(*args)
+                snapshot.capture(sim, alpha)
+                error = None
+            except BaseException as e:
+                error = e
+            sim.profiler = profiler
+            self.done.put((snapshot, error))
+
+    def submit(self, sim, step, *args):
+        # sim belongs to the worker until the next collect()
+        snapshot = self.snapshots[self.back]
+        self.back ^= 1
+        self.busy = True
+        self.jobs.put((sim, step, args, snapshot))
+
+    def collect(self, sim=None, alpha=1.0):
+        # The frame submitted last, or with none in flight sim captured as it is
+        if not self.busy:
+            snapshot = self.snapshots[self.back]
+            self.back ^= 1
+            snapshot.result = None
+            snapshot.capture(sim, alpha)
+            return snapshot
+        snapshot, error = self.done.get()
+        self.busy = False
+        # The worker is idle until the next submit(), its times are safe to read
+        profiler.merge(self.profiler.frame_times)
+        if error is not None:
+            raise error
+        return snapshot
+
+    def close(self):
+        if self.busy:
+            self.collect()
+        self.jobs.put(None)
+        self.thread.join()
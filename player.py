@@ -1,27 +1,118 @@
+import itertools
 import pygame
 import math
 from config import *
+from pool import Pool
+from sprites import get_sprite_cache
+from effects import get_effects
+
+class Trail:
+    # Fixed-size ring buffer of recent positions, iterates oldest first
+    __slots__ = ('points', 'head', 'count')
+
+    def __init__(self, size=PROJECTILE_TRAIL_LENGTH):
+        self.points = [None] * size
+        self.head = 0
+        self.count = 0
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, point):
+        size = len(self.points)
+        if self.count < size:
+            self.points[(self.head + self.count) % size] = point
+            self.count += 1
+        else:
+            # Overwrite the oldest point
+            self.points[self.head] = point
+            self.head = (self.head + 1) % size
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        points = self.points
+        size = len(points)
+        for i in range(self.count):
+            yield points[(self.head + i) % size]
+
+projectile_ids = itertools.count(1)
 
 class Projectile:
+    __slots__ = ('uid', 'x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'trail', 'frame')
+
     def __init__(self, x, y, angle, speed_multiplier=1.0):
+        self.trail = Trail()
+        self.reset(x, y, angle, speed_multiplier)
+
+    def reset(self, x, y, angle, speed_multiplier=1.0):
+        self.uid = next(projectile_ids)
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         speed = PROJECTILE_SPEED * speed_multiplier
         self.vel_x = math.cos(angle) * speed
         self.vel_y = math.sin(angle) * speed
-        self.trail = []
+        self.trail.clear()
         self.frame = 0
     
-    def update(self):
-        self.trail.append((int(self.x), int(self.y)))
-        if len(self.trail) > 5:
-            self.trail.pop(0)    
-        self.x += self.vel_x
-        self.y += self.vel_y
-        self.frame += 1
+    def update(self, dt=1 / BASE_FPS):
+        # Velocities are per 60 Hz frame, the trail samples once per such
+        # frame: on the tick that starts at or crosses a whole frame
+        frames = dt * BASE_FPS
+        if math.ceil(self.frame) < self.frame + frames:
+            self.trail.append((int(self.x), int(self.y)))
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.vel_x * frames
+        self.y += self.vel_y * frames
+        self.frame += frames
     
-    # Begin AI Generated
     def draw(self, screen):
+        sprites = get_sprite_cache()
+        if sprites is not None:
+            screen.blits(self.sprite_blits(sprites), doreturn=False)
+        else:
+            self.draw_shape(screen)
+
+    def sprite_blits(self, sprites):
+        effects = get_effects()
+        if effects is not None:
+            return [effects.trail_blit(self.x, self.y, self.vel_x, self.vel_y, len(self.trail)),
+                    Projectile.core_blit(sprites, self.x, self.y)]
+
+        dots = sprites.group(('trail', len(self.trail)), Projectile.trail_sprites, len(self.trail))
+        batch = [(dot, (tx - offset, ty - offset)) for (dot, offset), (tx, ty) in zip(dots, self.trail)]
+
+        extent = PROJECTILE_SIZE + 3
+        core = sprites.get(('projectile',), Projectile.draw_core, (extent * 2, extent * 2), (extent, extent))
+        batch.append((core, (int(self.x) - extent, int(self.y) - extent)))
+        return batch
+
+    @staticmethod
+    def core_blit(sprites, x, y):
+        # Solid core drawn over the additive halo
+        extent = PROJECTILE_SIZE + 1
+        core = sprites.get(('projectile_core',), draw_dot, (extent * 2, extent * 2), (extent, extent),
+                           radius=PROJECTILE_SIZE, color=YELLOW)
+        return (core, (int(x) - extent, int(y) - extent))
+
+    @staticmethod
+    def trail_sprites(sprites, length):
+        dots = []
+        for i in range(length):
+            radius = max(2, int(PROJECTILE_SIZE * (i / length)))
+            color = (255, 255, 100 + int(155 * (i / length)))
+            dot = sprites.get(('trail', i, length), draw_dot, (radius * 2 + 2, radius * 2 + 2), (radius + 1, radius + 1),
+                              radius=radius, color=color)
+            dots.append((dot, radius + 1))
+        return dots
+
+    # Begin AI Generated
+    def draw_shape(self, screen):
         # Draw trail
         for i, pos in enumerate(self.trail):
             alpha = int(255 * (i / len(self.trail)))
@@ -29,6 +120,9 @@ class Projectile:
             color = (255, 255, 100 + int(155 * (i / len(self.trail))))
             pygame.draw.circle(screen, color, pos, max(2, int(size)))
         
+        self.draw_core(screen)
+
+    def draw_core(self, screen):
         # Draw main projectile with glow
         glow_color = (255, 255, 150)
         pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), PROJECTILE_SIZE + 2)
@@ -40,14 +134,24 @@ class Projectile:
                 self.y < 0 or self.y > SCREEN_HEIGHT)
 
 
+projectile_pool = Pool(Projectile)
+
+
+def draw_dot(pose, screen):
+    pygame.draw.circle(screen, pose.color, (pose.x, pose.y), pose.radius)
+
+
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, clock=pygame.time):
+        self.clock = clock
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         self.lives = PLAYER_LIVES
         self.score = 0
         self.projectiles = []
-        self.last_shot_time = 0
+        self.last_shot_time = float('-inf')
         self.mouse_x = x
         self.mouse_y = y
         self.projectile_speed_multiplier = 1.0
@@ -55,45 +159,111 @@ class Player:
         self.hit_flash = 0
     
     def handle_input(self, keys, mouse_pos, mouse_pressed):
+        self.apply_input(keys[pygame.K_LEFT] or keys[pygame.K_a],
+                         keys[pygame.K_RIGHT] or keys[pygame.K_d],
+                         keys[pygame.K_UP] or keys[pygame.K_w],
+                         keys[pygame.K_DOWN] or keys[pygame.K_s],
+                         mouse_pos, mouse_pressed[0])
+
+    def apply_input(self, left, right, up, down, mouse_pos, fire, dt=1 / BASE_FPS):
         self.mouse_x, self.mouse_y = mouse_pos
         
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.x -= PLAYER_SPEED
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.x += PLAYER_SPEED
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.y -= PLAYER_SPEED
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.y += PLAYER_SPEED
+        # PLAYER_SPEED is per 60 Hz frame
+        speed = PLAYER_SPEED * dt * BASE_FPS
+        if left:
+            self.x -= speed
+        if right:
+            self.x += speed
+        if up:
+            self.y -= speed
+        if down:
+            self.y += speed
         
         self.x = max(PLAYER_SIZE, min(self.x, SCREEN_WIDTH - PLAYER_SIZE))
         self.y = max(PLAYER_SIZE, min(self.y, SCREEN_HEIGHT - PLAYER_SIZE))
         
-        if mouse_pressed[0]:
+        if fire:
             self.shoot()
     
     def shoot(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if current_time - self.last_shot_time > FIRE_COOLDOWN:
             dx = self.mouse_x - self.x
             dy = self.mouse_y - self.y
             angle = math.atan2(dy, dx)
             
-            self.projectiles.append(Projectile(self.x, self.y, angle, self.projectile_speed_multiplier))
+            # Spread shots fan out evenly around the aim direction
+            for i in range(PROJECTILE_SPREAD):
+                self.spawn_projectile(angle + (i - (PROJECTILE_SPREAD - 1) / 2) * PROJECTILE_SPREAD_ANGLE)
             self.last_shot_time = current_time
+
+    def spawn_projectile(self, angle):
+        self.projectiles.append(projectile_pool.acquire(self.x, self.y, angle, self.projectile_speed_multiplier))
     
-    def update(self):
-        self.animation_frame += 1
+    def update(self, dt=1 / BASE_FPS):
+        frames = dt * BASE_FPS
+        self.animation_frame += frames
         if self.hit_flash > 0:
-            self.hit_flash -= 1
+            self.hit_flash -= frames
         
-        for projectile in self.projectiles[:]:
-            projectile.update()
+        projectiles = self.projectiles
+        write = 0
+        for projectile in projectiles:
+            projectile.update(dt)
             if projectile.is_off_screen():
-                self.projectiles.remove(projectile)
+                projectile_pool.release(projectile)
+            else:
+                projectiles[write] = projectile
+                write += 1
+        del projectiles[write:]
+
+    def interpolate(self, alpha):
+        # Move the ship and projectiles to their render positions, returns what restore_positions needs
+        movers = [self]
+        movers.extend(self.projectiles)
+        saved = [(m.x, m.y) for m in movers]
+        for m in movers:
+            m.x = m.prev_x + (m.x - m.prev_x) * alpha
+            m.y = m.prev_y + (m.y - m.prev_y) * alpha
+        return saved
+
+    def restore_positions(self, saved):
+        self.x, self.y = saved[0]
+        for projectile, (x, y) in zip(self.projectiles, saved[1:]):
+            projectile.x = x
+            projectile.y = y
     
-    # Begin AI Generated
     def draw(self, screen):
+        sprites = get_sprite_cache()
+        if sprites is not None:
+            batch = self.ship_blits(sprites)
+            for projectile in self.projectiles:
+                batch.extend(projectile.sprite_blits(sprites))
+            return screen.blits(batch)
+
+        self.draw_ship(screen)
+        
+        # Draw projectiles
+        for projectile in self.projectiles:
+            projectile.draw(screen)
+
+    def ship_blits(self, sprites):
+        extent = PLAYER_SIZE + 4
+        step = sprites.heading_step(math.atan2(self.mouse_y - self.y, self.mouse_x - self.x))
+        angle = sprites.heading_angle(step)
+        flash = self.hit_flash > 0
+        engine_frame = 0 if self.animation_frame % 6 < 3 else 3
+        ship = sprites.get(('ship', step, flash, engine_frame), Player.draw_ship, (extent * 2, extent * 2), (extent, extent),
+                           mouse_x=extent + math.cos(angle) * 100, mouse_y=extent + math.sin(angle) * 100,
+                           hit_flash=flash, animation_frame=engine_frame)
+        batch = [(ship, (int(self.x) - extent, int(self.y) - extent))]
+        effects = get_effects()
+        if effects is not None:
+            batch.insert(0, effects.glow_blit(self.x, self.y, PLAYER_SIZE * 2, (0, 90, 110)))
+        return batch
+
+    # Begin AI Generated
+    def draw_ship(self, screen):
         # Draw spaceship player
         ship_color = WHITE if self.hit_flash > 0 else CYAN
         
@@ -139,10 +309,6 @@ class Player:
         engine_x = self.x - math.cos(angle) * (size * 0.4)
         engine_y = self.y - math.sin(angle) * (size * 0.4)
         pygame.draw.circle(screen, engine_color, (int(engine_x), int(engine_y)), 4)
-        
-        # Draw projectiles
-        for projectile in self.projectiles:
-            projectile.draw(screen)
     # End AI Generated
     
     def get_rect(self):
@@ -151,4 +317,11 @@ class Player:
     def take_damage(self):
         self.lives -= 1
         self.hit_flash = 30
-        return self.lives <= 0
\ No newline at end of file
+        return self.lives <= 0
+
+def create_player(x, y, backend=PROJECTILE_BACKEND, **kwargs):
+    if backend == "numpy":
+        # NumPy is only needed for the batched projectile backend
+        from projectile_soa import VectorPlayer
+        return VectorPlayer(x, y, **kwargs)
+    return Player(x, y, **kwargs)
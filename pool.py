@@ -0,0 +1,39 @@
+from config import *
+
+class Pool:
+    # Free-list of reusable objects. Pooled classes implement reset() with
+    # the same arguments as __init__
+    def __init__(self, cls, max_size=POOL_MAX_SIZE):
+        self.cls = cls
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.cls(*args)
+
+    def release(self, obj):
+        if len(self.free) < self.max_size:
+            self.free.append(obj)
+
+    def clear(self):
+        self.free.clear()
+
+def compact(items, keep, pool=None):
+    # Order-preserving in-place removal of items whose keep flag is False,
+    # removed items go back to the pool
+    write = 0
+    for item, alive in zip(items, keep):
+        if alive:
+            items[write] = item
+            write += 1
+        elif pool is not None:
+            pool.release(item)
+    del items[write:]
@@ -0,0 +1,165 @@
+import contextlib
+import csv
+import json
+import sys
+import time
+import pygame
+from collections import deque
+from config import *
+from stats import percentile
+
+_NULL_SCOPE = contextlib.nullcontext()
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        frame = self.profiler.frame_times
+        frame[self.name] = frame.get(self.name, 0.0) + time.perf_counter() - self.start
+
+class Profiler:
+    # Named timing scopes with rolling per-frame percentiles. When disabled,
+    # scope() hands back a shared no-op context so the hooks can stay in place
+    def __init__(self, enabled=PROFILER_ENABLED, window=PROFILER_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.scopes = {}
+        # Names begun this frame, so an end() whose begin() ran while
+        # disabled doesn't close a scope left over from an earlier frame
+        self.open = set()
+        self.history = {}
+        self.frame_times = {}
+        self.counts = {}
+        self.frame_start = 0.0
+        self.alloc_start = 0
+        self.frame_index = 0
+        self.trace_file = None
+        self.trace_writer = None
+        self.overlay_lines = []
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_times.clear()
+        self.open.clear()
+        self.frame_start = time.perf_counter()
+        self.alloc_start = sys.getallocatedblocks()
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = _Scope(self, name)
+        return scope
+
+    def begin(self, name):
+        # For regions that don't fit a with block
+        if self.enabled:
+            self.scope(name).__enter__()
+            self.open.add(name)
+
+    def end(self, name):
+        if self.enabled and name in self.open:
+            self.open.discard(name)
+            self.scopes[name].__exit__(None, None, None)
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+
+    def merge(self, frame_times):
+        # Adds scope times measured by another Profiler, such as the
+        # pipeline worker's, to this frame
+        if not self.enabled:
+            return
+        frame = self.frame_times
+        for name, seconds in frame_times.items():
+            frame[name] = frame.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_times.clear()
+        self.open.clear()
+        self.frame_start = time.perf_counter()
+        self.alloc_start = sys.getallocatedblocks()
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame_times['frame'] = time.perf_counter() - self.frame_start
+        self.counts['allocated_blocks'] = sys.getallocatedblocks() - self.alloc_start
+        for name, seconds in self.frame_times.items():
+            samples = self.history.get(name)
+            if samples is None:
+                samples = self.history[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+        if self.trace_file is not None:
+            self.write_trace()
+        self.frame_index += 1
+
+    def percentiles(self, name):
+        values = sorted(self.history.get(name, ()))
+        return percentile(values, 50), percentile(values, 95), percentile(values, 99)
+
+    def report(self):
+        return {name: self.percentiles(name) for name in self.history}
+
+    # Trace export
+    def start_trace(self, path):
+        self.stop_trace()
+        self.trace_file = open(path, 'w', newline='')
+        if path.endswith('.csv'):
+            self.trace_writer = csv.writer(self.trace_file)
+            self.trace_writer.writerow(['frame', 'kind', 'name', 'value'])
+
+    def stop_trace(self):
+        if self.trace_file is not None:
+            self.trace_file.close()
+        self.trace_file = None
+        self.trace_writer = None
+
+    def write_trace(self):
+        if self.trace_writer is not None:
+            for name, seconds in self.frame_times.items():
+                self.trace_writer.writerow([self.frame_index, 'ms', name, round(seconds * 1000, 4)])
+            for name, value in self.counts.items():
+                self.trace_writer.writerow([self.frame_index, 'count', name, value])
+        else:
+            record = {'frame': self.frame_index,
+                      'ms': {name: round(seconds * 1000, 4) for name, seconds in self.frame_times.items()},
+                      'counts': self.counts}
+            self.trace_file.write(json.dumps(record) + '\n')
+
+    # On-screen overlay
+    def draw(self, screen, font, x=10, y=130, refresh=15):
+        if not self.enabled:
+            return []
+        # Percentiles are re-sorted only every few frames
+        if self.frame_index % refresh == 0 or not self.overlay_lines:
+            lines = ['scope          p50     p95     p99 (ms)']
+            for name in sorted(self.history, key=lambda n: (n != 'frame', n)):
+                p50, p95, p99 = self.percentiles(name)
+                lines.append(f'{name:<12}{p50 * 1000:>6.2f}  {p95 * 1000:>6.2f}  {p99 * 1000:>6.2f}')
+            lines.extend(f'{name:<12}{value:>6}' for name, value in sorted(self.counts.items()))
+            self.overlay_lines = [font.render(line, True, WHITE) for line in lines]
+
+        line_height = font.get_linesize()
+        width = max(surface.get_width() for surface in self.overlay_lines) + 12
+        panel = pygame.Surface((width, line_height * len(self.overlay_lines) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        rect = screen.blit(panel, (x - 6, y - 4))
+        screen.blits([(surface, (x, y + i * line_height)) for i, surface in enumerate(self.overlay_lines)], doreturn=False)
+        return [rect]
+
+profiler = Profiler()
+if PROFILER_TRACE_FILE:
+    profiler.start_trace(PROFILER_TRACE_FILE)
@@ -0,0 +1,315 @@
+import math
+import numpy as np
+from config import *
+from player import Player, Projectile
+from sprites import get_sprite_cache
+from effects import get_effects
+
+# Upper bound on projectile x enemy pairs tested per chunk of the swept pass
+SWEEP_CHUNK = 1 << 16
+
+def sweep_segments(x0, y0, x1, y1, left, top, right, bottom):
+    # Swept test of each projectile's path this tick ((x0, y0) -> (x1, y1))
+    # against enemy boxes grown by the projectile size. Returns
+    # (projectile, enemy) pairs ordered by projectile, then entry time along
+    # the path, then enemy index
+    n = len(x0)
+    if n == 0 or len(left) == 0:
+        return []
+    grow = PROJECTILE_SIZE
+    x0 = np.asarray(x0, dtype=np.float64)
+    y0 = np.asarray(y0, dtype=np.float64)
+    x1 = np.asarray(x1, dtype=np.float64)
+    y1 = np.asarray(y1, dtype=np.float64)
+    left = np.asarray(left, dtype=np.float64)[None, :] - grow
+    top = np.asarray(top, dtype=np.float64)[None, :] - grow
+    right = np.asarray(right, dtype=np.float64)[None, :] + grow
+    bottom = np.asarray(bottom, dtype=np.float64)[None, :] + grow
+
+    found_p, found_e, found_t = [], [], []
+    chunk = max(1, SWEEP_CHUNK // left.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, n, chunk):
+            stop = min(n, start + chunk)
+            sx = x0[start:stop, None]
+            sy = y0[start:stop, None]
+            dx = x1[start:stop, None] - sx
+            dy = y1[start:stop, None] - sy
+            # Slab entry/exit times; a zero step yields +-inf inside the
+            # slab and nan on its edge, which never counts as a hit
+            tx1 = (left - sx) / dx
+            tx2 = (right - sx) / dx
+            ty1 = (top - sy) / dy
+            ty2 = (bottom - sy) / dy
+            enter = np.maximum(np.minimum(tx1, tx2), np.minimum(ty1, ty2))
+            leave = np.minimum(np.maximum(tx1, tx2), np.maximum(ty1, ty2))
+            p, e = np.nonzero((enter < leave) & (enter <= 1.0) & (leave > 0.0))
+            if len(p):
+                found_p.append(p + start)
+                found_e.append(e)
+                found_t.append(np.maximum(enter[p, e], 0.0))
+    if not found_p:
+        return []
+    p = np.concatenate(found_p)
+    e = np.concatenate(found_e)
+    t = np.concatenate(found_t)
+    order = np.lexsort((e, t, p))
+    return list(zip(p[order].tolist(), e[order].tolist()))
+
+class ProjectileStore:
+    # Structure-of-arrays projectile storage, only the first `count` slots are
+    # live. Trails share one (capacity, length, 2) ring buffer with a head and
+    # fill count per slot
+    def __init__(self, capacity=256, trail_length=PROJECTILE_TRAIL_LENGTH):
+        self.count = 0
+        self.trail_length = trail_length
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vel_x = np.zeros(capacity)
+        self.vel_y = np.zeros(capacity)
+        self.frame = np.zeros(capacity)
+        self.trail = np.zeros((capacity, trail_length, 2), dtype=np.int32)
+        self.trail_head = np.zeros(capacity, dtype=np.int32)
+        self.trail_count = np.zeros(capacity, dtype=np.int32)
+
+    def arrays(self):
+        return (self.x, self.y, self.prev_x, self.prev_y, self.vel_x, self.vel_y, self.frame,
+                self.trail, self.trail_head, self.trail_count)
+
+    def grow(self):
+        capacity = len(self.x) * 2
+        for name in ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'frame', 'trail', 'trail_head', 'trail_count'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, angle, speed_multiplier=1.0):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        speed = PROJECTILE_SPEED * speed_multiplier
+        self.x[i] = x
+        self.y[i] = y
+        self.prev_x[i] = x
+        self.prev_y[i] = y
+        self.vel_x[i] = math.cos(angle) * speed
+        self.vel_y[i] = math.sin(angle) * speed
+        self.frame[i] = 0
+        self.trail_head[i] = 0
+        self.trail_count[i] = 0
+        self.count += 1
+        return i
+
+    def compact(self, keep):
+        # keep is a boolean mask over the live slots
+        n = int(np.count_nonzero(keep))
+        if n == self.count:
+            return
+        for array in self.arrays():
+            array[:n] = array[:self.count][keep]
+        self.count = n
+
+    def update(self, dt):
+        # Same stepping as Projectile.update for every slot at once
+        n = self.count
+        if n == 0:
+            return
+        frames = dt * BASE_FPS
+        x, y, frame = self.x[:n], self.y[:n], self.frame[:n]
+
+        sampled = np.flatnonzero(np.ceil(frame) < frame + frames)
+        if len(sampled):
+            length = self.trail_length
+            head = self.trail_head[sampled]
+            filled = self.trail_count[sampled]
+            full = filled >= length
+            slot = np.where(full, head, (head + filled) % length)
+            self.trail[sampled, slot, 0] = x[sampled].astype(np.int32)
+            self.trail[sampled, slot, 1] = y[sampled].astype(np.int32)
+            self.trail_head[sampled] = np.where(full, (head + 1) % length, head)
+            self.trail_count[sampled] = np.minimum(filled + 1, length)
+
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vel_x[:n] * frames
+        y += self.vel_y[:n] * frames
+        frame += frames
+
+        off_screen = (x < 0) | (x > SCREEN_WIDTH) | (y < 0) | (y > SCREEN_HEIGHT)
+        if off_screen.any():
+            self.compact(~off_screen)
+
+    def trails(self):
+        # Trail points per live slot, oldest first, as nested lists
+        n = self.count
+        order = (self.trail_head[:n, None] + np.arange(self.trail_length)) % self.trail_length
+        points = self.trail[np.arange(n)[:, None], order].tolist()
+        return [rows[:filled] for rows, filled in zip(points, self.trail_count[:n].tolist())]
+
+    def sweep(self, left, top, right, bottom):
+        n = self.count
+        return sweep_segments(self.prev_x[:n], self.prev_y[:n], self.x[:n], self.y[:n], left, top, right, bottom)
+
+    def collide(self, manager, player_rect):
+        # Same rules as EnemyManager.check_collisions with swept projectile
+        # tests: each projectile is consumed by the first live enemy on its path
+        kills = 0
+        player_hit = False
+
+        left, top, right, bottom = (np.asarray(b) for b in manager.enemy_bounds())
+        alive = np.ones(len(left), dtype=bool)
+        consumed = np.zeros(self.count, dtype=bool)
+        for p_index, e_index in self.sweep(left, top, right, bottom):
+            if consumed[p_index] or not alive[e_index]:
+                continue
+            consumed[p_index] = True
+            if manager.damage_enemy(e_index):
+                alive[e_index] = False
+                kills += 1
+
+        # Check player hits, only the first hit counts
+        if len(left):
+            hits = np.flatnonzero(alive & (left < player_rect.right) & (player_rect.left < right)
+                                  & (top < player_rect.bottom) & (player_rect.top < bottom))
+            if len(hits):
+                alive[hits[0]] = False
+                player_hit = True
+
+        if consumed.any():
+            self.compact(~consumed)
+        if kills or player_hit:
+            manager.remove_enemies(alive)
+
+        return kills, player_hit, manager.collect_powerup(player_rect)
+
+    def sprite_blits(self, sprites):
+        # Blit list in the same order Projectile.sprite_blits produces per projectile
+        extent = PROJECTILE_SIZE + 3
+        core = sprites.get(('projectile',), Projectile.draw_core, (extent * 2, extent * 2), (extent, extent))
+        n = self.count
+        effects = get_effects()
+        if effects is not None:
+            batch = []
+            for x, y, vel_x, vel_y, filled in zip(self.x[:n].tolist(), self.y[:n].tolist(), self.vel_x[:n].tolist(),
+                                                  self.vel_y[:n].tolist(), self.trail_count[:n].tolist()):
+                batch.append(effects.trail_blit(x, y, vel_x, vel_y, filled))
+                batch.append(Projectile.core_blit(sprites, x, y))
+            return batch
+
+        xs = (self.x[:n].astype(np.int64) - extent).tolist()
+        ys = (self.y[:n].astype(np.int64) - extent).tolist()
+        batch = []
+        for points, x, y in zip(self.trails(), xs, ys):
+            dots = sprites.group(('trail', len(points)), Projectile.trail_sprites, len(points))
+            batch.extend((dot, (tx - offset, ty - offset)) for (dot, offset), (tx, ty) in zip(dots, points))
+            batch.append((core, (x, y)))
+        return batch
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (ProjectileView(self, i) for i in range(self.count))
+
+class ProjectileView:
+    # Thin Projectile-compatible view onto one slot of a ProjectileStore
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def _field(name, cast):
+        def get(self):
+            return cast(getattr(self.store, name)[self.index])
+
+        def set(self, value):
+            getattr(self.store, name)[self.index] = value
+        return property(get, set)
+
+    x = _field('x', float)
+    y = _field('y', float)
+    prev_x = _field('prev_x', float)
+    prev_y = _field('prev_y', float)
+    vel_x = _field('vel_x', float)
+    vel_y = _field('vel_y', float)
+    frame = _field('frame', float)
+    del _field
+
+    @property
+    def trail(self):
+        store = self.store
+        head = int(store.trail_head[self.index])
+        filled = int(store.trail_count[self.index])
+        rows = store.trail[self.index].tolist()
+        return [tuple(rows[(head + i) % store.trail_length]) for i in range(filled)]
+
+    draw = Projectile.draw
+    sprite_blits = Projectile.sprite_blits
+    draw_shape = Projectile.draw_shape
+    draw_core = Projectile.draw_core
+    is_off_screen = Projectile.is_off_screen
+
+class VectorPlayer(Player):
+    def __init__(self, x, y, **kwargs):
+        # Player.__init__ assigns self.projectiles = [], which creates the store
+        super().__init__(x, y, **kwargs)
+
+    @property
+    def projectiles(self):
+        return self.store
+
+    @projectiles.setter
+    def projectiles(self, projectiles):
+        self.store = ProjectileStore(max(256, len(projectiles)))
+        for projectile in projectiles:
+            i = self.store.add(projectile.x, projectile.y, 0.0)
+            self.store.prev_x[i] = projectile.prev_x
+            self.store.prev_y[i] = projectile.prev_y
+            self.store.vel_x[i] = projectile.vel_x
+            self.store.vel_y[i] = projectile.vel_y
+            self.store.frame[i] = projectile.frame
+            for point in projectile.trail:
+                self.store.trail[i, self.store.trail_count[i]] = point
+                self.store.trail_count[i] += 1
+
+    def spawn_projectile(self, angle):
+        self.store.add(self.x, self.y, angle, self.projectile_speed_multiplier)
+
+    def update(self, dt=1 / BASE_FPS):
+        frames = dt * BASE_FPS
+        self.animation_frame += frames
+        if self.hit_flash > 0:
+            self.hit_flash -= frames
+        self.store.update(dt)
+
+    def interpolate(self, alpha):
+        store = self.store
+        n = store.count
+        x, y = store.x[:n], store.y[:n]
+        saved = (self.x, self.y, x.copy(), y.copy())
+        self.x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.y = self.prev_y + (self.y - self.prev_y) * alpha
+        x += (store.prev_x[:n] - x) * (1 - alpha)
+        y += (store.prev_y[:n] - y) * (1 - alpha)
+        return saved
+
+    def restore_positions(self, saved):
+        self.x, self.y, x, y = saved
+        n = len(x)
+        self.store.x[:n] = x
+        self.store.y[:n] = y
+
+    def draw(self, screen):
+        sprites = get_sprite_cache()
+        if sprites is not None:
+            batch = self.ship_blits(sprites)
+            batch.extend(self.store.sprite_blits(sprites))
+            return screen.blits(batch)
+
+        self.draw_ship(screen)
+        for projectile in self.store:
+            projectile.draw(screen)
@@ -0,0 +1,70 @@
+import pygame
+from config import *
+
+class Renderer:
+    # Frame presentation. In dirty-rect mode every region drawn last frame is
+    # restored from a cached background and only the old and new regions are
+    # pushed to the display; anything drawn without a rect forces a full flip
+    def __init__(self, screen, dirty=DIRTY_RECT_RENDERING, threshold=DIRTY_RECT_THRESHOLD):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(SPACE_BLACK)
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert(screen)
+        self.dirty = dirty
+        self.threshold = threshold * screen.get_width() * screen.get_height()
+        self.previous = []
+        self.current = []
+        self.untracked = True
+        self.restore_all = True
+        self.dirty_area = 0
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def toggle(self):
+        self.dirty = not self.dirty
+        self.previous = []
+        self.current = []
+        self.restore_all = True
+
+    def begin(self):
+        # Clear whatever the last frame left behind
+        if self.restore_all or not self.dirty:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            background = self.background
+            self.screen.blits([(background, rect, rect) for rect in self.previous], doreturn=False)
+        self.restore_all = False
+        self.untracked = False
+
+    def add(self, rects):
+        # Register drawn regions: a Rect, a list of Rects, or None when the
+        # caller could not say where it drew
+        if not self.dirty:
+            return
+        if rects is None:
+            self.untracked = True
+        elif isinstance(rects, pygame.Rect):
+            self.current.append(rects)
+        else:
+            self.current.extend(rects)
+
+    def present(self):
+        dirty = self.previous + self.current
+        self.dirty_area = self.screen.get_width() * self.screen.get_height()
+        if self.dirty and not self.untracked:
+            area = sum(rect.w * rect.h for rect in dirty)
+            if area <= self.threshold:
+                self.dirty_area = area
+                pygame.display.update(dirty)
+                self.partial_frames += 1
+            else:
+                pygame.display.flip()
+                self.full_frames += 1
+        else:
+            pygame.display.flip()
+            self.full_frames += 1
+            # Untracked pixels can only be cleared by restoring everything
+            self.restore_all = True
+        self.previous = self.current
+        self.current = []
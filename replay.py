@@ -0,0 +1,171 @@
+# Records per-tick input with the session seed and replays it deterministically.
+# Usage: python replay.py session.ddr [--repeat 5] [--profile]
+#        python main.py --replay session.ddr   (rendered)
+import argparse
+import os
+import struct
+import sys
+import time
+from config import *
+from waves import add_spawn_arguments, spawn_config_from_args
+
+MAGIC = b'DDRP'
+VERSION = 4
+# magic, version, seed, tick dt
+HEADER = struct.Struct('<4sBQd')
+# run length, button flags, aim x, aim y; a zero-length run ends the log
+RUN = struct.Struct('<HBhh')
+# ticks, score, survival time at the end of the recording
+SUMMARY = struct.Struct('<IId')
+MAX_RUN = 0xFFFF
+
+LEFT, RIGHT, UP, DOWN, FIRE = 1, 2, 4, 8, 16
+
+
+def pack_input(inputs):
+    flags = ((LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0) | (UP if inputs.up else 0)
+             | (DOWN if inputs.down else 0) | (FIRE if inputs.fire else 0))
+    return flags, int(inputs.aim_x), int(inputs.aim_y)
+
+
+def unpack_input(flags, aim_x, aim_y):
+    from simulation import FrameInput
+    return FrameInput(bool(flags & LEFT), bool(flags & RIGHT), bool(flags & UP), bool(flags & DOWN),
+                      aim_x, aim_y, bool(flags & FIRE))
+
+
+class InputRecorder:
+    # Streams one session's ticks to disk, identical consecutive inputs are
+    # stored as a single run. Aim is kept as whole pixels, as pygame reports it
+    def __init__(self, path, seed, dt=1 / SIM_TICK_RATE):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, dt))
+        self.current = None
+        self.length = 0
+        self.ticks = 0
+
+    def record(self, inputs):
+        packed = pack_input(inputs)
+        if packed == self.current and self.length < MAX_RUN:
+            self.length += 1
+        else:
+            self.flush_run()
+            self.current = packed
+            self.length = 1
+        self.ticks += 1
+
+    def flush_run(self):
+        if self.length:
+            self.file.write(RUN.pack(self.length, *self.current))
+        self.length = 0
+
+    def close(self, sim=None):
+        if self.file is None:
+            return
+        self.flush_run()
+        self.file.write(RUN.pack(0, 0, 0, 0))
+        if sim is not None:
+            self.file.write(SUMMARY.pack(self.ticks, sim.player.score, sim.survival_time()))
+        self.file.close()
+        self.file = None
+
+
+class InputLog:
+    # A recorded session loaded back into memory
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.seed, self.dt = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} input log")
+        self.runs = []
+        offset = HEADER.size
+        self.summary = None
+        while offset + RUN.size <= len(data):
+            run = RUN.unpack_from(data, offset)
+            offset += RUN.size
+            if run[0] == 0:
+                if offset + SUMMARY.size <= len(data):
+                    self.summary = SUMMARY.unpack_from(data, offset)
+                break
+            self.runs.append(run)
+        self.ticks = sum(run[0] for run in self.runs)
+
+    def inputs(self):
+        for length, flags, aim_x, aim_y in self.runs:
+            inputs = unpack_input(flags, aim_x, aim_y)
+            for _ in range(length):
+                yield inputs
+
+    def simulation(self, **kwargs):
+        from simulation import GameSimulation
+        return GameSimulation(seed=self.seed, **kwargs)
+
+
+def session_path(path, session):
+    # First session keeps the given name, restarts get a numbered suffix
+    if session <= 1:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{session}{ext}"
+
+
+def replay(log, **kwargs):
+    # Headless fast-forward through the whole log, returns the simulation.
+    # Each tick is one profiler frame
+    from profiler import profiler
+    sim = log.simulation(**kwargs)
+    for inputs in log.inputs():
+        if sim.game_over:
+            break
+        profiler.begin_frame()
+        sim.step(inputs, log.dt)
+        profiler.end_frame()
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless deterministic replay of a recorded session")
+    parser.add_argument('log')
+    parser.add_argument('--repeat', type=int, default=1, help="Replay this many times and report the best run")
+    parser.add_argument('--backend', default=ENEMY_BACKEND, choices=['python', 'numpy'])
+    parser.add_argument('--profile', action='store_true', help="Print per-scope percentiles from the profiler")
+    parser.add_argument('--trace', help="Write per-tick profiler scopes to a .csv or .jsonl file")
+    parser.add_argument('--telemetry', metavar='PATH', help="Write the game's telemetry events to a JSONL file")
+    add_spawn_arguments(parser)
+    args = parser.parse_args()
+    spawn_config = spawn_config_from_args(parser, args)
+
+    log = InputLog(args.log)
+    print(f"{args.log}: seed={log.seed} ticks={log.ticks} runs={len(log.runs)} dt={log.dt:.6f}")
+    from profiler import profiler
+    from telemetry import telemetry
+    if args.telemetry:
+        telemetry.start(args.telemetry)
+    profiler.enabled = args.profile or args.trace is not None
+    profiler.window = max(log.ticks, 1)
+    if args.trace:
+        profiler.start_trace(args.trace)
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sim = replay(log, enemy_backend=args.backend, spawn_config=spawn_config)
+        best = min(best, time.perf_counter() - start)
+    profiler.stop_trace()
+    telemetry.stop()
+
+    result = (sim.frame, sim.player.score, sim.survival_time())
+    print(f"replayed {sim.frame} ticks in {best:.3f}s ({sim.frame / best:.0f} ticks/s, "
+          f"{sim.frame * log.dt / best:.1f}x real time)")
+    print(f"score={result[1]} survival={result[2]:.2f}s game_over={sim.game_over}")
+    if args.profile:
+        for name, (p50, p95, p99) in sorted(profiler.report().items()):
+            print(f"  {name:<12}{p50 * 1000:>8.3f}{p95 * 1000:>8.3f}{p99 * 1000:>8.3f} ms")
+    if log.summary is not None and result != log.summary:
+        print(f"DIVERGED: recording ended at ticks={log.summary[0]} score={log.summary[1]} "
+              f"survival={log.summary[2]:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+# Packs a GameSimulation into a compact, versioned binary blob and restores
+# it, either into a running simulation (rollback) or into a new one (forking
+# what-if runs from a checkpoint). Entities are stored column by column as
+# array/struct buffers, so the layout is the same for both backends and a
+# state saved with one restores into the other. Numbers are in native byte
+# order, like the array module writes them.
+import struct
+from array import array
+from config import *
+from enemy import enemy_pool, powerup_pool
+from player import projectile_pool
+from simulation import GameSimulation, MultiplayerSimulation, SimClock
+from telemetry import null_telemetry
+from waves import SPAWN_FIELDS, SpawnConfig
+
+MAGIC = b'DDSV'
+VERSION = 2
+BACKENDS = ('python', 'numpy')
+# magic, version, enemy backend, projectile backend, has seed, seed
+HEADER = struct.Struct('=4sHBB?Q')
+# clock ms, start time, boost active, boost end, game over, final survival time, frame
+SIM = struct.Struct('=dq?d?dQ')
+# spawn rate, last spawn time, wave count, enemies spawned, speed factor, separation, DDA weights, DDA thresholds
+MANAGER = struct.Struct('=qdIQd?3d2d')
+# x, y, prev x, prev y, lives, score, last shot, mouse x, mouse y, projectile speed multiplier,
+# animation frame, hit flash
+PLAYER = struct.Struct('=4dqqd2d3d')
+# x, y, wave spawned, type, animation frame, float offset
+POWERUP = struct.Struct('=iiIBdd')
+COUNT = struct.Struct('=I')
+# Mersenne Twister state words, then whether a gauss() value is pending and its value
+RNG = struct.Struct('=?d')
+
+ENEMY_COLUMNS = ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'hit_flash', 'animation_frame')
+PROJECTILE_COLUMNS = ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'frame')
+POWERUP_TYPES = ('heal', 'speed')
+
+
+def spawn_format():
+    # Struct codes follow the SpawnConfig defaults, a new field means a new VERSION
+    codes = {bool: '?', int: 'q', float: 'd'}
+    fmt = '='
+    for default in SPAWN_FIELDS.values():
+        for value in (default if isinstance(default, tuple) else (default,)):
+            fmt += codes[type(value)]
+    return struct.Struct(fmt)
+
+
+SPAWN = spawn_format()
+
+
+def pack_spawn_config(config):
+    values = []
+    for name in SPAWN_FIELDS:
+        value = getattr(config, name)
+        values.extend(value if isinstance(value, tuple) else (value,))
+    return SPAWN.pack(*values)
+
+
+def unpack_spawn_config(values):
+    settings = {}
+    i = 0
+    for name, default in SPAWN_FIELDS.items():
+        width = len(default) if isinstance(default, tuple) else 1
+        settings[name] = tuple(values[i:i + width]) if isinstance(default, tuple) else values[i]
+        i += width
+    return SpawnConfig(**settings)
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def array(self, typecode, count):
+        values = array(typecode)
+        end = self.offset + count * values.itemsize
+        values.frombytes(self.data[self.offset:end])
+        self.offset = end
+        return values
+
+
+def enemy_columns(manager):
+    # uid, per-field doubles, health and boss flags of every enemy in list order
+    store = getattr(manager, 'store', None)
+    if store is not None:
+        n = store.count
+        return (n, store.uid[:n].tobytes(), [getattr(store, name)[:n].tobytes() for name in ENEMY_COLUMNS],
+                store.health[:n].tobytes(), store.is_boss[:n].tobytes())
+    enemies = manager.enemies
+    return (len(enemies), array('q', [enemy.uid for enemy in enemies]).tobytes(),
+            [array('d', [getattr(enemy, name) for enemy in enemies]).tobytes() for name in ENEMY_COLUMNS],
+            array('i', [enemy.health for enemy in enemies]).tobytes(),
+            bytes([enemy.is_boss for enemy in enemies]))
+
+
+def projectile_columns(player):
+    # Trails are stored oldest point first, padded to PROJECTILE_TRAIL_LENGTH
+    length = PROJECTILE_TRAIL_LENGTH
+    projectiles = player.projectiles
+    if not isinstance(projectiles, list):
+        store = projectiles
+        n = store.count
+        trails = store.trails()
+        # Batched projectiles carry no uids
+        uids = bytes(8 * n)
+        columns = [getattr(store, name)[:n].tobytes() for name in PROJECTILE_COLUMNS]
+    else:
+        n = len(projectiles)
+        trails = [list(projectile.trail) for projectile in projectiles]
+        uids = array('q', [projectile.uid for projectile in projectiles]).tobytes()
+        columns = [array('d', [getattr(projectile, name) for projectile in projectiles]).tobytes()
+                   for name in PROJECTILE_COLUMNS]
+    counts = bytes(len(points) for points in trails)
+    flat = array('i', bytes(4 * 2 * length * n))
+    for i, points in enumerate(trails):
+        base = i * 2 * length
+        for j, (x, y) in enumerate(points):
+            flat[base + 2 * j] = x
+            flat[base + 2 * j + 1] = y
+    return n, uids, columns, counts, flat.tobytes()
+
+
+def save_state(sim):
+    if not isinstance(sim.clock, SimClock):
+        raise TypeError("Only simulations on a SimClock can be saved")
+    if isinstance(sim, MultiplayerSimulation):
+        raise TypeError("Multiplayer simulations can't be saved")
+    out = bytearray()
+    seed = sim.seed
+    out += HEADER.pack(MAGIC, VERSION, BACKENDS.index(sim.enemy_backend), BACKENDS.index(sim.projectile_backend),
+                       seed is not None, seed or 0)
+    out += pack_spawn_config(sim.enemy_manager.spawn_config)
+
+    version, words, gauss = sim.rng.getstate()
+    out += array('I', words).tobytes()
+    out += RNG.pack(gauss is not None, gauss or 0.0)
+
+    out += SIM.pack(sim.clock.time, sim.start_time, sim.projectile_boost_active, sim.projectile_boost_end_time,
+                    sim.game_over, sim.final_survival_time, sim.frame)
+    out += COUNT.pack(len(sim.dda_history))
+    out += array('d', [value for entry in sim.dda_history for value in entry]).tobytes()
+
+    player = sim.player
+    out += PLAYER.pack(player.x, player.y, player.prev_x, player.prev_y, player.lives, player.score,
+                       player.last_shot_time, player.mouse_x, player.mouse_y, player.projectile_speed_multiplier,
+                       player.animation_frame, player.hit_flash)
+    n, uids, columns, counts, trails = projectile_columns(player)
+    out += COUNT.pack(n)
+    out += uids
+    for column in columns:
+        out += column
+    out += counts
+    out += trails
+
+    manager = sim.enemy_manager
+    out += MANAGER.pack(manager.spawn_rate, manager.last_spawn_time, manager.wave_count, manager.enemies_spawned,
+                        manager.enemy_speed_factor, manager.separation, *manager.dda_weights, *manager.dda_thresholds)
+    out += COUNT.pack(len(manager.targets))
+    out += array('d', [value for target in manager.targets for value in target]).tobytes()
+    n, uids, columns, health, bosses = enemy_columns(manager)
+    out += COUNT.pack(n)
+    out += uids
+    for column in columns:
+        out += column
+    out += health
+    out += bosses
+
+    out += COUNT.pack(len(manager.powerups))
+    for p in manager.powerups:
+        out += POWERUP.pack(p.x, p.y, p.wave_spawned, POWERUP_TYPES.index(p.power_type), p.animation_frame,
+                            p.float_offset)
+    return bytes(out)
+
+
+def restore_enemies(manager, n, uids, columns, health, bosses):
+    store = getattr(manager, 'store', None)
+    if store is not None:
+        import numpy as np
+        from enemy_soa import EnemyStore
+        if len(store.x) < n:
+            store = manager.store = EnemyStore(max(256, n))
+        store.count = n
+        store.uid[:n] = np.frombuffer(uids, dtype=np.int64)
+        for name, column in zip(ENEMY_COLUMNS, columns):
+            getattr(store, name)[:n] = np.frombuffer(column, dtype=np.float64)
+        store.health[:n] = np.frombuffer(health, dtype=np.int32)
+        store.is_boss[:n] = np.frombuffer(bosses, dtype=np.uint8).astype(bool)
+        return
+
+    enemies = manager.enemies
+    for enemy in enemies:
+        enemy_pool.release(enemy)
+    enemies.clear()
+    xs, ys, prev_xs, prev_ys, vel_xs, vel_ys, flashes, frames = columns
+    for uid, x, y, prev_x, prev_y, vel_x, vel_y, flash, frame, hp, boss in zip(
+            uids, xs, ys, prev_xs, prev_ys, vel_xs, vel_ys, flashes, frames, health, bosses):
+        enemy = enemy_pool.acquire(x, y, bool(boss))
+        enemy.uid = uid
+        enemy.prev_x = prev_x
+        enemy.prev_y = prev_y
+        enemy.vel_x = vel_x
+        enemy.vel_y = vel_y
+        enemy.hit_flash = flash
+        enemy.animation_frame = frame
+        enemy.health = hp
+        enemies.append(enemy)
+
+
+def restore_projectiles(player, n, uids, columns, counts, trails):
+    length = PROJECTILE_TRAIL_LENGTH
+    projectiles = player.projectiles
+    if not isinstance(projectiles, list):
+        import numpy as np
+        from projectile_soa import ProjectileStore
+        store = projectiles
+        if len(store.x) < n:
+            store = player.store = ProjectileStore(max(256, n))
+        store.count = n
+        for name, column in zip(PROJECTILE_COLUMNS, columns):
+            getattr(store, name)[:n] = np.frombuffer(column, dtype=np.float64)
+        store.trail[:n, :length] = np.frombuffer(trails, dtype=np.int32).reshape(n, length, 2)
+        store.trail_head[:n] = 0
+        store.trail_count[:n] = np.frombuffer(counts, dtype=np.uint8)
+        return
+
+    for projectile in projectiles:
+        projectile_pool.release(projectile)
+    projectiles.clear()
+    xs, ys, prev_xs, prev_ys, vel_xs, vel_ys, frames = columns
+    for i, (uid, x, y, prev_x, prev_y, vel_x, vel_y, frame) in enumerate(
+            zip(uids, xs, ys, prev_xs, prev_ys, vel_xs, vel_ys, frames)):
+        projectile = projectile_pool.acquire(x, y, 0.0)
+        projectile.uid = uid
+        projectile.prev_x = prev_x
+        projectile.prev_y = prev_y
+        projectile.vel_x = vel_x
+        projectile.vel_y = vel_y
+        projectile.frame = frame
+        base = i * 2 * length
+        for j in range(counts[i]):
+            projectile.trail.append((trails[base + 2 * j], trails[base + 2 * j + 1]))
+        projectiles.append(projectile)
+
+
+def load_state(data, sim=None):
+    # Restores into sim when given (its entity storage is reused), otherwise
+    # into a new GameSimulation with the saved backends. Returns the simulation
+    reader = Reader(data)
+    magic, version, enemy_backend, projectile_backend, has_seed, seed = reader.unpack(HEADER)
+    if magic != MAGIC:
+        raise ValueError("Not a saved game state")
+    if version != VERSION:
+        raise ValueError(f"Unsupported game state version {version}, expected {VERSION}")
+    spawn_config = unpack_spawn_config(reader.unpack(SPAWN))
+    if sim is None:
+        sim = GameSimulation(seed=seed if has_seed else None, enemy_backend=BACKENDS[enemy_backend],
+                             projectile_backend=BACKENDS[projectile_backend], spawn_config=spawn_config,
+                             telemetry=null_telemetry)
+    else:
+        sim.seed = seed if has_seed else None
+        sim.spawn_config = spawn_config
+        sim.enemy_manager.spawn_config = spawn_config
+
+    words = reader.array('I', 625)
+    has_gauss, gauss = reader.unpack(RNG)
+    sim.rng.setstate((3, tuple(words), gauss if has_gauss else None))
+
+    (sim.clock.time, sim.start_time, sim.projectile_boost_active, sim.projectile_boost_end_time, sim.game_over,
+     sim.final_survival_time, sim.frame) = reader.unpack(SIM)
+    count, = reader.unpack(COUNT)
+    history = reader.array('d', count * 4)
+    sim.dda_history = [tuple(history[i:i + 4]) for i in range(0, len(history), 4)]
+
+    player = sim.player
+    (player.x, player.y, player.prev_x, player.prev_y, player.lives, player.score, player.last_shot_time,
+     player.mouse_x, player.mouse_y, player.projectile_speed_multiplier, player.animation_frame,
+     player.hit_flash) = reader.unpack(PLAYER)
+    n, = reader.unpack(COUNT)
+    uids = reader.array('q', n)
+    columns = [reader.array('d', n) for _ in PROJECTILE_COLUMNS]
+    counts = reader.array('B', n)
+    trails = reader.array('i', n * 2 * PROJECTILE_TRAIL_LENGTH)
+    restore_projectiles(player, n, uids, columns, counts, trails)
+
+    manager = sim.enemy_manager
+    values = reader.unpack(MANAGER)
+    (manager.spawn_rate, manager.last_spawn_time, manager.wave_count, manager.enemies_spawned,
+     manager.enemy_speed_factor, manager.separation) = values[:6]
+    manager.dda_weights = sim.dda_weights = values[6:9]
+    manager.dda_thresholds = sim.dda_thresholds = values[9:11]
+    count, = reader.unpack(COUNT)
+    targets = reader.array('d', count * 2)
+    manager.set_targets([(targets[i], targets[i + 1]) for i in range(0, len(targets), 2)])
+    n, = reader.unpack(COUNT)
+    uids = reader.array('q', n)
+    columns = [reader.array('d', n) for _ in ENEMY_COLUMNS]
+    health = reader.array('i', n)
+    bosses = reader.array('B', n)
+    restore_enemies(manager, n, uids, columns, health, bosses)
+
+    for p in manager.powerups:
+        powerup_pool.release(p)
+    manager.powerups.clear()
+    count, = reader.unpack(COUNT)
+    for _ in range(count):
+        x, y, wave, power_type, frame, offset = reader.unpack(POWERUP)
+        p = powerup_pool.acquire(x, y, wave, POWERUP_TYPES[power_type])
+        p.animation_frame = frame
+        p.float_offset = offset
+        manager.powerups.append(p)
+    # Pending events aren't saved, they follow from the spawn and boost times
+    sim.reschedule()
+    return sim
+
+
+def fork(sim):
+    # Independent copy of a running simulation
+    return load_state(save_state(sim))
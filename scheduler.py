@@ -0,0 +1,68 @@
+import heapq
+import itertools
+
+class Scheduler:
+    # Timed game events on a heap ordered by due time in ms, then by the order
+    # they were scheduled. run(now) fires every event that has fallen due,
+    # including ones its handlers schedule at or before now, so a tick costs
+    # the events it fires however many are pending. An event scheduled with a
+    # key replaces the pending one with the same key
+    def __init__(self):
+        self.heap = []
+        self.handlers = {}
+        self.keyed = {}
+        self.order = itertools.count()
+        self.cancelled = 0
+        self.now = 0  # The time run() is catching up to
+
+    def on(self, kind, handler):
+        # handler(time, *args) runs for every event of this kind, in the order registered
+        self.handlers.setdefault(kind, []).append(handler)
+
+    def schedule(self, time, kind, *args, key=None):
+        entry = [time, next(self.order), kind, args, key]
+        if key is not None:
+            self.cancel(key)
+            self.keyed[key] = entry
+        heapq.heappush(self.heap, entry)
+
+    def cancel(self, key):
+        # Cancelled entries stay in the heap until popped, unless they pile up
+        entry = self.keyed.pop(key, None)
+        if entry is None:
+            return
+        entry[2] = None
+        self.cancelled += 1
+        if self.cancelled > 64 and self.cancelled * 2 > len(self.heap):
+            self.heap[:] = [e for e in self.heap if e[2] is not None]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+
+    def due_time(self, key):
+        entry = self.keyed.get(key)
+        return entry[0] if entry is not None else None
+
+    def run(self, now):
+        self.now = now
+        heap = self.heap
+        fired = 0
+        while heap and heap[0][0] <= now:
+            time, _, kind, args, key = heapq.heappop(heap)
+            if kind is None:
+                self.cancelled -= 1
+                continue
+            if key is not None:
+                del self.keyed[key]
+            for handler in self.handlers.get(kind, ()):
+                handler(time, *args)
+            fired += 1
+        return fired
+
+    def clear(self):
+        # Drops the pending events, the handlers stay registered
+        self.heap.clear()
+        self.keyed.clear()
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
@@ -0,0 +1,202 @@
+# Headless, server-authoritative multiplayer host. Clients (client.py, or the
+# bots in benchmarks/loadgen.py) connect over TCP, send input and receive
+# delta-compressed snapshots.
+# Usage: python server.py [--port 5555] [--backend numpy] [--preset stress] [--stats 5]
+import argparse
+import asyncio
+import time
+from collections import OrderedDict, deque
+from config import *
+from net import (HELLO, HELLO_FORMAT, INPUT, INPUT_FORMAT, PROTOCOL_VERSION, SNAPSHOT, SNAPSHOT_HEADER, WELCOME,
+                 WELCOME_FORMAT, encode_delta, frame, read_message, world_state)
+from simulation import FrameInput, MultiplayerSimulation
+from stats import percentile
+from telemetry import telemetry
+from waves import add_spawn_arguments, spawn_config_from_args
+
+class Connection:
+    __slots__ = ('player_id', 'writer', 'input', 'ack', 'bytes_sent', 'snapshots', 'skipped')
+
+    def __init__(self, player_id, writer):
+        self.player_id = player_id
+        self.writer = writer
+        self.input = None
+        self.ack = 0
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.skipped = 0
+
+class GameServer:
+    # Steps a MultiplayerSimulation at tick_rate and sends each client a
+    # snapshot snapshot_rate times a second, encoded against the newest tick
+    # that client acknowledged. Clients sharing a base share one encoding
+    def __init__(self, sim, tick_rate=NET_TICK_RATE, snapshot_rate=NET_SNAPSHOT_RATE,
+                 history=NET_SNAPSHOT_HISTORY):
+        self.sim = sim
+        self.tick_rate = tick_rate
+        self.snapshot_rate = snapshot_rate
+        self.dt = 1 / tick_rate
+        self.snapshot_interval = max(1, tick_rate // snapshot_rate)
+        self.history = OrderedDict()
+        self.history_size = history
+        self.clients = {}
+        self.next_player_id = 1
+        self.server = None
+        self.ticks = 0
+        # Seconds per tick: simulation step, and building plus encoding snapshots
+        self.step_times = deque(maxlen=tick_rate * 10)
+        self.snapshot_times = deque(maxlen=snapshot_rate * 10)
+        self.bytes_sent = 0
+
+    async def start(self, host=NET_HOST, port=NET_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for client in list(self.clients.values()):
+            client.writer.close()
+
+    async def handle(self, reader, writer):
+        try:
+            message = await read_message(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if len(message) != HELLO_FORMAT.size or HELLO_FORMAT.unpack(message) != (HELLO, PROTOCOL_VERSION):
+            writer.close()
+            return
+
+        player_id = self.next_player_id
+        while player_id in self.clients:
+            player_id = player_id % 0xffff + 1
+        self.next_player_id = player_id % 0xffff + 1
+        client = Connection(player_id, writer)
+        self.clients[player_id] = client
+        self.sim.add_player(player_id)
+        writer.write(frame(WELCOME_FORMAT.pack(WELCOME, player_id, self.tick_rate, self.snapshot_rate)))
+        try:
+            while True:
+                message = await read_message(reader)
+                if len(message) != INPUT_FORMAT.size or message[0] != INPUT:
+                    # Malformed input, the client is dropped
+                    break
+                _, ack, buttons, aim_x, aim_y = INPUT_FORMAT.unpack(message)
+                client.ack = ack
+                client.input = FrameInput(bool(buttons & 1), bool(buttons & 2), bool(buttons & 4),
+                                          bool(buttons & 8), aim_x, aim_y, bool(buttons & 16))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self.clients[player_id]
+            self.sim.remove_player(player_id)
+            writer.close()
+
+    def tick(self):
+        start = time.perf_counter()
+        self.sim.step({player_id: client.input for player_id, client in self.clients.items()}, self.dt)
+        self.step_times.append(time.perf_counter() - start)
+        self.ticks += 1
+        if self.ticks % self.snapshot_interval == 0:
+            start = time.perf_counter()
+            self.broadcast()
+            self.snapshot_times.append(time.perf_counter() - start)
+
+    def broadcast(self):
+        tick = self.sim.frame
+        state = world_state(self.sim)
+        self.history[tick] = state
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+
+        encoded = {}
+        for client in self.clients.values():
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > NET_SEND_BUFFER:
+                # Client isn't keeping up, it gets a fresher snapshot later
+                client.skipped += 1
+                continue
+            base_tick = client.ack if client.ack in self.history else 0
+            message = encoded.get(base_tick)
+            if message is None:
+                message = frame(SNAPSHOT_HEADER.pack(SNAPSHOT, tick, base_tick)
+                                + encode_delta(state, self.history.get(base_tick)))
+                encoded[base_tick] = message
+            client.writer.write(message)
+            client.bytes_sent += len(message)
+            client.snapshots += 1
+            self.bytes_sent += len(message)
+
+    async def run(self, duration=None):
+        # Fixed-rate loop. A late tick runs immediately, more than
+        # MAX_FRAME_TIME behind and the schedule restarts from now
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        end = None if duration is None else next_tick + duration
+        while end is None or loop.time() < end:
+            self.tick()
+            next_tick += self.dt
+            now = loop.time()
+            if now - next_tick > MAX_FRAME_TIME:
+                next_tick = now
+            await asyncio.sleep(max(0.0, next_tick - now))
+
+    def stats(self):
+        step_times = sorted(self.step_times)
+        snapshot_times = sorted(self.snapshot_times)
+        return {
+            'players': len(self.clients),
+            'enemies': len(self.sim.enemy_manager.enemies),
+            'step_p50_ms': percentile(step_times, 50) * 1000,
+            'step_p95_ms': percentile(step_times, 95) * 1000,
+            'snapshot_p50_ms': percentile(snapshot_times, 50) * 1000,
+            'snapshot_p95_ms': percentile(snapshot_times, 95) * 1000,
+            'bytes_sent': self.bytes_sent,
+        }
+
+async def serve(args, spawn_config):
+    sim = MultiplayerSimulation(seed=args.seed, enemy_backend=args.backend, spawn_config=spawn_config)
+    server = GameServer(sim, args.tick_rate, args.snapshot_rate)
+    port = await server.start(args.host, args.port)
+    print(f"Serving on {args.host}:{port} at {args.tick_rate} ticks/s, {args.snapshot_rate} snapshots/s")
+    runner = asyncio.ensure_future(server.run())
+    try:
+        while True:
+            await asyncio.sleep(args.stats or 3600)
+            if args.stats:
+                stats = server.stats()
+                print(f"players {stats['players']:>3}  enemies {stats['enemies']:>5}  "
+                      f"step p95 {stats['step_p95_ms']:.2f} ms  snapshot p95 {stats['snapshot_p95_ms']:.2f} ms  "
+                      f"sent {stats['bytes_sent'] / 1024:.0f} KiB")
+    finally:
+        runner.cancel()
+        await server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic Defenders multiplayer server")
+    parser.add_argument('--host', default=NET_HOST)
+    parser.add_argument('--port', type=int, default=NET_PORT)
+    parser.add_argument('--backend', default=ENEMY_BACKEND, choices=['python', 'numpy'], help="Enemy backend")
+    parser.add_argument('--tick-rate', type=int, default=NET_TICK_RATE)
+    parser.add_argument('--snapshot-rate', type=int, default=NET_SNAPSHOT_RATE)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--stats', type=float, metavar='SECONDS', help="Print server load every SECONDS")
+    parser.add_argument('--telemetry', metavar='PATH', help="Log game events to a rotating JSONL file")
+    add_spawn_arguments(parser)
+    args = parser.parse_args()
+    spawn_config = spawn_config_from_args(parser, args)
+    if args.telemetry:
+        telemetry.start(args.telemetry)
+    try:
+        asyncio.run(serve(args, spawn_config))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        telemetry.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+import contextlib
+import random
+import pygame
+from config import *
+from player import create_player, projectile_pool
+from enemy import create_enemy_manager
+from profiler import profiler
+from scheduler import Scheduler
+from telemetry import telemetry
+
+class SimClock:
+    # Simulated time in ms, only moves when the simulation steps
+    def __init__(self, start=0):
+        self.time = start
+
+    def get_ticks(self):
+        return int(self.time)
+
+    def advance(self, dt):
+        self.time += dt * 1000
+
+class FrameInput:
+    # One frame of player input, the same information Player.handle_input reads
+    __slots__ = ('left', 'right', 'up', 'down', 'aim_x', 'aim_y', 'fire')
+
+    def __init__(self, left=False, right=False, up=False, down=False, aim_x=0, aim_y=0, fire=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.aim_x = aim_x
+        self.aim_y = aim_y
+        self.fire = fire
+
+    @classmethod
+    def from_pygame(cls, keys, mouse_pos, mouse_pressed):
+        return cls(bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+                   bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+                   bool(keys[pygame.K_UP] or keys[pygame.K_w]),
+                   bool(keys[pygame.K_DOWN] or keys[pygame.K_s]),
+                   mouse_pos[0], mouse_pos[1], bool(mouse_pressed[0]))
+
+class FixedTimestep:
+    # Accumulator that turns variable render frame times into fixed simulation ticks
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_frame_time=MAX_FRAME_TIME, max_ticks=MAX_TICKS_PER_FRAME):
+        self.dt = 1 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        # Number of ticks to run this frame
+        self.accumulator = min(self.accumulator + frame_time, self.max_frame_time)
+        ticks = min(int(self.accumulator / self.dt), self.max_ticks)
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def behind(self):
+        return self.accumulator >= self.dt
+
+    @property
+    def alpha(self):
+        # Render position between the previous and the current tick
+        return min(1.0, self.accumulator / self.dt)
+
+class GameSimulation:
+    # Game rules without rendering or event handling. Time comes from the
+    # injected clock and randomness from a seeded RNG, so a run is reproducible
+    def __init__(self, seed=None, clock=None, enemy_backend=ENEMY_BACKEND, projectile_backend=PROJECTILE_BACKEND,
+                 dda_weights=DDA_WEIGHTS, dda_thresholds=DDA_THRESHOLDS, spawn_config=None, telemetry=telemetry):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.clock = clock if clock is not None else SimClock()
+        self.enemy_backend = enemy_backend
+        self.projectile_backend = projectile_backend
+        self.dda_weights = dda_weights
+        self.dda_thresholds = dda_thresholds
+        self.spawn_config = spawn_config
+        # Swapped for its own Profiler while a pipeline worker steps the simulation
+        self.profiler = profiler
+        # Where game events go, null_telemetry for forks and restores
+        self.telemetry = telemetry
+        self.reset()
+
+    def reset(self):
+        self.player = create_player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, self.projectile_backend, clock=self.clock)
+        self.enemy_manager = create_enemy_manager(self.enemy_backend, clock=self.clock, rng=self.rng,
+                                                  spawn_config=self.spawn_config, telemetry=self.telemetry)
+        # DDA checks and the boost end, fired by step() after the collisions.
+        # The enemy manager runs its spawns, waves and powerups in its update
+        self.events = Scheduler()
+        self.events.on('dda', self.check_dda)
+        self.events.on('boost_end', self.end_boost)
+        self.enemy_manager.events.on('wave', self.wave_started)
+        self.enemy_manager.dda_weights = self.dda_weights
+        self.enemy_manager.dda_thresholds = self.dda_thresholds
+        self.start_time = self.clock.get_ticks()
+        self.projectile_boost_active = False
+        self.projectile_boost_end_time = 0
+        self.game_over = False
+        self.final_survival_time = 0
+        self.frame = 0
+        # (survival time, performance, spawn_rate, enemy_speed_factor) per DDA check
+        self.dda_history = []
+        self.telemetry.emit('session', self.start_time, seed=self.seed, enemy_backend=self.enemy_backend,
+                            projectile_backend=self.projectile_backend, dda_weights=self.dda_weights,
+                            dda_thresholds=self.dda_thresholds,
+                            spawn_config=self.enemy_manager.spawn_config.to_dict())
+
+    def survival_time(self):
+        if self.game_over:
+            return self.final_survival_time
+        return (self.clock.get_ticks() - self.start_time) / 1000
+
+    def reschedule(self):
+        # Rebuilds the pending events from the state they follow from, after a restore
+        self.events.clear()
+        self.enemy_manager.events.clear()
+        self.enemy_manager.schedule_spawn()
+        if self.projectile_boost_active:
+            self.events.schedule(self.projectile_boost_end_time, 'boost_end', key='boost')
+
+    def wave_started(self, time):
+        # The check waits for this tick's collisions
+        self.events.schedule(time, 'dda')
+
+    def check_dda(self, time):
+        # Runs after the tick each wave starts in
+        enemy_manager = self.enemy_manager
+        if not enemy_manager.spawn_config.dda or enemy_manager.wave_count % DDA_CHECK_INTERVAL != 0:
+            return
+        survival_time = (time - self.start_time) / 1000
+        score_rate = self.player.score / survival_time if survival_time > 0 else 0
+        performance = enemy_manager.apply_dda(self.player.lives, survival_time, score_rate)
+        self.dda_history.append((survival_time, performance, enemy_manager.spawn_rate, enemy_manager.enemy_speed_factor))
+
+    def end_boost(self, time):
+        # temporary projectile speed boost
+        self.projectile_boost_active = False
+        self.player.projectile_speed_multiplier = 1.0
+        self.telemetry.emit('boost_end', time)
+
+    def step(self, inputs, dt):
+        if self.game_over:
+            return
+        if hasattr(self.clock, 'advance'):
+            self.clock.advance(dt)
+        self.frame += 1
+
+        player = self.player
+        enemy_manager = self.enemy_manager
+
+        player.prev_x = player.x
+        player.prev_y = player.y
+        with self.profiler.scope('player'):
+            if inputs is not None:
+                player.apply_input(inputs.left, inputs.right, inputs.up, inputs.down,
+                                   (inputs.aim_x, inputs.aim_y), inputs.fire, dt)
+            player.update(dt)
+
+        with self.profiler.scope('enemies'):
+            enemy_manager.set_player_pos(player.x, player.y)
+            enemy_manager.update(dt)
+
+        with self.profiler.scope('collisions'):
+            kills, player_hit, powerup = enemy_manager.check_collisions(player.projectiles, player.get_rect())
+
+        # Powerup collection
+        now = self.clock.get_ticks()
+        if powerup == "heal" and player.lives < 3:
+            player.lives += 1
+            self.telemetry.emit('powerup', now, type=powerup, lives=player.lives)
+        elif powerup == "speed":
+            self.projectile_boost_active = True
+            self.projectile_boost_end_time = now + 10000
+            self.events.schedule(self.projectile_boost_end_time, 'boost_end', key='boost')
+            player.projectile_speed_multiplier = 2.0
+            self.telemetry.emit('powerup', now, type=powerup, lives=player.lives)
+
+        player.score += kills * 10
+        if kills:
+            self.telemetry.emit('kill', now, count=kills, score=player.score)
+
+        if player_hit:
+            if player.take_damage():
+                self.final_survival_time = (now - self.start_time) / 1000
+                self.game_over = True
+                self.telemetry.emit('death', now, survival_time=self.final_survival_time, score=player.score,
+                               wave=enemy_manager.wave_count)
+            else:
+                self.telemetry.emit('hit', now, lives=player.lives)
+
+        # DDA checks and the boost end
+        self.events.run(now)
+
+    @contextlib.contextmanager
+    def interpolated(self, alpha):
+        # Temporarily place entities between their last two tick positions for drawing
+        saved_player = self.player.interpolate(alpha)
+        saved_enemies = self.enemy_manager.interpolate(alpha)
+        try:
+            yield
+        finally:
+            self.player.restore_positions(saved_player)
+            self.enemy_manager.restore_positions(saved_enemies)
+
+    def run(self, policy, dt=1 / SIM_TICK_RATE, max_time=None):
+        # Step until game over (or max_time simulated seconds), policy(sim) -> FrameInput
+        while not self.game_over:
+            if max_time is not None and self.survival_time() >= max_time:
+                break
+            self.step(policy(self), dt)
+        return self.survival_time()
+
+class MultiplayerSimulation(GameSimulation):
+    # Game rules for the multiplayer server: any number of players, keyed by
+    # id, share one EnemyManager and every enemy chases the nearest live
+    # player. Dead players rejoin after NET_RESPAWN_TIME and the game never ends
+    def reset(self):
+        self.players = {}
+        self.boost_end_times = {}
+        self.respawn_times = {}
+        self.player = None
+        self.enemy_manager = create_enemy_manager(self.enemy_backend, clock=self.clock, rng=self.rng,
+                                                  spawn_config=self.spawn_config, telemetry=self.telemetry)
+        self.events = Scheduler()
+        self.events.on('dda', self.check_dda)
+        self.events.on('boost_end', self.end_boost)
+        self.events.on('respawn', self.respawn)
+        self.enemy_manager.events.on('wave', self.wave_started)
+        self.enemy_manager.dda_weights = self.dda_weights
+        self.enemy_manager.dda_thresholds = self.dda_thresholds
+        self.start_time = self.clock.get_ticks()
+        self.game_over = False
+        self.final_survival_time = 0
+        self.frame = 0
+        self.dda_history = []
+        self.telemetry.emit('session', self.start_time, seed=self.seed, enemy_backend=self.enemy_backend,
+                            projectile_backend=self.projectile_backend, dda_weights=self.dda_weights,
+                            dda_thresholds=self.dda_thresholds,
+                            spawn_config=self.enemy_manager.spawn_config.to_dict(), multiplayer=True)
+
+    def spawn_point(self, player_id):
+        # Players line up along the bottom of the screen
+        return SCREEN_WIDTH * (player_id % 8 + 1) // 9, SCREEN_HEIGHT - 100
+
+    def add_player(self, player_id):
+        x, y = self.spawn_point(player_id)
+        # Projectiles stay objects so each one keeps its uid
+        self.players[player_id] = create_player(x, y, 'python', clock=self.clock)
+        self.telemetry.emit('join', self.clock.get_ticks(), player=player_id, players=len(self.players))
+
+    def remove_player(self, player_id):
+        player = self.players.pop(player_id, None)
+        if player is not None:
+            for projectile in player.projectiles:
+                projectile_pool.release(projectile)
+            player.projectiles.clear()
+        self.boost_end_times.pop(player_id, None)
+        self.respawn_times.pop(player_id, None)
+        self.events.cancel(('boost', player_id))
+        self.events.cancel(('respawn', player_id))
+        self.telemetry.emit('leave', self.clock.get_ticks(), player=player_id, players=len(self.players))
+
+    def respawn(self, time, player_id):
+        player = self.players[player_id]
+        x, y = self.spawn_point(player_id)
+        player.x = player.prev_x = x
+        player.y = player.prev_y = y
+        player.lives = PLAYER_LIVES
+        player.score = 0
+        del self.respawn_times[player_id]
+
+    def check_dda(self, time):
+        # DDA reads the team average
+        enemy_manager = self.enemy_manager
+        active = [player for player_id, player in self.players.items() if player_id not in self.respawn_times]
+        if (not enemy_manager.spawn_config.dda or not active
+                or enemy_manager.wave_count % DDA_CHECK_INTERVAL != 0):
+            return
+        survival_time = (time - self.start_time) / 1000
+        lives = sum(player.lives for player in active) / len(active)
+        score_rate = sum(player.score for player in active) / len(active) / max(survival_time, 1e-3)
+        performance = enemy_manager.apply_dda(lives, survival_time, score_rate)
+        self.dda_history.append((survival_time, performance, enemy_manager.spawn_rate, enemy_manager.enemy_speed_factor))
+
+    def end_boost(self, time, player_id):
+        del self.boost_end_times[player_id]
+        self.players[player_id].projectile_speed_multiplier = 1.0
+        self.telemetry.emit('boost_end', time, player=player_id)
+
+    def step(self, inputs, dt):
+        # inputs maps player id -> FrameInput, players without an entry stand still
+        if hasattr(self.clock, 'advance'):
+            self.clock.advance(dt)
+        self.frame += 1
+        now = self.clock.get_ticks()
+        enemy_manager = self.enemy_manager
+
+        active = []
+        with self.profiler.scope('player'):
+            for player_id, player in self.players.items():
+                if player_id in self.respawn_times:
+                    continue
+                player.prev_x = player.x
+                player.prev_y = player.y
+                frame_input = inputs.get(player_id)
+                if frame_input is not None:
+                    player.apply_input(frame_input.left, frame_input.right, frame_input.up, frame_input.down,
+                                       (frame_input.aim_x, frame_input.aim_y), frame_input.fire, dt)
+                player.update(dt)
+                active.append((player_id, player))
+
+        with self.profiler.scope('enemies'):
+            enemy_manager.set_targets([(player.x, player.y) for _, player in active])
+            enemy_manager.update(dt)
+
+        with self.profiler.scope('collisions'):
+            outcomes = enemy_manager.check_collisions_many([(player.projectiles, player.get_rect())
+                                                            for _, player in active])
+            for (player_id, player), (kills, player_hit, powerup) in zip(active, outcomes):
+                if powerup == "heal" and player.lives < 3:
+                    player.lives += 1
+                    self.telemetry.emit('powerup', now, player=player_id, type=powerup, lives=player.lives)
+                elif powerup == "speed":
+                    self.boost_end_times[player_id] = now + 10000
+                    self.events.schedule(now + 10000, 'boost_end', player_id, key=('boost', player_id))
+                    player.projectile_speed_multiplier = 2.0
+                    self.telemetry.emit('powerup', now, player=player_id, type=powerup, lives=player.lives)
+
+                player.score += kills * 10
+                if kills:
+                    self.telemetry.emit('kill', now, player=player_id, count=kills, score=player.score)
+                if player_hit:
+                    if player.take_damage():
+                        self.respawn_times[player_id] = now + NET_RESPAWN_TIME
+                        self.events.schedule(now + NET_RESPAWN_TIME, 'respawn', player_id,
+                                             key=('respawn', player_id))
+                        for projectile in player.projectiles:
+                            projectile_pool.release(projectile)
+                        player.projectiles.clear()
+                        self.telemetry.emit('death', now, player=player_id, score=player.score,
+                                       wave=enemy_manager.wave_count)
+                    else:
+                        self.telemetry.emit('hit', now, player=player_id, lives=player.lives)
+
+        # DDA checks, boost ends and respawns
+        self.events.run(now)
@@ -0,0 +1,239 @@
+# Soak test: bot-played sessions run headless for a long time in parallel
+# processes, sampling frame-time percentiles, RSS, GC pauses and entity counts.
+# Fails (exit 1) when any of them trends upward after the warm-up.
+# Usage: python soak.py --minutes 120 --workers 4 [--bot kite] [--samples-out soak.jsonl]
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from config import *
+from stats import percentile
+
+# metric -> smallest median the relative change is measured against, so a
+# count wobbling around zero doesn't read as a trend
+METRICS = {
+    'frame_p50_ms': 1.0,
+    'frame_p95_ms': 1.0,
+    'frame_p99_ms': 1.0,
+    'gc_pause_max_ms': 5.0,
+    'rss_mb': 10.0,
+    'enemies': 10.0,
+    'projectiles': 10.0,
+    'powerups': 2.0,
+    'pool_free': 50.0,
+}
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        # Peak rather than current, but still catches growth
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+def soak_worker(job):
+    # The parent counts one None per worker, so send it even on a crash
+    queue = job[-1]
+    try:
+        return run_sessions(*job)
+    finally:
+        queue.put(None)
+
+def run_sessions(worker, seed, bot_name, backend, minutes, sample_seconds, render, immortal, queue):
+    # One process: back-to-back sessions until the deadline, a sample every
+    # sample_seconds of simulated time goes to the queue
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import gc
+    import pygame
+    from bot import BOTS
+    from enemy import enemy_pool, powerup_pool
+    from player import projectile_pool
+    from simulation import GameSimulation
+
+    screen = None
+    if render:
+        from effects import build_effects, set_effects
+        from sprites import build_sprite_cache, set_sprite_cache
+        pygame.display.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if USE_SPRITE_CACHE:
+            set_sprite_cache(build_sprite_cache())
+            if USE_GLOW_EFFECTS:
+                set_effects(build_effects())
+
+    # GC pauses, from the collector's own start/stop callbacks
+    pauses = []
+    gc_started = [0.0]
+
+    def gc_callback(phase, info):
+        if phase == 'start':
+            gc_started[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - gc_started[0])
+    gc.callbacks.append(gc_callback)
+
+    ticks = max(1, SIM_TICK_RATE // FPS)
+    dt = 1 / SIM_TICK_RATE
+    deadline = time.monotonic() + minutes * 60
+    start = time.monotonic()
+    simulated = 0.0
+    session = 0
+    samples = 0
+    while time.monotonic() < deadline:
+        sim = GameSimulation(seed=seed + session, enemy_backend=backend, projectile_backend=backend)
+        if immortal:
+            sim.player.lives = 10 ** 9
+        policy = BOTS[bot_name](seed + session)
+        frame_times = []
+        next_sample = sample_seconds
+        while not sim.game_over and time.monotonic() < deadline:
+            # Only the game's own work is timed, not the bot deciding
+            elapsed = 0.0
+            for _ in range(ticks):
+                inputs = policy(sim)
+                tick_start = time.perf_counter()
+                sim.step(inputs, dt)
+                elapsed += time.perf_counter() - tick_start
+            if screen is not None:
+                draw_start = time.perf_counter()
+                screen.fill(SPACE_BLACK)
+                sim.player.draw(screen)
+                sim.enemy_manager.draw(screen)
+                pygame.display.flip()
+                elapsed += time.perf_counter() - draw_start
+            frame_times.append(elapsed)
+
+            survival = sim.survival_time()
+            if survival >= next_sample:
+                next_sample += sample_seconds
+                frame_times.sort()
+                manager = sim.enemy_manager
+                queue.put({
+                    'worker': worker,
+                    'sample': samples,
+                    'session': session,
+                    'wall_seconds': time.monotonic() - start,
+                    'simulated_seconds': simulated + survival,
+                    'frame_p50_ms': percentile(frame_times, 50) * 1000,
+                    'frame_p95_ms': percentile(frame_times, 95) * 1000,
+                    'frame_p99_ms': percentile(frame_times, 99) * 1000,
+                    'gc_pause_max_ms': max(pauses, default=0.0) * 1000,
+                    'gc_collections': len(pauses),
+                    'rss_mb': rss_mb(),
+                    'enemies': len(manager.enemies),
+                    'projectiles': len(sim.player.projectiles),
+                    'powerups': len(manager.powerups),
+                    'pool_free': len(enemy_pool.free) + len(projectile_pool.free) + len(powerup_pool.free),
+                    'spawn_rate': manager.spawn_rate,
+                    'wave': manager.wave_count,
+                })
+                samples += 1
+                frame_times = []
+                pauses.clear()
+        simulated += sim.survival_time()
+        session += 1
+    return {'worker': worker, 'sessions': session, 'samples': samples, 'simulated_seconds': simulated}
+
+def theil_sen(values):
+    # Median of pairwise slopes, per sample; robust to a few outlier windows
+    slopes = sorted((values[j] - values[i]) / (j - i) for i in range(len(values)) for j in range(i + 1, len(values)))
+    return slopes[len(slopes) // 2]
+
+def trends(samples, warmup, tolerance, rss_tolerance, min_samples=6):
+    # Relative change across the measured window per metric; a change above
+    # the tolerance is an upward trend
+    measured = samples[int(len(samples) * warmup):]
+    if len(measured) < min_samples:
+        return None
+    report = {}
+    for metric, floor in METRICS.items():
+        values = [s[metric] for s in measured]
+        median = sorted(values)[len(values) // 2]
+        change = theil_sen(values) * (len(values) - 1) / max(median, floor)
+        limit = rss_tolerance if metric == 'rss_mb' else tolerance
+        report[metric] = {'first': values[0], 'last': values[-1], 'median': median, 'change': change,
+                          'failed': change > limit}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel headless soak test with trend detection")
+    parser.add_argument('--minutes', type=float, default=60.0, help="wall minutes per worker")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--bot', choices=['turret', 'wander', 'kite'], default='kite')
+    parser.add_argument('--backend', default=ENEMY_BACKEND, choices=['python', 'numpy'],
+                        help="Enemy and projectile backend")
+    parser.add_argument('--sample-seconds', type=float, default=30.0, help="simulated seconds per sample")
+    parser.add_argument('--warmup', type=float, default=0.25,
+                        help="fraction of each worker's samples ignored while DDA ramps up")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="largest relative rise across the run before a metric fails")
+    parser.add_argument('--rss-tolerance', type=float, default=0.10)
+    parser.add_argument('--mortal', action='store_true',
+                        help="play by the normal rules, starting a new session when the bot dies")
+    parser.add_argument('--no-render', action='store_true', help="skip drawing, simulation only")
+    parser.add_argument('--base-seed', type=int, default=0)
+    parser.add_argument('--samples-out', help="JSONL file of every sample, written as they arrive")
+    parser.add_argument('--out', help="JSON file with the per-worker trend report")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.minutes:g} min, bot={args.bot} backend={args.backend}, "
+          f"a sample every {args.sample_seconds:g} simulated s")
+    samples = {worker: [] for worker in range(args.workers)}
+    samples_out = open(args.samples_out, 'w') if args.samples_out else None
+    with Manager() as manager, ProcessPoolExecutor(max_workers=args.workers) as executor:
+        queue = manager.Queue()
+        jobs = [(worker, args.base_seed + worker * 1000, args.bot, args.backend, args.minutes, args.sample_seconds,
+                 not args.no_render, not args.mortal, queue) for worker in range(args.workers)]
+        futures = [executor.submit(soak_worker, job) for job in jobs]
+        running = len(futures)
+        while running:
+            sample = queue.get()
+            if sample is None:
+                running -= 1
+                continue
+            samples[sample['worker']].append(sample)
+            if samples_out is not None:
+                samples_out.write(json.dumps(sample) + '\n')
+                samples_out.flush()
+            print(f"[{sample['wall_seconds'] / 60:6.1f} min] worker {sample['worker']} "
+                  f"t={sample['simulated_seconds']:7.0f}s frame p95 {sample['frame_p95_ms']:6.2f} ms  "
+                  f"rss {sample['rss_mb']:6.1f} MB  enemies {sample['enemies']:4}  "
+                  f"spawn {sample['spawn_rate']:4} ms  gc max {sample['gc_pause_max_ms']:5.1f} ms", flush=True)
+        totals = [future.result() for future in futures]
+    if samples_out is not None:
+        samples_out.close()
+
+    print()
+    failed = []
+    reports = {}
+    for worker, worker_samples in samples.items():
+        report = trends(worker_samples, args.warmup, args.tolerance, args.rss_tolerance)
+        reports[worker] = report
+        if report is None:
+            print(f"worker {worker}: only {len(worker_samples)} samples, too few to judge a trend")
+            failed.append((worker, 'samples'))
+            continue
+        for metric, result in report.items():
+            mark = 'FAIL' if result['failed'] else 'ok'
+            print(f"worker {worker} {metric:<16} {result['first']:>9.2f} -> {result['last']:>9.2f}  "
+                  f"trend {result['change'] * 100:+6.1f}%  {mark}")
+            if result['failed']:
+                failed.append((worker, metric))
+    simulated = sum(total['simulated_seconds'] for total in totals)
+    print(f"Simulated {simulated / 3600:.2f} h across {sum(t['sessions'] for t in totals)} sessions")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'totals': totals, 'trends': reports, 'failed': failed}, f, indent=2)
+    if failed:
+        print(f"FAILED: upward trend in {', '.join(sorted({metric for _, metric in failed}))}")
+        sys.exit(1)
+    print("PASSED: no upward trends")
+
+if __name__ == '__main__':
+    main()
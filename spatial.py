@@ -0,0 +1,94 @@
+import math
+from config import *
+
+def segment_entry(x0, y0, x1, y1, left, top, right, bottom):
+    # Time in [0, 1] at which the segment (x0, y0) -> (x1, y1) enters the box,
+    # None if it misses. Same slab test as projectile_soa.sweep_segments
+    enter = -math.inf
+    leave = math.inf
+    for start, step, low, high in ((x0, x1 - x0, left, right), (y0, y1 - y0, top, bottom)):
+        if step:
+            t1 = (low - start) / step
+            t2 = (high - start) / step
+            enter = max(enter, min(t1, t2))
+            leave = min(leave, max(t1, t2))
+        elif not low < start < high:
+            return None
+    if enter < leave and enter <= 1.0 and leave > 0.0:
+        return max(enter, 0.0)
+    return None
+
+class SpatialGrid:
+    # Uniform grid broad phase, rebuilt from a list of rects each frame
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, (rect.right - 1) // size,
+                rect.top // size, (rect.bottom - 1) // size)
+
+    def insert(self, index, rect):
+        cells = self.cells
+        x0, x1, y0, y1 = self.cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [index]
+                else:
+                    bucket.append(index)
+
+    def rebuild(self, rects):
+        self.cells.clear()
+        for index, rect in enumerate(rects):
+            self.insert(index, rect)
+
+    def query(self, rect):
+        # Candidate indices in ascending order (insertion order), no duplicates
+        x0, x1, y0, y1 = self.cell_range(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), ())
+
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+class PointGrid:
+    # Uniform grid over points for neighbour queries, a point's neighbours
+    # within cell_size are always in the 3x3 cells around it
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, points):
+        cells = self.cells
+        cells.clear()
+        size = self.cell_size
+        for index, (x, y) in enumerate(points):
+            key = (int(x // size), int(y // size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+
+    def near(self, x, y):
+        size = self.cell_size
+        cx = int(x // size)
+        cy = int(y // size)
+        cells = self.cells
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                bucket = cells.get((gx, gy))
+                if bucket:
+                    yield from bucket
@@ -0,0 +1,122 @@
+import math
+import threading
+from types import SimpleNamespace
+import pygame
+from config import *
+
+_sprite_cache = None
+
+def get_sprite_cache():
+    return _sprite_cache
+
+def set_sprite_cache(cache):
+    global _sprite_cache
+    _sprite_cache = cache
+
+class SpriteCache:
+    # Shapes are rasterized once by running the parametric draw code against a
+    # pose centred on a transparent surface, then reused through blits
+    def __init__(self, rotation_steps=SPRITE_ROTATION_STEPS, heading_steps=SPRITE_HEADING_STEPS):
+        self.rotation_steps = rotation_steps
+        self.heading_steps = heading_steps
+        self.sprites = {}
+        self.groups = {}
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def group(self, key, build, *args):
+        # Memoized list of sprites that are always drawn together
+        group = self.groups.get(key)
+        if group is None:
+            group = build(self, *args)
+            self.groups[key] = group
+        return group
+
+    def get(self, key, draw, surface_size, origin, **pose):
+        surface = self.sprites.get(key)
+        if surface is None:
+            # Shapes are drawn without antialiasing, so a colorkey is enough and
+            # RLE-accelerated colorkey blits are much cheaper than per-pixel alpha
+            surface = pygame.Surface(surface_size)
+            surface.fill(SPRITE_COLORKEY)
+            draw(SimpleNamespace(x=origin[0], y=origin[1], **pose), surface)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+            self.sprites[key] = surface
+        return surface
+
+    def rotation_step(self, angle, symmetry):
+        # Index of the nearest rotation frame for a shape with n-fold symmetry
+        period = math.pi * 2 / symmetry
+        return int((angle % period) / period * self.rotation_steps + 0.5) % self.rotation_steps
+
+    def rotation_angle(self, step, symmetry):
+        return step * (math.pi * 2 / symmetry) / self.rotation_steps
+
+    def heading_step(self, angle):
+        return int((angle % (math.pi * 2)) / (math.pi * 2) * self.heading_steps + 0.5) % self.heading_steps
+
+    def heading_angle(self, step):
+        return step * (math.pi * 2) / self.heading_steps
+
+def build_sprite_cache():
+    # Pre-rasterize every sprite variant up front so the first frames don't stall
+    from enemy import Enemy, PowerUp
+    from player import Player, Projectile
+
+    sprites = SpriteCache()
+    for is_boss in (False, True):
+        enemy = Enemy(0, 0, is_boss)
+        # Hull rotation is animation_frame * 0.01 for bosses, * 0.02 otherwise
+        frames_per_radian = 100 if is_boss else 50
+        for hit_flash in (0, 1):
+            enemy.hit_flash = hit_flash
+            for step in range(sprites.rotation_steps):
+                enemy.animation_frame = sprites.rotation_angle(step, 6 if is_boss else 8) * frames_per_radian
+                enemy.sprite_blits(sprites)
+        if is_boss:
+            # Core pulse radii and health bar states
+            for frame in range(63):
+                enemy.animation_frame = frame
+                for health in range(4):
+                    enemy.health = health
+                    enemy.sprite_blits(sprites)
+
+    for power_type in ("heal", "speed"):
+        PowerUp(0, 0, 0, power_type).sprite_blits(sprites)
+
+    player = Player(0, 0)
+    for hit_flash in (0, 1):
+        player.hit_flash = hit_flash
+        for engine_frame in (0, 3):
+            player.animation_frame = engine_frame
+            for step in range(sprites.heading_steps):
+                angle = sprites.heading_angle(step)
+                player.mouse_x = math.cos(angle) * 100
+                player.mouse_y = math.sin(angle) * 100
+                player.ship_blits(sprites)
+
+    projectile = Projectile(0, 0, 0)
+    for length in range(PROJECTILE_TRAIL_LENGTH + 1):
+        projectile.trail = [(0, 0)] * length
+        projectile.sprite_blits(sprites)
+    Projectile.core_blit(sprites, 0, 0)
+    return sprites
+
+def load_assets(glow=USE_GLOW_EFFECTS):
+    # Builds the sprite cache (and glow effects) on a background thread while
+    # the start screen is up and installs them once complete; until then the
+    # parametric draw code is used. Returns the thread
+    def build():
+        sprites = build_sprite_cache()
+        if glow:
+            from effects import build_effects, set_effects
+            # Effects are only read on the sprite path, so they go in first
+            set_effects(build_effects())
+        set_sprite_cache(sprites)
+
+    thread = threading.Thread(target=build, name='assets', daemon=True)
+    thread.start()
+    return thread
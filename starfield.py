@@ -0,0 +1,94 @@
+import numpy as np
+import pygame
+from config import *
+
+def star_stamp(radius):
+    # Pixel offsets covered by pygame.draw.circle at this radius
+    size = radius * 2 + 3
+    surface = pygame.Surface((size, size))
+    pygame.draw.circle(surface, WHITE, (size // 2, size // 2), radius)
+    mask = pygame.surfarray.array2d(surface) != 0
+    dx, dy = np.nonzero(mask)
+    return dx - size // 2, dy - size // 2
+
+class Starfield:
+    # Star state lives in NumPy arrays; motion, wrap-around and twinkle are
+    # single vectorized passes and drawing writes straight into the pixel array
+    def __init__(self, count=STAR_COUNT, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.x = self.rng.integers(0, width + 1, count).astype(np.float64)
+        self.y = self.rng.integers(0, height + 1, count).astype(np.float64)
+        self.speed = self.rng.uniform(0.5, 2.0, count)
+        # Stars are kept sorted by size so each size is one contiguous slice
+        self.size = np.sort(self.rng.integers(1, 4, count))
+        # Twinkle phase follows the star's column, as it always has
+        self.phase = self.x.copy()
+        self.stamps = {radius: star_stamp(radius) for radius in range(1, 4)}
+        bounds = np.searchsorted(self.size, [1, 2, 3, 4])
+        self.groups = [(radius, slice(bounds[radius - 1], bounds[radius])) for radius in range(1, 4)]
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self, dt):
+        self.y += self.speed * 60 * dt
+        wrapped = self.y > self.height
+        count = int(np.count_nonzero(wrapped))
+        if count:
+            self.y[wrapped] = 0
+            self.x[wrapped] = self.rng.integers(0, self.width + 1, count)
+            self.phase[wrapped] = self.x[wrapped]
+
+    def brightness(self, ticks):
+        # int() in the old per-star loop truncated toward zero before the add
+        return (150 + np.trunc(50 * np.sin(ticks * 0.005 + self.phase))).astype(np.uint32)
+
+    def draw(self, screen, ticks):
+        # Grey (b, b, b) as a mapped pixel value for this surface's format
+        r_shift, g_shift, b_shift, _ = screen.get_shifts()
+        grey = (1 << r_shift) | (1 << g_shift) | (1 << b_shift)
+        colors = self.brightness(ticks) * np.uint32(grey)
+        width, height = screen.get_size()
+        xs = self.x.astype(np.int64)
+        ys = self.y.astype(np.int64)
+
+        pixels = pygame.surfarray.pixels2d(screen)
+        try:
+            # Row-major flat view when rows are tightly packed, which is far
+            # cheaper to scatter into than the (x, y) view
+            flat = pixels.T.reshape(-1) if pixels.T.flags.c_contiguous else None
+            for radius, members in self.groups:
+                dx, dy = self.stamps[radius]
+                x, y, color = xs[members], ys[members], colors[members]
+                # Stars clear of the edges need no per-pixel clipping
+                inner = (x >= radius) & (x < width - radius) & (y >= radius) & (y < height - radius)
+                if flat is not None:
+                    index = ((y[inner] * width + x[inner])[:, None] + (dy * width + dx)).ravel()
+                    flat[index] = np.repeat(color[inner], len(dx))
+                else:
+                    pixels[(x[inner][:, None] + dx).ravel(), (y[inner][:, None] + dy).ravel()] = np.repeat(color[inner], len(dx))
+
+                edge = ~inner
+                px = (x[edge][:, None] + dx).ravel()
+                py = (y[edge][:, None] + dy).ravel()
+                visible = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[visible], py[visible]] = np.repeat(color[edge], len(dx))[visible]
+        finally:
+            del pixels
+
+    def rects(self, max_area=None):
+        # Bounding boxes of the stars as last drawn, None when they would
+        # cover more than max_area and a full redraw is cheaper anyway
+        reach = self.size + 1
+        sides = reach * 2 + 1
+        if max_area is not None and int(np.sum(sides * sides)) > max_area:
+            return None
+        lefts = (self.x.astype(np.int64) - reach).tolist()
+        tops = (self.y.astype(np.int64) - reach).tolist()
+        return [pygame.Rect(x, y, side, side) for x, y, side in zip(lefts, tops, sides.tolist())]
+
+    def update_and_draw(self, screen, dt, ticks):
+        self.update(dt)
+        self.draw(screen, ticks)
@@ -0,0 +1,6 @@
+def percentile(sorted_values, q):
+    # Nearest-rank percentile, q in 0..100, of an already sorted sequence
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
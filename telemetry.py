@@ -0,0 +1,117 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from config import *
+
+class Telemetry:
+    # Structured game events (DDA decisions, spawns, kills, powerups, deaths).
+    # emit() only puts a tuple on a queue; a background thread serializes the
+    # events in batches to JSONL and rotates the file by size, so the frame
+    # loop never waits on disk or a slow terminal. When stopped, emit() is a no-op
+    def __init__(self, max_bytes=TELEMETRY_MAX_BYTES, backups=TELEMETRY_BACKUPS, queue_size=TELEMETRY_QUEUE_SIZE):
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue_size = queue_size
+        self.enabled = False
+        self.path = None
+        self.queue = None
+        self.thread = None
+        self.dropped = 0
+        self.written = 0
+
+    def start(self, path):
+        self.stop()
+        self.path = path
+        self.queue = queue.Queue(self.queue_size)
+        self.dropped = 0
+        self.written = 0
+        self.thread = threading.Thread(target=self.drain, name='telemetry', daemon=True)
+        self.thread.start()
+        self.enabled = True
+
+    def stop(self):
+        # Flushes everything queued so far
+        if self.thread is None:
+            return
+        self.enabled = False
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def emit(self, event, t, **fields):
+        # t is simulation time in ms
+        if not self.enabled:
+            return
+        try:
+            self.queue.put_nowait((event, t, fields))
+        except queue.Full:
+            # Losing events beats stalling the frame; the count is logged later
+            self.dropped += 1
+
+    # Writer thread
+    def drain(self):
+        file = open(self.path, 'a')
+        size = file.tell()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < 1024:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for item in batch:
+                if item is None:
+                    running = False
+                    break
+                event, t, fields = item
+                lines.append(json.dumps({'event': event, 't': t, **fields}, separators=(',', ':')))
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                lines.append(json.dumps({'event': 'dropped', 't': None, 'count': dropped}))
+            if not lines:
+                continue
+            data = '\n'.join(lines) + '\n'
+            file.write(data)
+            file.flush()
+            self.written += len(lines)
+            size += len(data)
+            if size >= self.max_bytes:
+                file.close()
+                self.rotate()
+                file = open(self.path, 'a')
+                size = 0
+        file.close()
+
+    def rotate(self):
+        # telemetry.jsonl -> telemetry.jsonl.1 -> ... -> telemetry.jsonl.<backups>
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+def log_files(path):
+    # Existing files for a telemetry path, oldest first
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    files = rotated[::-1]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+telemetry = Telemetry()
+atexit.register(telemetry.stop)
+# Never started, so every emit() is dropped; the sink for forked simulations
+null_telemetry = Telemetry()
+if TELEMETRY_FILE:
+    telemetry.start(TELEMETRY_FILE)
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+import pygame
+from config import *
+
+class TextCache:
+    # Outlined text is rasterized once and reused. Static labels are cached as
+    # whole composited surfaces keyed by (text, font, color, outline). Labels
+    # that change every frame get their outline from cached per-glyph surfaces.
+    def __init__(self, max_entries=TEXT_CACHE_SIZE, outline=TEXT_OUTLINE):
+        self.max_entries = max_entries
+        self.outline = outline
+        self.labels = OrderedDict()
+        self.glyphs = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.labels.clear()
+        self.glyphs.clear()
+
+    def _finish(self, surface):
+        if pygame.display.get_surface() is not None:
+            return surface.convert_alpha()
+        return surface
+
+    def _offsets(self):
+        o = self.outline
+        return [(dx, dy) for dx in (-o, 0, o) for dy in (-o, 0, o) if dx != 0 or dy != 0]
+
+    def render_label(self, text, font, color, outline_color):
+        # Same layering as drawing 8 outline copies and then the fill
+        o = self.outline
+        outline_surf = font.render(text, True, outline_color)
+        w, h = outline_surf.get_size()
+        surface = pygame.Surface((w + o * 2, h + o * 2), pygame.SRCALPHA)
+        for dx, dy in self._offsets():
+            surface.blit(outline_surf, (o + dx, o + dy), special_flags=pygame.BLEND_RGBA_MAX)
+        surface.blit(font.render(text, True, color), (o, o))
+        return self._finish(surface)
+
+    def glyph(self, font, char, outline_color):
+        key = (font, char, outline_color)
+        entry = self.glyphs.get(key)
+        if entry is None:
+            o = self.outline
+            outline_surf = font.render(char, True, outline_color)
+            w, h = outline_surf.get_size()
+            outline_layer = pygame.Surface((w + o * 2, h + o * 2), pygame.SRCALPHA)
+            for dx, dy in self._offsets():
+                outline_layer.blit(outline_surf, (o + dx, o + dy), special_flags=pygame.BLEND_RGBA_MAX)
+            entry = (self._finish(outline_layer), w)
+            self.glyphs[key] = entry
+        return entry
+
+    def assemble_label(self, text, font, color, outline_color):
+        # The outline (8 of the 9 passes) comes from the glyph atlas, only the
+        # fill is rasterized, since tinting cached glyphs costs more than that
+        o = self.outline
+        fill = font.render(text, True, color)
+        w, h = fill.get_size()
+        surface = pygame.Surface((w + o * 2, h + o * 2), pygame.SRCALPHA)
+
+        outlines = []
+        x = 0
+        for char in text:
+            outline_layer, advance = self.glyph(font, char, outline_color)
+            outlines.append((outline_layer, (x, 0), None, pygame.BLEND_RGBA_MAX))
+            x += advance
+        surface.blits(outlines, doreturn=False)
+        surface.blit(fill, (o, o))
+        return surface
+
+    def get(self, text, font, color, outline_color=BLACK, dynamic=False):
+        key = (text, font, tuple(color), tuple(outline_color))
+        surface = self.labels.get(key)
+        if surface is not None:
+            self.labels.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if dynamic:
+            surface = self.assemble_label(text, font, color, outline_color)
+        else:
+            surface = self.render_label(text, font, color, outline_color)
+        self.labels[key] = surface
+        if len(self.labels) > self.max_entries:
+            self.labels.popitem(last=False)
+        return surface
+
+    def draw(self, screen, text, font, x, y, color, outline_color=BLACK, dynamic=False):
+        surface = self.get(text, font, color, outline_color, dynamic)
+        return screen.blit(surface, (x - self.outline, y - self.outline))
+
+class LazyFont:
+    # Stands in for a pygame font and loads it on first use, so fonts that
+    # aren't on screen yet (SysFont scans the installed fonts) cost nothing at startup
+    def __init__(self, name, size, system=False):
+        self.font_args = (name, size)
+        self.system = system
+        self.font = None
+
+    def __getattr__(self, attr):
+        # Only reached for names the proxy doesn't define, i.e. the font's own
+        if self.font is None:
+            self.font = pygame.font.SysFont(*self.font_args) if self.system else pygame.font.Font(*self.font_args)
+        value = getattr(self.font, attr)
+        setattr(self, attr, value)
+        return value
@@ -0,0 +1,131 @@
+# Runs many headless games across all cores to evaluate DDA weights and thresholds.
+# Usage: python tune_dda.py --lives-weight 1.5 2.0 2.5 --easy 6 7 --seeds 50 --out dda.json
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import *
+from stats import percentile
+
+
+def run_session(job):
+    from bot import BOTS
+    from simulation import GameSimulation
+
+    weights, thresholds, seed, bot_name, max_time, dt = job
+    sim = GameSimulation(seed=seed, dda_weights=weights, dda_thresholds=thresholds)
+    survival_time = sim.run(BOTS[bot_name](seed), dt=dt, max_time=max_time)
+    return {
+        'weights': weights,
+        'thresholds': thresholds,
+        'seed': seed,
+        'bot': bot_name,
+        'survival_time': survival_time,
+        'died': sim.game_over,
+        'waves': sim.enemy_manager.wave_count,
+        'score': sim.player.score,
+        'dda': sim.dda_history,
+    }
+
+
+def summarize(sessions):
+    times = sorted(s['survival_time'] for s in sessions)
+    waves = sorted(s['waves'] for s in sessions)
+    wave_counts = {}
+    for w in waves:
+        wave_counts[w] = wave_counts.get(w, 0) + 1
+
+    # Mean spawn_rate / speed_factor at the n-th DDA check across sessions
+    trajectory = []
+    for checks in itertools.zip_longest(*(s['dda'] for s in sessions)):
+        checks = [c for c in checks if c is not None]
+        trajectory.append({
+            'sessions': len(checks),
+            'spawn_rate': sum(c[2] for c in checks) / len(checks),
+            'enemy_speed_factor': sum(c[3] for c in checks) / len(checks),
+        })
+
+    return {
+        'sessions': len(sessions),
+        'deaths': sum(1 for s in sessions if s['died']),
+        'survival_time': {
+            'mean': sum(times) / len(times),
+            'p10': percentile(times, 10),
+            'p50': percentile(times, 50),
+            'p90': percentile(times, 90),
+        },
+        'waves': {
+            'mean': sum(waves) / len(waves),
+            'p50': percentile(waves, 50),
+            'distribution': wave_counts,
+        },
+        'trajectory': trajectory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo DDA parameter sweep over headless games")
+    parser.add_argument('--lives-weight', type=float, nargs='+', default=[DDA_WEIGHTS[0]])
+    parser.add_argument('--time-weight', type=float, nargs='+', default=[DDA_WEIGHTS[1]])
+    parser.add_argument('--rate-weight', type=float, nargs='+', default=[DDA_WEIGHTS[2]])
+    parser.add_argument('--easy', type=float, nargs='+', default=[DDA_THRESHOLDS[0]])
+    parser.add_argument('--hard', type=float, nargs='+', default=[DDA_THRESHOLDS[1]])
+    parser.add_argument('--bot', choices=['turret', 'wander', 'kite'], nargs='+', default=['wander'])
+    parser.add_argument('--seeds', type=int, default=20, help="sessions per parameter set")
+    parser.add_argument('--base-seed', type=int, default=0)
+    parser.add_argument('--max-time', type=float, default=300.0, help="simulated seconds per session cap")
+    parser.add_argument('--dt', type=float, default=1 / SIM_TICK_RATE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='dda_sweep.json')
+    parser.add_argument('--sessions-out', help="optional JSONL file with every session")
+    args = parser.parse_args()
+
+    grid = [((x, y, z), (easy, hard))
+            for x, y, z, easy, hard in itertools.product(args.lives_weight, args.time_weight, args.rate_weight,
+                                                         args.easy, args.hard)
+            if easy <= hard]
+    jobs = [(weights, thresholds, args.base_seed + i, bot, args.max_time, args.dt)
+            for weights, thresholds in grid
+            for bot in args.bot
+            for i in range(args.seeds)]
+    print(f"{len(grid)} parameter sets x {len(args.bot)} bots x {args.seeds} seeds = {len(jobs)} sessions "
+          f"on {args.workers} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        sessions = list(executor.map(run_session, jobs, chunksize=max(1, len(jobs) // (args.workers * 8))))
+    wall = time.perf_counter() - start
+    simulated = sum(s['survival_time'] for s in sessions)
+
+    results = []
+    for weights, thresholds in grid:
+        for bot in args.bot:
+            group = [s for s in sessions if s['weights'] == weights and s['thresholds'] == thresholds and s['bot'] == bot]
+            summary = summarize(group)
+            summary.update({'weights': weights, 'thresholds': thresholds, 'bot': bot})
+            results.append(summary)
+            print(f"w={weights} t={thresholds} {bot:>6}: survival p50={summary['survival_time']['p50']:.1f}s "
+                  f"mean={summary['survival_time']['mean']:.1f}s waves p50={summary['waves']['p50']}")
+
+    throughput = {
+        'workers': args.workers,
+        'sessions': len(sessions),
+        'simulated_seconds': simulated,
+        'wall_seconds': wall,
+        'simulated_per_wall_second': simulated / wall if wall > 0 else 0.0,
+    }
+    print(f"Simulated {simulated:.0f}s in {wall:.1f}s wall = {throughput['simulated_per_wall_second']:.0f}x real time "
+          f"({throughput['simulated_per_wall_second'] / args.workers:.0f}x per worker)")
+
+    with open(args.out, 'w') as f:
+        json.dump({'throughput': throughput, 'results': results}, f, indent=2)
+    if args.sessions_out:
+        with open(args.sessions_out, 'w') as f:
+            for s in sessions:
+                f.write(json.dumps(s) + '\n')
+
+
+if __name__ == '__main__':
+    main()
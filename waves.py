@@ -0,0 +1,107 @@
+import json
+import math
+from config import *
+
+# name -> default; the type of the default is the type a value is coerced to
+SPAWN_FIELDS = {
+    'initial_spawn_rate': INITIAL_SPAWN_RATE,
+    'wave_size': WAVE_SIZE,
+    'burst': SPAWN_BURST,
+    'spawns_per_tick': SPAWNS_PER_TICK,
+    'boss_ratio': BOSS_RATIO,
+    'boss_speed_factor': BOSS_SPEED_FACTOR,
+    'heal_powerup_waves': HEAL_POWERUP_WAVES,
+    'speed_powerup_waves': SPEED_POWERUP_WAVES,
+    'spawn_rate_limits': SPAWN_RATE_LIMITS,
+    'spawn_rate_step': SPAWN_RATE_STEP,
+    'speed_factor_limits': SPEED_FACTOR_LIMITS,
+    'speed_factor_step': SPEED_FACTOR_STEP,
+    'dda': True,
+}
+# Counts and wave periods, used as divisors or loop counts
+POSITIVE_FIELDS = ('wave_size', 'burst', 'spawns_per_tick', 'heal_powerup_waves', 'speed_powerup_waves')
+
+PRESETS = {
+    'default': {},
+    # Enemies arrive far faster than a player can clear them and DDA is off,
+    # so the population only grows; benchmarks/stress.py ramps on this. 250
+    # spawns/s outpaces the one enemy per tick an immortal player absorbs
+    'stress': {
+        'initial_spawn_rate': 4,
+        'wave_size': 50,
+        'burst': 1,
+        'spawns_per_tick': 8,
+        'boss_ratio': 0.1,
+        'boss_speed_factor': 0.0,
+        'spawn_rate_limits': (1, 3000),
+        'dda': False,
+    },
+}
+
+
+class SpawnConfig:
+    # Spawn, wave and DDA limit settings read by EnemyManager
+    def __init__(self, **values):
+        for name, default in SPAWN_FIELDS.items():
+            setattr(self, name, default)
+        self.update(values)
+
+    def update(self, values):
+        for name, value in values.items():
+            if name not in SPAWN_FIELDS:
+                raise ValueError(f"Unknown spawn setting '{name}', expected one of {', '.join(SPAWN_FIELDS)}")
+            default = SPAWN_FIELDS[name]
+            if isinstance(default, tuple):
+                if not isinstance(value, (list, tuple)) or len(value) != len(default):
+                    raise ValueError(f"Spawn setting '{name}' takes {len(default)} values, e.g. {list(default)}")
+                value = tuple(type(d)(v) for d, v in zip(default, value))
+            elif isinstance(default, bool):
+                value = value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes', 'on')
+            else:
+                value = type(default)(value)
+                if name in POSITIVE_FIELDS and value < 1:
+                    raise ValueError(f"Spawn setting '{name}' must be at least 1")
+            setattr(self, name, value)
+        return self
+
+    def is_boss(self, spawned, speed_factor):
+        # Spreads bosses evenly: with ratio 0.2 every fifth spawn, starting with the first
+        if speed_factor <= self.boss_speed_factor or self.boss_ratio <= 0:
+            return False
+        return math.floor(spawned * self.boss_ratio + 1e-9) != math.floor((spawned - 1) * self.boss_ratio + 1e-9)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in SPAWN_FIELDS}
+
+
+def load_spawn_config(path=SPAWN_CONFIG_FILE, preset='default', overrides=()):
+    # Preset, then file, then name=value overrides, each on top of the last
+    config = SpawnConfig(**PRESETS[preset])
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+    for override in overrides:
+        name, sep, value = override.partition('=')
+        if not sep:
+            raise ValueError(f"Expected name=value, got '{override}'")
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        config.update({name.strip(): value})
+    return config
+
+
+def add_spawn_arguments(parser):
+    parser.add_argument('--spawn-config', metavar='PATH', default=SPAWN_CONFIG_FILE,
+                        help="JSON file of spawn and wave settings")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='default', help="Built-in spawn settings")
+    parser.add_argument('--set', metavar='NAME=VALUE', action='append', default=[], dest='spawn_overrides',
+                        help="Override one spawn setting, e.g. --set wave_size=10 (repeatable)")
+
+
+def spawn_config_from_args(parser, args):
+    try:
+        return load_spawn_config(args.spawn_config, args.preset, args.spawn_overrides)
+    except (OSError, ValueError, TypeError) as error:
+        parser.error(str(error))